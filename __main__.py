@@ -18,19 +18,22 @@ Usage:
     python __main__.py
 
 Environment Variables:
-    ANTHROPIC_API_KEY: Claude API key (required)
+    ANTHROPIC_API_KEY: Claude API key (required unless LLM_BACKEND=local)
+    LLM_BACKEND: "anthropic" (default) or "local" for the offline stand-in
     PORT: Server port (default: 9999)
     HOST: Server host (default: 0.0.0.0)
+    WORKERS: Server processes sharing the port (default: 1)
     DEBUG: Enable debug mode (default: false)
     
     See config.py for complete configuration options.
 """
 
+import contextlib
 import os
 import sys
 import logging
 import asyncio
-from typing import List
+from typing import List, Optional
 
 # Configure logging before other imports
 logging.basicConfig(
@@ -41,18 +44,31 @@ logger = logging.getLogger(__name__)
 
 try:
     # Import A2A SDK components
+    from a2a.server.apps.jsonrpc.jsonrpc_app import DefaultCallContextBuilder
     from a2a.server.apps.jsonrpc.starlette_app import A2AStarletteApplication
+    from a2a.server.context import ServerCallContext
     from a2a.server.request_handlers.default_request_handler import DefaultRequestHandler
-    from a2a.server.tasks.inmemory_task_store import InMemoryTaskStore
+    from a2a.server.tasks.task_store import TaskStore
+    from a2a.utils.errors import ServerError
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse
     from a2a.types import (
         AgentCapabilities,
         AgentCard,
         AgentSkill,
+        Task,
+        TaskIdParams,
+        TaskNotCancelableError,
+        TaskState,
+        UnsupportedOperationError,
     )
     
     # Import our custom components
     from agent_executor import InterventionalCardiologyExecutor
     from config import config
+    from response_cache import SharedResponseCache
+    from task_store import TERMINAL_STATES, BoundedTaskStore, TieredTaskStore
     
 except ImportError as e:
     logger.error(f"Import error: {e}")
@@ -212,7 +228,144 @@ def create_agent_card() -> AgentCard:
     
     return agent_card
 
-def create_a2a_application() -> A2AStarletteApplication:
+def create_task_store() -> TaskStore:
+    """
+    Create the task store selected by TASK_STORE_BACKEND.
+    
+    The bounded memory store is used on its own, or as the hot tier in
+    front of the persistent SQLite store.
+    """
+    memory = BoundedTaskStore(
+        max_tasks=config.task_store.task_store_max_tasks,
+        ttl_seconds=config.task_store.task_store_ttl_seconds,
+        max_bytes=config.task_store.task_store_max_bytes,
+        active_ttl_seconds=config.task_store.task_store_active_ttl_seconds
+    )
+    if config.task_store.task_store_backend != "sqlite":
+        return memory
+    
+    logger.info(f"Persisting tasks to SQLite at {config.task_store.task_store_path}")
+    return TieredTaskStore(
+        memory=memory,
+        path=config.task_store.task_store_path,
+        batch_size=config.task_store.task_store_batch_size,
+        flush_interval=config.task_store.task_store_flush_interval_seconds,
+        retention_seconds=config.task_store.task_store_retention_seconds,
+        heartbeat_interval=config.task_store.task_store_heartbeat_seconds
+    )
+
+def server_lifespan(executor: InterventionalCardiologyExecutor, task_store: TaskStore):
+    """
+    Starlette lifespan that drains the server process on shutdown.
+    
+    Runs once the server has stopped accepting requests: in-flight
+    consultations get up to WORKER_DRAIN_TIMEOUT_SECONDS to finish, then
+    pending task and shared response cache writes are flushed and upstream
+    connections closed.
+    """
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        remaining = await executor.drain(config.server.drain_timeout_seconds)
+        if remaining:
+            logger.warning(f"Stopping with {remaining} consultations still in flight")
+        if isinstance(task_store, TieredTaskStore):
+            await task_store.aclose()
+        if isinstance(executor.agent.response_cache, SharedResponseCache):
+            executor.agent.response_cache.close()
+        await executor.agent.llm_backend.aclose()
+    return lifespan
+
+class PeerAddressContextBuilder(DefaultCallContextBuilder):
+    """Call context builder that also records the TCP peer address for rate limiting."""
+    
+    def build(self, request: Request) -> ServerCallContext:
+        call_context = super().build(request)
+        call_context.state["client_host"] = request.client.host if request.client else None
+        return call_context
+
+class WorkerAwareRequestHandler(DefaultRequestHandler):
+    """
+    Request handler that routes cancel and resubscribe to the worker running a task.
+    
+    A worker only holds the event queues and in-flight consultations of the
+    tasks it runs. Canceling elsewhere would publish canceled while the
+    owning worker goes on to complete the task, so a cancel for another live
+    worker's task is forwarded to it through SQLite, and the caller gets the
+    task back once the owner has canceled it. Resubscribing elsewhere has no
+    events to stream, so callers on the wrong worker get an error and can
+    follow the task with tasks/get, which every worker serves from SQLite.
+    Tasks whose worker has stopped heartbeating are handled here, since
+    nobody else will.
+    """
+    
+    # Longest a forwarded cancel waits for the owning worker to cancel the task
+    CANCEL_FORWARD_TIMEOUT_SECONDS = 10.0
+    
+    def __init__(self, agent_executor: InterventionalCardiologyExecutor, task_store: TieredTaskStore):
+        super().__init__(agent_executor=agent_executor, task_store=task_store)
+        self.tiered_store = task_store
+        task_store.cancel_listener = self._cancel_for_peer
+    
+    async def on_cancel_task(self, params: TaskIdParams, context: Optional[ServerCallContext] = None):
+        owner = await self._peer_owner(params.id)
+        if owner is None:
+            return await super().on_cancel_task(params, context)
+        
+        task = await self.tiered_store.get(params.id)
+        if task is not None and task.status.state in TERMINAL_STATES:
+            raise ServerError(error=TaskNotCancelableError(
+                message=f"Task cannot be canceled - current state: {task.status.state.value}"
+            ))
+        await self.tiered_store.request_cancel(params.id, owner)
+        return await self._wait_for_peer_cancel(params.id)
+    
+    async def on_resubscribe_to_task(self, params: TaskIdParams, context: Optional[ServerCallContext] = None):
+        if await self._peer_owner(params.id) is not None:
+            raise ServerError(error=UnsupportedOperationError(message=(
+                f"Task {params.id} is running in another worker process; "
+                "use tasks/get to follow it until it finishes"
+            )))
+        async for event in super().on_resubscribe_to_task(params, context):
+            yield event
+    
+    async def _peer_owner(self, task_id: str) -> Optional[str]:
+        """Worker ID of the task's owner when that is another live worker, else None."""
+        owner = await self.tiered_store.owner(task_id)
+        if owner is None or owner == self.tiered_store.worker_id:
+            return None
+        return owner if await self.tiered_store.worker_alive(owner) else None
+    
+    async def _wait_for_peer_cancel(self, task_id: str) -> Task:
+        """Follow a task through SQLite until its owner cancels it or the forward times out."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.CANCEL_FORWARD_TIMEOUT_SECONDS
+        while loop.time() < deadline:
+            await asyncio.sleep(self.tiered_store.flush_interval)
+            task = await self.tiered_store.get(task_id)
+            if task is None or task.status.state not in TERMINAL_STATES:
+                continue
+            if task.status.state == TaskState.canceled:
+                return task
+            raise ServerError(error=TaskNotCancelableError(
+                message=f"Task cannot be canceled - current state: {task.status.state.value}"
+            ))
+        raise ServerError(error=TaskNotCancelableError(message=(
+            f"Task {task_id} is running in another worker process, which has not confirmed the cancel "
+            "yet; use tasks/get to follow it"
+        )))
+    
+    async def _cancel_for_peer(self, task_id: str) -> None:
+        """Cancel one of this worker's tasks at the request of another worker."""
+        try:
+            await super().on_cancel_task(TaskIdParams(id=task_id))
+        except ServerError as e:
+            logger.warning(f"Could not cancel task {task_id} for another worker: {e.error.message}")
+        except Exception as e:
+            logger.error(f"Error canceling task {task_id} for another worker: {str(e)}")
+
+def create_a2a_application(task_store: TaskStore,
+                           executor: InterventionalCardiologyExecutor) -> A2AStarletteApplication:
     """
     Create the A2A Starlette application with proper configuration.
     
@@ -228,21 +381,62 @@ def create_a2a_application() -> A2AStarletteApplication:
     # Create the agent card
     agent_card = create_agent_card()
     
-    # Create the custom request handler with our interventional cardiology executor
-    request_handler = DefaultRequestHandler(
-        agent_executor=InterventionalCardiologyExecutor(),
-        task_store=InMemoryTaskStore()  # In-memory storage for Phase 1
-    )
+    # Create the custom request handler with our interventional cardiology executor;
+    # with a store shared between workers, cancel and resubscribe go to the owner
+    if isinstance(task_store, TieredTaskStore):
+        request_handler = WorkerAwareRequestHandler(executor, task_store)
+    else:
+        request_handler = DefaultRequestHandler(
+            agent_executor=executor,
+            task_store=task_store
+        )
     
     # Create the A2A Starlette application
     app_builder = A2AStarletteApplication(
         agent_card=agent_card,
-        http_handler=request_handler
+        http_handler=request_handler,
+        context_builder=PeerAddressContextBuilder()
     )
     
     logger.info("A2A application created successfully")
     return app_builder
 
+def create_app() -> Starlette:
+    """
+    App factory: build the complete ASGI application for one server process.
+    
+    Used for the single-process server and by every worker process when
+    WORKERS > 1, so each worker owns its own executor, caches and task store
+    connection. Conversations are rebuilt from the shared task store when a
+    follow-up turn lands on a worker that has not seen the earlier ones.
+    """
+    task_store = create_task_store()
+    executor = InterventionalCardiologyExecutor(
+        shared_store=task_store if isinstance(task_store, TieredTaskStore) else None
+    )
+    app_builder = create_a2a_application(task_store, executor)
+    app = app_builder.build(lifespan=server_lifespan(executor, task_store))
+    if config.server.stats_path:
+        app.add_route(config.server.stats_path, stats_endpoint(executor, task_store), methods=["GET"])
+    return app
+
+def stats_endpoint(executor: InterventionalCardiologyExecutor, task_store: TaskStore):
+    """
+    Starlette endpoint returning this worker's counters as JSON.
+    
+    Covers Claude token usage and prompt cache hits, the executor and agent
+    components (retries and hedges, model routing, circuit breaker,
+    scheduler, caches) and the task store.
+    """
+    worker_id = task_store.worker_id if isinstance(task_store, TieredTaskStore) else None
+    
+    async def endpoint(request: Request) -> JSONResponse:
+        stats = {"pid": os.getpid(), "worker_id": worker_id, **executor.stats()}
+        if hasattr(task_store, "stats"):
+            stats["task_store"] = task_store.stats()
+        return JSONResponse(stats)
+    return endpoint
+
 def main():
     """
     Main entry point for Dr. Walter Reed's Interventional Cardiology A2A Agent.
@@ -266,31 +460,42 @@ def main():
         sys.exit(1)
     
     # Validate required environment variables
-    if not config.claude.api_key:
+    if config.llm_backend.provider == "anthropic" and not config.claude.api_key:
         logger.error("ANTHROPIC_API_KEY environment variable is required")
         logger.error("Please set your Claude API key before starting the agent")
         sys.exit(1)
     
     try:
-        # Create the A2A application
-        app_builder = create_a2a_application()
-        app = app_builder.build()
-        
         # Start the server
         logger.info(f"Starting server on {config.server.host}:{config.server.port}")
         logger.info(f"Agent card will be available at: {config.server.base_url}/.well-known/agent-card.json")
         logger.info(f"A2A endpoint: {config.server.base_url}/")
         logger.info(f"Debug mode: {config.server.debug}")
         
+        if config.server.workers > 1:
+            # Each worker builds its own application through the app factory
+            from workers import WorkerSupervisor
+            
+            WorkerSupervisor(
+                app_factory=create_app,
+                workers=config.server.workers,
+                host=config.server.host,
+                port=config.server.port,
+                log_level=config.server.log_level,
+                drain_timeout=config.server.drain_timeout_seconds
+            ).run()
+            return
+        
         # Import and start uvicorn
         import uvicorn
         
         uvicorn.run(
-            app,
+            create_app(),
             host=config.server.host,
             port=config.server.port,
             log_level=config.server.log_level,
-            access_log=True
+            access_log=True,
+            timeout_graceful_shutdown=config.server.drain_timeout_seconds
         )
         
     except KeyboardInterrupt:
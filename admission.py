@@ -0,0 +1,102 @@
+"""
+Admission Control for Dr. Walter Reed's Interventional Cardiology Agent
+
+Load shedding at the executor boundary. Before a task is submitted, the
+executor asks the AdmissionController whether the agent has room for another
+consultation. Two signals are checked, both O(1):
+
+- Consultations in flight in the executor, against a fixed cap
+- How long the oldest call has been queued for an upstream Claude slot
+
+Once either threshold is exceeded, new routine consultations are rejected
+immediately with a retry hint instead of joining a queue they would time out
+in, so latency stays bounded for the work already admitted. Acute
+consultations are exempt from the queue delay check and have extra in-flight
+headroom, matching the acute reservation of the priority scheduler.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from scheduler import ACUTE
+
+logger = logging.getLogger(__name__)
+
+# Reasons a consultation is shed
+IN_FLIGHT_LIMIT = "in_flight_limit"
+QUEUE_DELAY = "queue_delay"
+
+
+@dataclass(frozen=True)
+class AdmissionDecision:
+    """Outcome of an admission check."""
+
+    admitted: bool
+    reason: Optional[str] = None
+    retry_after: float = 0.0
+
+
+ADMITTED = AdmissionDecision(admitted=True)
+
+
+class AdmissionController:
+    """
+    In-flight and queue delay thresholds for new consultations.
+
+    Every admitted consultation must be released exactly once.
+
+    Args:
+        max_in_flight: Consultations allowed in flight before routine work is shed
+        acute_headroom: Extra in-flight consultations allowed for the acute lane
+        max_queue_delay: Longest the oldest queued upstream call may have waited,
+            in seconds, before routine work is shed
+        queue_delay: Returns the current queue delay of a lane (the scheduler's
+            queue_delay), or None when no upstream queue is in use
+    """
+
+    def __init__(self, max_in_flight: int, acute_headroom: int, max_queue_delay: float,
+                 queue_delay: Optional[Callable[[str], float]] = None):
+        self.max_in_flight = max(1, max_in_flight)
+        self.acute_headroom = max(0, acute_headroom)
+        self.max_queue_delay = max_queue_delay
+        self.queue_delay = queue_delay
+
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed: Dict[str, int] = {IN_FLIGHT_LIMIT: 0, QUEUE_DELAY: 0}
+
+    def admit(self, lane: str) -> AdmissionDecision:
+        """Admit a consultation in lane, or decide to shed it with a retry hint in seconds."""
+        if lane == ACUTE:
+            if self.in_flight >= self.max_in_flight + self.acute_headroom:
+                return self._shed(IN_FLIGHT_LIMIT, 1.0)
+        else:
+            if self.in_flight >= self.max_in_flight:
+                return self._shed(IN_FLIGHT_LIMIT, 1.0)
+            if self.queue_delay is not None:
+                delay = self.queue_delay(lane)
+                if delay > self.max_queue_delay:
+                    return self._shed(QUEUE_DELAY, delay)
+
+        self.in_flight += 1
+        self.admitted += 1
+        return ADMITTED
+
+    def release(self) -> None:
+        """Mark an admitted consultation as finished."""
+        self.in_flight -= 1
+
+    def _shed(self, reason: str, retry_after: float) -> AdmissionDecision:
+        """Count and return a shedding decision."""
+        self.shed[reason] += 1
+        return AdmissionDecision(admitted=False, reason=reason, retry_after=max(1.0, retry_after))
+
+    def stats(self) -> Dict[str, int]:
+        """Return in-flight consultations and admitted/shed counters."""
+        return {
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "shed_in_flight_limit": self.shed[IN_FLIGHT_LIMIT],
+            "shed_queue_delay": self.shed[QUEUE_DELAY]
+        }
@@ -5,16 +5,84 @@ Handles medical consultations and provides professional interventional cardiolog
 This agent is focused purely on the medical domain without any A2A protocol knowledge.
 """
 
+import asyncio
+import contextlib
+import json
 import logging
-from typing import List
+import time
+from dataclasses import dataclass
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, List, Optional
 
 import anthropic
 from config import config
+from conversation import MESSAGE_OVERHEAD_TOKENS, ConversationSummary, TokenBudgetWindow, estimate_tokens
+from fast_path import FastPathResponder
+from injection_scanner import PromptInjectionScanner
+from llm_backend import AnthropicLLMBackend, LLMBackend, LLMBackendError, LLMResponse, LocalLLMBackend
+from model_router import CLINICAL, LOGISTICS, SERVICE_CATALOG, ModelPricing, ModelRoute, ModelRouter, QueryClassifier
+from request_coalescing import SingleFlight
+from response_cache import ResponseCache, SharedResponseCache, hash_text
+from resilience import (
+    CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded, HedgeSlot, ResilientCaller, TaskDeadlineExceeded
+)
+from response_classifier import ArtifactDecision, ResponseClassifier
+from scheduler import (
+    FIRST_TOKEN, PER_OUTPUT_TOKEN, ROUTINE, AdaptiveConcurrencyLimit, PriorityScheduler, QueueWaitExceeded,
+    UrgencyClassifier
+)
+from semantic_cache import HashedNgramVectorizer, SemanticCache
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class TokenUsageStats:
+    """Cumulative Claude token usage, including prompt cache hits and misses."""
+    
+    requests: int = 0
+    cache_hit_requests: int = 0
+    cache_miss_requests: int = 0
+    input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    output_tokens: int = 0
+    
+    def record(self, usage) -> None:
+        """Accumulate the usage block of a single Claude response."""
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_creation = getattr(usage, "cache_creation_input_tokens", None) or 0
+        
+        self.requests += 1
+        if cache_read:
+            self.cache_hit_requests += 1
+        else:
+            self.cache_miss_requests += 1
+        self.input_tokens += getattr(usage, "input_tokens", None) or 0
+        self.cache_read_input_tokens += cache_read
+        self.cache_creation_input_tokens += cache_creation
+        self.output_tokens += getattr(usage, "output_tokens", None) or 0
+        
+        logger.info(
+            f"Claude usage: input={usage.input_tokens} cache_read={cache_read} "
+            f"cache_creation={cache_creation} output={usage.output_tokens}"
+        )
+    
+    def as_dict(self) -> Dict[str, float]:
+        """Return the counters plus the share of prompt tokens served from cache."""
+        prompt_tokens = self.input_tokens + self.cache_read_input_tokens + self.cache_creation_input_tokens
+        return {
+            "requests": self.requests,
+            "cache_hit_requests": self.cache_hit_requests,
+            "cache_miss_requests": self.cache_miss_requests,
+            "input_tokens": self.input_tokens,
+            "cache_read_input_tokens": self.cache_read_input_tokens,
+            "cache_creation_input_tokens": self.cache_creation_input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_ratio": self.cache_read_input_tokens / prompt_tokens if prompt_tokens else 0.0
+        }
+
+
 class InterventionalCardiologyAgent:
     """
     Core interventional cardiology agent handling medical consultations.
@@ -31,26 +99,199 @@ class InterventionalCardiologyAgent:
         """Initialize the interventional cardiology agent."""
         logger.info("Initializing Interventional Cardiology Agent")
         
-        # Initialize Claude client
-        self.anthropic_client = anthropic.Anthropic(
-            api_key=config.claude.api_key
-        )
+        # Language model backend: Claude over a shared, pooled async HTTP
+        # connection, or the local stand-in for offline load testing
+        self.llm_backend = self._create_llm_backend()
         
         # Get the properly formatted system prompt from configuration
         self.system_prompt = config.get_formatted_system_prompt()
+        self.system_prompt_tokens = estimate_tokens(self.system_prompt)
+        
+        # Prompt injection scanner compiled once from the configured patterns
+        self.injection_scanner = PromptInjectionScanner(config.security.prompt_injection_patterns)
+        
+        # Single-pass classifier for artifact decisions and naming
+        self.response_classifier = ResponseClassifier(
+            artifact_keywords=config.artifacts.artifact_keywords,
+            name_rules=config.artifacts.artifact_name_rules,
+            default_artifact_name=config.artifacts.default_artifact_name,
+            min_artifact_length=config.artifacts.min_artifact_length
+        )
+        
+        # Token budget for the conversation history forwarded to Claude
+        self.history_window = TokenBudgetWindow(
+            max_tokens=config.conversation.history_token_budget,
+            pin_first_turn=config.conversation.pin_first_turn
+        )
+        
+        # Token usage and prompt cache hit/miss accounting
+        self.usage_stats = TokenUsageStats()
+        
+        # Exact-match response cache for repeat consultation questions
+        self.system_prompt_hash = hash_text(self.system_prompt)
+        self.response_cache = None
+        if config.cache.response_cache_enabled and config.cache.response_cache_shared_path:
+            # Shared with the other worker processes on this host
+            self.response_cache = SharedResponseCache(
+                max_entries=config.cache.response_cache_max_entries,
+                ttl_seconds=config.cache.response_cache_ttl_seconds,
+                max_bytes=config.cache.response_cache_max_bytes,
+                path=config.cache.response_cache_shared_path
+            )
+        elif config.cache.response_cache_enabled:
+            self.response_cache = ResponseCache(
+                max_entries=config.cache.response_cache_max_entries,
+                ttl_seconds=config.cache.response_cache_ttl_seconds,
+                max_bytes=config.cache.response_cache_max_bytes
+            )
+        
+        # Retries with jittered backoff, hedged requests and deadline budgets
+        self.llm_caller = ResilientCaller(
+            max_retries=config.resilience.max_retries,
+            base_delay=config.resilience.retry_base_delay,
+            max_delay=config.resilience.retry_max_delay,
+            hedging_enabled=config.resilience.hedging_enabled,
+            hedge_percentile=config.resilience.hedge_percentile,
+            latency_window=config.resilience.latency_window,
+            hedge_min_samples=config.resilience.hedge_min_samples,
+            hedge_budget_ratio=config.resilience.hedge_budget_ratio,
+            hedge_budget_burst=config.resilience.hedge_budget_burst
+        )
+        
+        # Circuit breaker that fails fast while the Claude backend is unhealthy
+        self.circuit_breaker = None
+        if config.resilience.circuit_breaker_enabled:
+            self.circuit_breaker = CircuitBreaker(
+                failure_rate_threshold=config.resilience.breaker_failure_rate,
+                slow_call_seconds=config.resilience.breaker_slow_call_seconds,
+                slow_call_rate_threshold=config.resilience.breaker_slow_call_rate,
+                window_size=config.resilience.breaker_window_size,
+                min_calls=config.resilience.breaker_min_calls,
+                open_seconds=config.resilience.breaker_open_seconds,
+                half_open_max_calls=config.resilience.breaker_half_open_max_calls
+            )
+        
+        # Templated answers for greetings and service catalog questions
+        self.fast_path = None
+        if config.fast_path.fast_path_enabled:
+            self.fast_path = FastPathResponder(
+                answers=config.get_fast_path_answers(),
+                min_confidence=config.fast_path.min_confidence,
+                max_words=config.fast_path.max_words
+            )
+        
+        # Keyword classification of queries, for routing and semantic cache eligibility
+        self.query_classifier = QueryClassifier({
+            SERVICE_CATALOG: config.routing.service_catalog_keywords,
+            LOGISTICS: config.routing.logistics_keywords,
+            CLINICAL: config.routing.clinical_keywords
+        })
+        
+        # Complexity-based routing between the fast and the deep model
+        self.default_route = ModelRoute(CLINICAL, config.claude.model, config.claude.max_tokens)
+        self.model_router = None
+        if config.routing.routing_enabled:
+            self.model_router = ModelRouter(
+                deep_route=ModelRoute(CLINICAL, config.claude.model, config.routing.clinical_max_tokens),
+                fast_routes={
+                    SERVICE_CATALOG: ModelRoute(SERVICE_CATALOG, config.routing.fast_model,
+                                                config.routing.service_catalog_max_tokens),
+                    LOGISTICS: ModelRoute(LOGISTICS, config.routing.fast_model,
+                                          config.routing.logistics_max_tokens)
+                },
+                classifier=self.query_classifier,
+                fast_max_words=config.routing.fast_max_words,
+                pricing={
+                    config.claude.model: ModelPricing(config.routing.deep_input_cost_per_mtok,
+                                                      config.routing.deep_output_cost_per_mtok),
+                    config.routing.fast_model: ModelPricing(config.routing.fast_input_cost_per_mtok,
+                                                            config.routing.fast_output_cost_per_mtok)
+                },
+                latency_window=config.resilience.latency_window
+            )
+        
+        # Acute/routine admission queue with reserved acute concurrency
+        self.scheduler = None
+        self.urgency_classifier = None
+        if config.scheduler.scheduler_enabled:
+            adaptive_limit = None
+            if config.scheduler.adaptive_concurrency_enabled:
+                adaptive_limit = AdaptiveConcurrencyLimit(
+                    initial_limit=config.worker_share(config.scheduler.max_concurrent_llm_calls),
+                    min_limit=config.scheduler.min_concurrent_llm_calls,
+                    max_limit=config.worker_share(config.scheduler.max_adaptive_llm_calls),
+                    latency_tolerance=config.scheduler.latency_tolerance,
+                    overload_backoff=config.scheduler.overload_backoff
+                )
+            self.scheduler = PriorityScheduler(
+                max_concurrency=config.worker_share(config.scheduler.max_concurrent_llm_calls),
+                reserved_acute=config.worker_share(config.scheduler.acute_reserved_slots),
+                wait_window=config.resilience.latency_window,
+                max_queue_wait=config.scheduler.max_queue_wait_seconds,
+                adaptive_limit=adaptive_limit
+            )
+            self.urgency_classifier = UrgencyClassifier(config.scheduler.acute_terms)
+        
+        # Single-flight coalescing of identical concurrent Claude requests
+        self.inflight_requests = SingleFlight()
+        
+        # Semantic cache for paraphrased first-turn questions
+        self.semantic_cache = None
+        if config.cache.semantic_cache_enabled:
+            self.semantic_cache = SemanticCache(
+                max_entries=config.cache.semantic_cache_max_entries,
+                similarity_threshold=config.cache.semantic_cache_threshold,
+                ttl_seconds=config.cache.semantic_cache_ttl_seconds,
+                vectorizer=HashedNgramVectorizer(config.cache.semantic_cache_dimensions)
+            )
         
         logger.info(f"Agent initialized for {config.agent.practice_name}")
     
-    async def process_medical_consultation(self, user_text: str, conversation_history: List[dict] = None) -> str:
+    @staticmethod
+    def _create_llm_backend() -> LLMBackend:
+        """Create the configured LLM backend."""
+        if config.llm_backend.provider == "local":
+            logger.info("Using the local LLM backend; no Claude API calls will be made")
+            return LocalLLMBackend(
+                default_response=config.llm_backend.local_response,
+                canned_responses=config.llm_backend.local_canned_responses,
+                latency_distribution=config.llm_backend.local_latency_distribution,
+                latency_mean=config.llm_backend.local_latency_mean_ms / 1000,
+                latency_stddev=config.llm_backend.local_latency_stddev_ms / 1000,
+                chunk_chars=config.llm_backend.local_chunk_chars,
+                chunk_delay=config.llm_backend.local_chunk_delay_ms / 1000,
+                error_rate=config.llm_backend.local_error_rate,
+                error_status_codes=tuple(config.llm_backend.local_error_status_codes),
+                seed=config.llm_backend.local_seed
+            )
+        
+        # Retries are handled by the resilience layer, not the SDK
+        return AnthropicLLMBackend(
+            api_key=config.claude.api_key,
+            timeout=config.claude.request_timeout,
+            max_connections=config.claude.max_connections,
+            max_keepalive_connections=config.claude.max_keepalive_connections
+        )
+    
+    async def process_medical_consultation(self, user_text: str, conversation_history: List[dict] = None,
+                                           summary: Optional[ConversationSummary] = None,
+                                           skill_tags: Optional[List[str]] = None,
+                                           deadline: Optional[Deadline] = None) -> str:
         """
         Process a medical consultation request and generate professional response.
         
         Args:
             user_text: The user's medical consultation request
             conversation_history: Optional conversation context for multi-turn consultations
+            summary: Optional running summary replacing the older turns it covers
+            skill_tags: Optional skill tags supplied by the caller, used to detect acute work
+            deadline: Optional task deadline; waiting for Claude never runs past it
             
         Returns:
             Professional medical response text
+            
+        Raises:
+            TaskDeadlineExceeded: The task deadline ran out before Claude answered
         """
         try:
             # Validate input for security
@@ -60,15 +301,35 @@ class InterventionalCardiologyAgent:
                     "Please ask about our interventional cardiology services."
                 )
             
+            # Answer greetings and service catalog questions locally
+            fast_answer = self._fast_path_answer(user_text)
+            if fast_answer is not None:
+                return fast_answer
+            
+            # Serve repeat questions from the response cache
+            query_class = self.query_classifier.classify(user_text)
+            route = self._select_route(user_text, query_class)
+            cache_key = self._response_cache_key(user_text, conversation_history or [], route)
+            semantic_query = self._semantic_query(user_text, conversation_history, summary, query_class)
+            cached_response = await self._get_cached_response(cache_key, semantic_query, route)
+            if cached_response is not None:
+                return cached_response
+            
             # Build conversation context
-            messages = self._build_conversation_context(conversation_history or [], user_text)
+            messages = self._build_conversation_context(conversation_history or [], user_text, summary)
+            summary_text = summary.text if summary else None
+            lane = self._classify_urgency(user_text, skill_tags)
             
             # Generate medical response using Claude API
-            response_text = await self._generate_medical_response(messages)
+            response_text = await self._generate_medical_response(
+                messages, cache_key, summary_text, semantic_query, route, lane, deadline
+            )
             
             logger.debug(f"Generated medical response: {len(response_text)} characters")
             return response_text
             
+        except TaskDeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Error processing medical consultation: {str(e)}")
             return (
@@ -77,6 +338,283 @@ class InterventionalCardiologyAgent:
                 "our office directly."
             )
     
+    async def stream_medical_consultation(self, user_text: str, conversation_history: List[dict] = None,
+                                          summary: Optional[ConversationSummary] = None,
+                                          skill_tags: Optional[List[str]] = None,
+                                          deadline: Optional[Deadline] = None) -> AsyncIterator[str]:
+        """
+        Stream a medical consultation response as incremental text deltas.
+        
+        Args:
+            user_text: The user's medical consultation request
+            conversation_history: Optional conversation context for multi-turn consultations
+            summary: Optional running summary replacing the older turns it covers
+            skill_tags: Optional skill tags supplied by the caller, used to detect acute work
+            deadline: Optional task deadline; waiting for Claude never runs past it
+            
+        Yields:
+            Response text deltas in the order produced by Claude
+            
+        Raises:
+            TaskDeadlineExceeded: The task deadline ran out before the response finished
+        """
+        try:
+            # Validate input for security
+            if not self._validate_input_security(user_text):
+                yield (
+                    "I'm here to assist with medical information and coordination. "
+                    "Please ask about our interventional cardiology services."
+                )
+                return
+            
+            # Answer greetings and service catalog questions locally as a single delta
+            fast_answer = self._fast_path_answer(user_text)
+            if fast_answer is not None:
+                yield fast_answer
+                return
+            
+            # Serve repeat questions from the response cache as a single delta
+            query_class = self.query_classifier.classify(user_text)
+            route = self._select_route(user_text, query_class)
+            cache_key = self._response_cache_key(user_text, conversation_history or [], route)
+            semantic_query = self._semantic_query(user_text, conversation_history, summary, query_class)
+            cached_response = await self._get_cached_response(cache_key, semantic_query, route)
+            if cached_response is not None:
+                yield cached_response
+                return
+            
+            # Build conversation context
+            messages = self._build_conversation_context(conversation_history or [], user_text, summary)
+            summary_text = summary.text if summary else None
+            lane = self._classify_urgency(user_text, skill_tags)
+            
+            # Stream medical response deltas from Claude API
+            async for delta in self._stream_medical_response(
+                messages, cache_key, summary_text, semantic_query, route, lane, deadline
+            ):
+                yield delta
+            
+        except TaskDeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming medical consultation: {str(e)}")
+            yield (
+                "I apologize, but I'm experiencing technical difficulties. "
+                "Please try again later. For urgent medical matters, please contact "
+                "our office directly."
+            )
+    
+    def _fast_path_answer(self, user_text: str) -> Optional[str]:
+        """Return a templated answer if the query is a confidently matched catalog intent."""
+        if self.fast_path is None:
+            return None
+        match = self.fast_path.match(user_text)
+        if match is None:
+            return None
+        logger.info(f"Answering {match.intent} query from fast path (confidence {match.confidence:.2f})")
+        return match.answer
+    
+    def _select_route(self, user_text: str, query_class: Optional[str] = None) -> ModelRoute:
+        """Pick the model and max_tokens for a query (the deep model when routing is disabled)."""
+        if self.model_router is None:
+            return self.default_route
+        route = self.model_router.route(user_text, query_class)
+        logger.debug(f"Routing query to {route.name} ({route.model}, max_tokens={route.max_tokens})")
+        return route
+    
+    def _classify_urgency(self, user_text: str, skill_tags: Optional[List[str]] = None) -> str:
+        """Return the scheduler lane (acute or routine) for a consultation."""
+        if self.urgency_classifier is None:
+            return ROUTINE
+        lane = self.urgency_classifier.classify(user_text, skill_tags)
+        if lane != ROUTINE:
+            logger.info(f"Scheduling consultation in the {lane} lane")
+        return lane
+    
+    def _llm_slot(self, lane: str, deadline: Deadline,
+                  order_by: Optional[Deadline] = None) -> AsyncContextManager[None]:
+        """
+        Concurrency slot for an upstream Claude call in the given scheduler lane.
+        
+        The wait counts against deadline (the call's budget); queued calls are
+        admitted earliest order_by first, normally the deadline of the task served.
+        """
+        if self.scheduler is None:
+            return contextlib.nullcontext()
+        return self.scheduler.slot(lane, deadline, order_by)
+    
+    def _hedge_slot(self, lane: str) -> Optional[HedgeSlot]:
+        """Non-blocking scheduler slot for a hedged request in lane (None without a scheduler)."""
+        if self.scheduler is None:
+            return None
+        
+        def acquire() -> Optional[Callable[[], None]]:
+            if not self.scheduler.try_acquire(lane):
+                return None
+            return lambda: self.scheduler.release(lane)
+        
+        return acquire
+    
+    @staticmethod
+    def _wait_timeout(deadline: Optional[Deadline]) -> Optional[float]:
+        """
+        How long a caller may wait on a (possibly shared) upstream call.
+        
+        The upstream call itself only runs under the per-request budget, so the
+        circuit breaker never sees one caller's short task deadline as a backend
+        timeout and callers coalesced onto it are not bound by the leader's deadline.
+        """
+        return deadline.remaining() if deadline is not None else None
+    
+    @staticmethod
+    def _raise_if_task_expired(deadline: Optional[Deadline], error: Exception) -> None:
+        """Fail the task instead of answering when an upstream error came from its deadline running out."""
+        if deadline is not None and deadline.expired():
+            raise TaskDeadlineExceeded(f"Consultation deadline exceeded ({error})") from error
+    
+    async def _observe_upstream(self, call: Awaitable[LLMResponse],
+                                route: Optional[ModelRoute] = None) -> LLMResponse:
+        """
+        Await one non-streaming upstream attempt, reporting overloads and its latency to the scheduler.
+        
+        A whole response takes longer the more it says, so its latency is
+        reported per output token, against the baseline of its route. Calls
+        without a route (background summaries) only report overloads.
+        """
+        if self.scheduler is None:
+            return await call
+        started = time.monotonic()
+        try:
+            response = await call
+        except Exception as e:
+            self.scheduler.on_error(e)
+            raise
+        if route is not None:
+            self.scheduler.on_sample(
+                (time.monotonic() - started) / max(1, response.usage.output_tokens),
+                f"{route.name}/{PER_OUTPUT_TOKEN}"
+            )
+        return response
+    
+    def _record_route(self, route: ModelRoute, started: float, usage=None) -> None:
+        """Record per-route latency and token usage of an upstream response."""
+        if self.model_router is not None:
+            self.model_router.record(route, time.monotonic() - started, usage)
+    
+    def _response_cache_key(self, user_text: str, conversation_history: List[dict],
+                            route: ModelRoute) -> Optional[str]:
+        """Build the response cache key for a consultation, or None if caching is disabled."""
+        if self.response_cache is None:
+            return None
+        return ResponseCache.make_key(
+            user_text,
+            conversation_history,
+            f"{route.model}:{route.max_tokens}",
+            config.claude.temperature,
+            self.system_prompt_hash
+        )
+    
+    def _semantic_query(self, user_text: str, conversation_history: Optional[List[dict]],
+                        summary: Optional[ConversationSummary], query_class: str) -> Optional[str]:
+        """
+        The query to match semantically, or None when a paraphrase match is unsafe.
+        
+        Only first-turn queries without a clinical keyword are eligible: a clinical
+        answer is never reused for a differently worded question. Unrecognized
+        queries ("tell me about angioplasty") are eligible even though they take
+        the deep route; the cache's guard terms still keep numbers and polarity apart.
+        """
+        if self.semantic_cache is None or conversation_history or summary is not None:
+            return None
+        if query_class == CLINICAL:
+            return None
+        return user_text
+    
+    def _semantic_cache_namespace(self, route: ModelRoute) -> str:
+        """Fingerprint of the settings a semantically cached response was produced under."""
+        return f"{route.model}:{route.max_tokens}:{config.claude.temperature!r}:{self.system_prompt_hash}"
+    
+    async def _get_cached_response(self, cache_key: Optional[str], semantic_query: Optional[str],
+                             route: ModelRoute) -> Optional[str]:
+        """
+        Look up a cached response, first by exact key and then by semantic similarity.
+        
+        semantic_query is only set for first-turn, non-clinical queries, where
+        the question alone determines the answer.
+        """
+        if cache_key is not None:
+            cached_response = await self.response_cache.aget(cache_key)
+            if cached_response is not None:
+                logger.info("Serving consultation from response cache")
+                return cached_response
+        
+        if semantic_query is not None:
+            cached_response = self.semantic_cache.get(semantic_query, self._semantic_cache_namespace(route))
+            if cached_response is not None:
+                logger.info("Serving consultation from semantic cache")
+                return cached_response
+        
+        return None
+    
+    def _store_cached_response(self, cache_key: Optional[str], semantic_query: Optional[str], response_text: str,
+                               route: ModelRoute) -> None:
+        """
+        Store a successful Claude response in the response and semantic caches.
+        
+        semantic_query is only set for first-turn, non-clinical queries without a summary.
+        """
+        if not response_text:
+            return
+        if cache_key is not None:
+            self.response_cache.put(cache_key, response_text)
+        if self.semantic_cache is not None and semantic_query is not None:
+            self.semantic_cache.put(semantic_query, self._semantic_cache_namespace(route), response_text)
+    
+    async def _degraded_response(self, cache_key: Optional[str], semantic_query: Optional[str],
+                           route: ModelRoute) -> str:
+        """
+        Answer while the circuit breaker is open: a cached (possibly stale)
+        response if one exists, otherwise an immediate unavailability notice.
+        """
+        if cache_key is not None:
+            cached_response = await self.response_cache.aget(cache_key, allow_stale=True)
+            if cached_response is not None:
+                logger.info("Circuit open: serving consultation from response cache")
+                return cached_response
+        
+        if self.semantic_cache is not None and semantic_query is not None:
+            cached_response = self.semantic_cache.get(semantic_query, self._semantic_cache_namespace(route), allow_stale=True)
+            if cached_response is not None:
+                logger.info("Circuit open: serving consultation from semantic cache")
+                return cached_response
+        
+        return (
+            "My medical knowledge system is temporarily unavailable. "
+            "Please try again shortly, or contact our office directly for "
+            "immediate assistance with interventional cardiology services."
+        )
+    
+    def _fail_fast_if_open(self) -> None:
+        """Raise CircuitOpenError before queueing for a slot the breaker would not let the call use."""
+        if self.circuit_breaker is not None and self.circuit_breaker.is_open:
+            self.circuit_breaker.rejected += 1
+            raise CircuitOpenError("Claude circuit breaker is open")
+    
+    async def _call_with_breaker(self, fn):
+        """Run an upstream call through the circuit breaker, recording its outcome."""
+        if self.circuit_breaker is None:
+            return await fn()
+        
+        permit = self.circuit_breaker.before_call()
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.circuit_breaker.on_failure(permit, e)
+            raise
+        self.circuit_breaker.on_success(permit, time.monotonic() - started)
+        return result
+    
     def _validate_input_security(self, text: str) -> bool:
         """
         Validate input for security following medical AI best practices.
@@ -86,29 +624,38 @@ class InterventionalCardiologyAgent:
             logger.warning(f"Message too long: {len(text)} characters")
             return False
         
-        # Basic prompt injection detection
-        suspicious_patterns = [
-            "ignore previous instructions",
-            "disregard system prompt", 
-            "act as a different",
-            "pretend you are",
-            "override your instructions"
-        ]
-        
-        text_lower = text.lower()
-        for pattern in suspicious_patterns:
-            if pattern in text_lower:
+        # Prompt injection detection in a single pass over the message
+        if config.security.enable_prompt_injection_protection:
+            pattern = self.injection_scanner.scan(text)
+            if pattern is not None:
                 logger.warning(f"Potential prompt injection detected: {pattern}")
                 return False
         
         return True
     
-    def _build_conversation_context(self, conversation_history: List[dict], user_text: str) -> List[dict]:
-        """Build conversation context for Claude API from conversation history."""
+    def _build_conversation_context(self, conversation_history: List[dict], user_text: str,
+                                    summary: Optional[ConversationSummary] = None) -> List[dict]:
+        """
+        Build conversation context for Claude API from conversation history.
+        
+        History is limited to the configured token budget: the pinned first
+        exchange plus the newest turns that fit. Turns covered by a running
+        summary are replaced by the summary, which is sent with the system prompt.
+        """
         messages = []
         
-        # Add existing conversation history
-        for msg in conversation_history:
+        if summary is not None:
+            window = self.history_window.select(
+                conversation_history[summary.covered_turns:],
+                user_text,
+                reserved_tokens=estimate_tokens(summary.text),
+                pin_first_turn=False
+            )
+        else:
+            window = self.history_window.select(conversation_history, user_text)
+        
+        # Add existing conversation history within the token budget
+        for msg in window:
             if msg.get("role") in ["user", "assistant"] and msg.get("content"):
                 messages.append({
                     "role": msg["role"], 
@@ -120,25 +667,131 @@ class InterventionalCardiologyAgent:
         
         return messages
     
-    async def _generate_medical_response(self, messages: List[dict]) -> str:
+    def _build_request_params(self, messages: List[dict], summary_text: Optional[str] = None,
+                              route: Optional[ModelRoute] = None) -> dict:
+        """
+        Build Claude API request parameters, marking cacheable prompt prefixes.
+        
+        With prompt caching enabled the system prompt and the last prior
+        conversation turn carry cache breakpoints, so the static prompt and the
+        stable history prefix are billed at the cached rate on repeat turns.
+        A running conversation summary follows the cached system prompt.
+        
+        The API does not cache prefixes shorter than the model's minimum, so a
+        breakpoint is only set once the estimated prefix up to it reaches that
+        minimum. The default system prompt alone is well below it; caching
+        starts once a conversation's history makes the prefix long enough.
+        """
+        route = route or self.default_route
+        summary_block = None
+        if summary_text:
+            summary_block = f"SUMMARY OF EARLIER CONSULTATION TURNS:\n{summary_text}"
+        
+        if not config.claude.prompt_caching_enabled:
+            return {
+                "model": route.model,
+                "max_tokens": route.max_tokens,
+                "temperature": config.claude.temperature,
+                "system": f"{self.system_prompt}\n\n{summary_block}" if summary_block else self.system_prompt,
+                "messages": messages
+            }
+        
+        cache_control = {"type": "ephemeral"}
+        min_tokens = self._min_cacheable_tokens(route)
+        system = [{"type": "text", "text": self.system_prompt}]
+        if self.system_prompt_tokens >= min_tokens:
+            system[0]["cache_control"] = cache_control
+        prefix_tokens = self.system_prompt_tokens
+        if summary_block:
+            system.append({"type": "text", "text": summary_block})
+            prefix_tokens += estimate_tokens(summary_block)
+        
+        # The final message is the new user turn; everything before it is a stable prefix
+        cached_messages = list(messages)
+        if len(cached_messages) > 1:
+            prefix_tokens += sum(estimate_tokens(msg["content"]) + MESSAGE_OVERHEAD_TOKENS for msg in messages[:-1])
+        if len(cached_messages) > 1 and prefix_tokens >= min_tokens:
+            prefix_end = cached_messages[-2]
+            cached_messages[-2] = {
+                "role": prefix_end["role"],
+                "content": [{"type": "text", "text": prefix_end["content"], "cache_control": cache_control}]
+            }
+        
+        return {
+            "model": route.model,
+            "max_tokens": route.max_tokens,
+            "temperature": config.claude.temperature,
+            "system": system,
+            "messages": cached_messages
+        }
+    
+    @staticmethod
+    def _min_cacheable_tokens(route: ModelRoute) -> int:
+        """Shortest prompt prefix the API caches for the route's model."""
+        if "haiku" in route.model:
+            return 2 * config.claude.prompt_cache_min_tokens
+        return config.claude.prompt_cache_min_tokens
+    
+    def _request_fingerprint(self, messages: List[dict], summary_text: Optional[str] = None,
+                             route: Optional[ModelRoute] = None, lane: str = ROUTINE) -> str:
+        """
+        Fingerprint of a Claude request (messages plus model parameters) for coalescing.
+        
+        The scheduler lane is included so an urgent request never queues behind
+        a routine one that happened to start the shared call.
+        """
+        route = route or self.default_route
+        return hash_text(json.dumps({
+            "model": route.model,
+            "max_tokens": route.max_tokens,
+            "temperature": config.claude.temperature,
+            "system": self.system_prompt_hash,
+            "summary": summary_text,
+            "messages": messages,
+            "lane": lane
+        }, ensure_ascii=False))
+    
+    async def _generate_medical_response(self, messages: List[dict], cache_key: Optional[str] = None,
+                                         summary_text: Optional[str] = None,
+                                         semantic_query: Optional[str] = None,
+                                         route: Optional[ModelRoute] = None,
+                                         lane: str = ROUTINE,
+                                         deadline: Optional[Deadline] = None) -> str:
         """Generate professional medical response using Claude API."""
+        route = route or self.default_route
         try:
             logger.debug(f"Generating response for {len(messages)} conversation turns")
             
-            response = self.anthropic_client.messages.create(
-                model=config.claude.model,
-                max_tokens=config.claude.max_tokens,
-                temperature=config.claude.temperature,
-                system=self.system_prompt,
-                messages=messages
-            )
+            # Identical concurrent requests share a single upstream call
+            try:
+                response_text = await self.inflight_requests.do(
+                    self._request_fingerprint(messages, summary_text, route, lane),
+                    lambda: self._create_medical_response(messages, summary_text, route, lane, deadline),
+                    self._wait_timeout(deadline)
+                )
+            except asyncio.TimeoutError as e:
+                raise TaskDeadlineExceeded("Consultation deadline exceeded waiting for Claude") from e
             
-            response_text = response.content[0].text
-            logger.debug(f"Generated {len(response_text)} character response")
+            # Every caller caches under its own key, not just the one that made the call
+            self._store_cached_response(cache_key, semantic_query, response_text, route)
             
+            logger.debug(f"Generated {len(response_text)} character response")
             return response_text
             
-        except anthropic.APIError as e:
+        except TaskDeadlineExceeded:
+            raise
+        except CircuitOpenError:
+            return await self._degraded_response(cache_key, semantic_query, route)
+        except QueueWaitExceeded as e:
+            self._raise_if_task_expired(deadline, e)
+            logger.warning(str(e))
+            return (
+                "I'm handling an unusually high volume of consultations right now. "
+                "Please try again in a moment, or contact our office directly for "
+                "immediate assistance with interventional cardiology services."
+            )
+        except (anthropic.APIError, LLMBackendError, DeadlineExceeded) as e:
+            self._raise_if_task_expired(deadline, e)
             logger.error(f"Claude API error: {str(e)}")
             return (
                 "I'm experiencing connectivity issues with my medical knowledge system. "
@@ -153,9 +806,207 @@ class InterventionalCardiologyAgent:
                 "cardiology assistance."
             )
     
-    def should_create_artifact(self, response_text: str) -> bool:
+    async def _create_medical_response(self, messages: List[dict], summary_text: Optional[str] = None,
+                                       route: Optional[ModelRoute] = None,
+                                       lane: str = ROUTINE,
+                                       task_deadline: Optional[Deadline] = None) -> str:
         """
-        Determine if the response should be packaged as an artifact.
+        Make the upstream Claude call for a (possibly coalesced) request.
+        
+        A queued call is ordered by task_deadline, the deadline of the task that
+        made it (the first caller when coalesced).
+        """
+        route = route or self.default_route
+        params = self._build_request_params(messages, summary_text, route)
+        
+        # Time spent queued for a slot counts against the request deadline
+        call_deadline = Deadline(config.resilience.request_deadline_seconds)
+        self._fail_fast_if_open()
+        async with self._llm_slot(lane, call_deadline, task_deadline):
+            started = time.monotonic()
+            response = await self._call_with_breaker(lambda: self.llm_caller.call(
+                lambda timeout: self._observe_upstream(self.llm_backend.create(params, timeout), route),
+                call_deadline,
+                self._hedge_slot(lane)
+            ))
+        self.usage_stats.record(response.usage)
+        self._record_route(route, started, response.usage)
+        
+        return response.text
+    
+    async def _stream_medical_response(self, messages: List[dict], cache_key: Optional[str] = None,
+                                       summary_text: Optional[str] = None,
+                                       semantic_query: Optional[str] = None,
+                                       route: Optional[ModelRoute] = None,
+                                       lane: str = ROUTINE,
+                                       deadline: Optional[Deadline] = None) -> AsyncIterator[str]:
+        """Stream professional medical response deltas using Claude API."""
+        route = route or self.default_route
+        response_parts = []
+        streamed_chars = 0
+        try:
+            logger.debug(f"Streaming response for {len(messages)} conversation turns")
+            
+            # Identical concurrent requests subscribe to a single upstream stream
+            try:
+                async with contextlib.aclosing(self.inflight_requests.stream(
+                    self._request_fingerprint(messages, summary_text, route, lane),
+                    lambda: self._produce_medical_stream(messages, summary_text, route, lane, deadline),
+                    self._wait_timeout(deadline)
+                )) as deltas:
+                    async for text in deltas:
+                        response_parts.append(text)
+                        streamed_chars += len(text)
+                        yield text
+            except asyncio.TimeoutError as e:
+                raise TaskDeadlineExceeded("Consultation deadline exceeded waiting for Claude") from e
+            
+            # Every subscriber caches under its own key, not just the one that opened the stream
+            self._store_cached_response(cache_key, semantic_query, "".join(response_parts), route)
+            
+            logger.debug(f"Streamed {streamed_chars} character response")
+            
+        except TaskDeadlineExceeded:
+            raise
+        except CircuitOpenError:
+            yield await self._degraded_response(cache_key, semantic_query, route)
+        except QueueWaitExceeded as e:
+            self._raise_if_task_expired(deadline, e)
+            logger.warning(str(e))
+            yield (
+                ("\n\n" if streamed_chars else "") +
+                "I'm handling an unusually high volume of consultations right now. "
+                "Please try again in a moment, or contact our office directly for "
+                "immediate assistance with interventional cardiology services."
+            )
+        except (anthropic.APIError, LLMBackendError, DeadlineExceeded) as e:
+            self._raise_if_task_expired(deadline, e)
+            logger.error(f"Claude API streaming error after {streamed_chars} characters: {str(e)}")
+            yield (
+                ("\n\n" if streamed_chars else "") +
+                "I'm experiencing connectivity issues with my medical knowledge system. "
+                "Please try again in a moment, or contact our office directly for "
+                "immediate assistance with interventional cardiology services."
+            )
+    
+    async def _produce_medical_stream(self, messages: List[dict], summary_text: Optional[str] = None,
+                                      route: Optional[ModelRoute] = None,
+                                      lane: str = ROUTINE,
+                                      task_deadline: Optional[Deadline] = None) -> AsyncIterator[str]:
+        """
+        Stream the upstream Claude call for a (possibly coalesced) request.
+        
+        Consumed by the coalescing task rather than by any one subscriber, so a
+        subscriber that is canceled or disconnects does not end the stream for
+        the others. A queued call is ordered by task_deadline, as in
+        _create_medical_response.
+        """
+        route = route or self.default_route
+        params = self._build_request_params(messages, summary_text, route)
+        call_deadline = Deadline(config.resilience.request_deadline_seconds)
+        
+        # The slot is held for the whole stream; queue time counts against the deadline
+        self._fail_fast_if_open()
+        async with self._llm_slot(lane, call_deadline, task_deadline):
+            permit = self.circuit_breaker.before_call() if self.circuit_breaker is not None else None
+            
+            started = time.monotonic()
+            first_delta_latency = None
+            try:
+                async for text in self.llm_caller.stream(
+                    lambda timeout: self._open_llm_stream(params, timeout, route, started),
+                    call_deadline
+                ):
+                    if first_delta_latency is None:
+                        first_delta_latency = time.monotonic() - started
+                    yield text
+            except BaseException as e:
+                # Also releases a half-open probe slot if every subscriber went away mid-stream
+                if permit is not None:
+                    self.circuit_breaker.on_failure(permit, e)
+                raise
+            
+            # Stream health is judged on time to first delta
+            if permit is not None:
+                self.circuit_breaker.on_success(
+                    permit, first_delta_latency if first_delta_latency is not None else time.monotonic() - started
+                )
+    
+    async def _open_llm_stream(self, params: dict, timeout: float, route: ModelRoute,
+                               started: float) -> AsyncIterator[str]:
+        """
+        Open one backend stream and yield its text deltas, recording token usage at the end.
+        
+        Time to first delta is reported to the scheduler as the attempt's
+        latency, against the baseline of its route.
+        """
+        attempt_started = time.monotonic()
+        sampled = False
+        try:
+            # Closing this generator closes the backend stream and its connection
+            async with contextlib.aclosing(self.llm_backend.stream(params, timeout)) as stream:
+                async for item in stream:
+                    if isinstance(item, LLMResponse):
+                        self.usage_stats.record(item.usage)
+                        self._record_route(route, started, item.usage)
+                        continue
+                    if not sampled and self.scheduler is not None:
+                        self.scheduler.on_sample(time.monotonic() - attempt_started, f"{route.name}/{FIRST_TOKEN}")
+                    sampled = True
+                    yield item
+        except Exception as e:
+            if self.scheduler is not None:
+                self.scheduler.on_error(e)
+            raise
+    
+    async def summarize_conversation(self, previous_summary: Optional[str], turns: List[dict]) -> str:
+        """
+        Merge older consultation turns into a running clinical summary.
+        
+        Used by the background summarizer after a reply has been sent, so it
+        never adds latency to the user-visible turn.
+        
+        Args:
+            previous_summary: The existing running summary, if any
+            turns: Older turns that are no longer sent verbatim
+            
+        Returns:
+            Updated summary text
+        """
+        transcript = "\n\n".join(
+            f"{'Provider' if turn['role'] == 'user' else 'Assistant'}: {turn['content']}"
+            for turn in turns
+        )
+        prompt = (
+            "Update the running summary of this interventional cardiology consultation. "
+            "Preserve every clinically relevant detail: presenting problem, history, findings, "
+            "procedures discussed, medications, open questions and agreed next steps. "
+            "Reply with the summary only.\n\n"
+            f"CURRENT SUMMARY:\n{previous_summary or '(none)'}\n\n"
+            f"TURNS TO ADD:\n{transcript}"
+        )
+        
+        # Background work never takes capacity reserved for acute consultations, and
+        # queues behind any consultation waiting with it, whatever its task deadline
+        deadline = Deadline(config.resilience.request_deadline_seconds)
+        async with self._llm_slot(ROUTINE, deadline, Deadline(config.resilience.max_task_deadline_seconds)):
+            response = await self.llm_caller.call(
+                lambda timeout: self._observe_upstream(self.llm_backend.create({
+                    "model": config.claude.model,
+                    "max_tokens": config.conversation.summary_max_tokens,
+                    "temperature": 0,
+                    "messages": [{"role": "user", "content": prompt}]
+                }, timeout)),
+                deadline,
+                self._hedge_slot(ROUTINE)
+            )
+        self.usage_stats.record(response.usage)
+        
+        return response.text.strip()
+    
+    def classify_response(self, response_text: str) -> ArtifactDecision:
+        """
+        Decide artifact packaging and naming in a single pass over the response.
         
         Creates artifacts for substantial medical outputs like:
         - Detailed procedure explanations
@@ -167,37 +1018,36 @@ class InterventionalCardiologyAgent:
             response_text: The generated medical response
             
         Returns:
-            True if response should become an artifact
+            ArtifactDecision with the artifact flag and descriptive artifact name
         """
-        # Simple heuristics for artifact creation
-        artifact_indicators = [
-            len(response_text) > 500,  # Substantial responses
-            "procedure" in response_text.lower(),
-            "assessment" in response_text.lower(),
-            "recommendation" in response_text.lower(),
-            "treatment plan" in response_text.lower(),
-            "follow-up" in response_text.lower()
-        ]
-        
-        return any(artifact_indicators)
+        return self.response_classifier.classify(response_text)
+    
+    def should_create_artifact(self, response_text: str) -> bool:
+        """Determine if the response should be packaged as an artifact."""
+        return self.classify_response(response_text).create_artifact
     
     def get_artifact_name(self, response_text: str) -> str:
-        """
-        Generate appropriate artifact name based on response content.
-        
-        Args:
-            response_text: The medical response text
-            
-        Returns:
-            Descriptive artifact name
-        """
-        if "procedure" in response_text.lower():
-            return "procedure_information.md"
-        elif "assessment" in response_text.lower():
-            return "medical_assessment.md"
-        elif "treatment" in response_text.lower():
-            return "treatment_plan.md"
-        elif "follow-up" in response_text.lower():
-            return "follow_up_care.md"
-        else:
-            return "cardiology_consultation.md"
\ No newline at end of file
+        """Generate appropriate artifact name based on response content."""
+        return self.classify_response(response_text).artifact_name
+    
+    def stats(self) -> Dict[str, object]:
+        """Return token usage and the counters of every enabled component on the upstream call path."""
+        components = {
+            "llm_backend": self.llm_backend,
+            "llm_caller": self.llm_caller,
+            "circuit_breaker": self.circuit_breaker,
+            "model_router": self.model_router,
+            "scheduler": self.scheduler,
+            "response_cache": self.response_cache,
+            "semantic_cache": self.semantic_cache,
+            "fast_path": self.fast_path,
+            "coalescing": self.inflight_requests
+        }
+        # The Anthropic backend keeps no counters of its own
+        return {
+            "token_usage": self.usage_stats.as_dict(),
+            **{
+                name: component.stats() for name, component in components.items()
+                if component is not None and hasattr(component, "stats")
+            }
+        }
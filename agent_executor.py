@@ -8,22 +8,47 @@ This executor delegates medical business logic to InterventionalCardiologyAgent
 and focuses purely on A2A protocol integration and task lifecycle management.
 """
 
+import asyncio
+import ipaddress
 import logging
-from typing import List
+import math
+import uuid
+from typing import Dict, List, Optional, Tuple
 
 from a2a.server.agent_execution.agent_executor import AgentExecutor
 from a2a.server.agent_execution.context import RequestContext
 from a2a.server.events.event_queue import EventQueue
 from a2a.server.tasks import TaskUpdater
-from a2a.types import Message, Part, TextPart, TaskState
+from a2a.types import Message, Part, Role, Task, TextPart, TaskState
 from a2a.types import Artifact
 
+from admission import AdmissionController
 from agent import InterventionalCardiologyAgent
 from config import config
+from conversation import ConversationHistoryCache, ConversationSummary, RollingSummarizer
+from rate_limiter import TokenBucketLimiter
+from resilience import Deadline, TaskDeadlineExceeded
+from scheduler import ROUTINE
+from task_store import TieredTaskStore
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# How long cancel() waits for an in-flight consultation to unwind and publish its canceled state
+CANCEL_GRACE_SECONDS = 5.0
+
+
+class _InFlightConsultation:
+    """The running consultation of a task and whether cancellation was requested."""
+    
+    __slots__ = ("task", "finished", "cancel_requested")
+    
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.finished = asyncio.Event()
+        self.cancel_requested = False
+
+
 class InterventionalCardiologyExecutor(AgentExecutor):
     """
     A2A-compliant agent executor for Dr. Walter Reed's Interventional Cardiology Practice.
@@ -33,15 +58,61 @@ class InterventionalCardiologyExecutor(AgentExecutor):
     - Task state transitions and artifact generation
     - Delegation to InterventionalCardiologyAgent for medical logic
     - A2A protocol integration and compliance
+    
+    Args:
+        shared_store: Task store shared with the other worker processes, if any;
+            conversations are rebuilt from it when a turn lands on a worker
+            that has not seen the earlier ones
     """
     
-    def __init__(self):
+    def __init__(self, shared_store: Optional[TieredTaskStore] = None):
         """Initialize the interventional cardiology executor."""
         logger.info("Initializing Dr. Walter Reed's Interventional Cardiology Executor")
         
         # Initialize the core medical agent
         self.agent = InterventionalCardiologyAgent()
         
+        # Incremental conversation history per A2A context (a conversation spans several tasks)
+        self.history_cache = ConversationHistoryCache(config.conversation.history_cache_max_contexts)
+        self.shared_store = shared_store
+        
+        # Background compaction of older turns into a running summary per context
+        self.summarizer = None
+        if config.conversation.summarization_enabled:
+            self.summarizer = RollingSummarizer(
+                summarize=self.agent.summarize_conversation,
+                keep_recent_turns=config.conversation.summary_keep_recent_turns,
+                min_turns_to_compact=config.conversation.summary_min_turns_to_compact,
+                max_contexts=config.conversation.summary_cache_max_contexts,
+                persist=self._persist_summary if shared_store is not None else None
+            )
+        
+        # Per-caller token bucket enforcing RATE_LIMIT_RPM
+        self.rate_limiter = None
+        if config.security.rate_limit_enabled:
+            self.rate_limiter = TokenBucketLimiter(
+                requests_per_minute=config.security.rate_limit_requests_per_minute,
+                burst=config.security.rate_limit_burst,
+                max_keys=config.security.rate_limit_max_keys
+            )
+        self.trusted_proxies = [
+            ipaddress.ip_network(proxy, strict=False) for proxy in config.security.rate_limit_trusted_proxies
+        ]
+        
+        # Load shedding on in-flight consultations and upstream queue delay
+        self.admission = None
+        if config.scheduler.admission_control_enabled:
+            scheduler = self.agent.scheduler
+            self.admission = AdmissionController(
+                max_in_flight=config.scheduler.max_in_flight_consultations,
+                acute_headroom=config.scheduler.acute_admission_headroom,
+                max_queue_delay=config.scheduler.max_admission_queue_delay_seconds,
+                queue_delay=scheduler.queue_delay if scheduler is not None else None
+            )
+        
+        # Consultations currently running, by task ID, so cancel() can abort them
+        self._in_flight: Dict[str, _InFlightConsultation] = {}
+        
         logger.info(f"Executor initialized for {config.agent.practice_name}")
         logger.info(f"Services: {len(config.agent.primary_services)} primary, {len(config.agent.diagnostic_services)} diagnostic")
     
@@ -63,42 +134,82 @@ class InterventionalCardiologyExecutor(AgentExecutor):
         # Initialize TaskUpdater for proper A2A state management
         updater = TaskUpdater(event_queue, context.task_id, context.context_id)
         
+        # The task's time budget starts when the request arrives
+        deadline_seconds = self._task_deadline_seconds(context)
+        deadline = Deadline(deadline_seconds)
+        admitted = False
+        
         try:
             logger.info(f"Processing message for task {context.task_id}")
             
+            # Reject over-limit callers before any work is done for the task
+            if self.rate_limiter is not None:
+                caller = self._caller_key(context)
+                retry_after = self.rate_limiter.acquire(caller)
+                if retry_after:
+                    logger.warning(f"Rate limit exceeded for {caller}; rejecting task {context.task_id}")
+                    if math.isinf(retry_after):
+                        reason = "This agent is not accepting consultations (rate limit is 0 requests per minute)."
+                    else:
+                        reason = (
+                            f"Rate limit of {config.security.rate_limit_requests_per_minute} requests per minute "
+                            f"exceeded. Please retry in {math.ceil(retry_after)} seconds."
+                        )
+                    await updater.reject(message=updater.new_agent_message([Part(root=TextPart(text=reason))]))
+                    return
+            
+            # Shed load before any task events once the agent is saturated
+            if self.admission is not None:
+                decision = self.admission.admit(self._consultation_lane(context))
+                if not decision.admitted:
+                    logger.warning(f"Shedding task {context.task_id} ({decision.reason})")
+                    await updater.reject(message=updater.new_agent_message([Part(root=TextPart(text=(
+                        "I'm handling an unusually high volume of consultations right now. "
+                        f"Please retry in {math.ceil(decision.retry_after)} seconds, or contact our "
+                        "office directly for urgent medical matters."
+                    )))]))
+                    return
+                admitted = True
+            
             # Submit task if new, then start working
             if not context.current_task:
                 await updater.submit()
             await updater.start_work()
             
-            # Extract user input from message
-            user_text = self._extract_text_from_message(context.message)
-            if not user_text.strip():
-                user_text = "Hello"  # Default greeting
-            
-            logger.info(f"User query: {user_text[:100]}...")
-            
-            # Build conversation history for agent context
-            conversation_history = self._build_conversation_history(context.current_task)
+            # Run the consultation as its own task so cancel() can abort it
+            consultation = asyncio.create_task(self._run_consultation(context, updater, deadline))
+            in_flight = _InFlightConsultation(consultation)
+            self._in_flight[context.task_id] = in_flight
+            try:
+                # Bounds the whole consultation, including delivery of streamed chunks
+                await asyncio.wait_for(consultation, timeout=deadline.remaining())
+            except asyncio.TimeoutError as e:
+                raise TaskDeadlineExceeded("Consultation deadline exceeded") from e
+            except asyncio.CancelledError:
+                if not in_flight.cancel_requested or not consultation.cancelled():
+                    raise
+                await updater.cancel(message=updater.new_agent_message([Part(root=TextPart(
+                    text="The consultation was canceled at the caller's request."
+                ))]))
+                logger.info(f"Canceled task {context.task_id}")
+                return
+            finally:
+                if self._in_flight.get(context.task_id) is in_flight:
+                    del self._in_flight[context.task_id]
+                in_flight.finished.set()
             
-            # Delegate to medical agent for business logic
-            response_text = await self.agent.process_medical_consultation(
-                user_text, 
-                conversation_history
-            )
+            logger.info(f"Successfully completed task {context.task_id}")
             
-            # For now, let's just always send as status message to avoid artifact complexity
-            # We can add artifacts later once this works
+        except TaskDeadlineExceeded as e:
+            logger.warning(f"Task {context.task_id} exceeded its {deadline_seconds:g}s deadline: {str(e)}")
             await updater.update_status(
-                TaskState.working,  # Set state to working while processing response
-                message=updater.new_agent_message([Part(root=TextPart(text=response_text))])
+                TaskState.failed,
+                message=updater.new_agent_message([Part(root=TextPart(text=(
+                    f"This consultation could not be completed within its {deadline_seconds:g}-second "
+                    "time limit and was stopped. Please try again, or contact our office directly "
+                    "for urgent medical matters."
+                )))])
             )
-            
-            # Complete the task
-            await updater.complete()
-            
-            logger.info(f"Successfully completed task {context.task_id}")
-            
         except Exception as e:
             logger.error(f"Error processing task {context.task_id}: {str(e)}")
             
@@ -116,39 +227,322 @@ class InterventionalCardiologyExecutor(AgentExecutor):
             except Exception as cleanup_error:
                 logger.error(f"Error during cleanup: {str(cleanup_error)}")
                 raise e
+        finally:
+            if admitted:
+                self.admission.release()
+    
+    async def _run_consultation(self, context: RequestContext, updater: TaskUpdater, deadline: Deadline) -> None:
+        """Answer the task's message through the medical agent within deadline and complete the task."""
+        # Extract user input from message
+        user_text = self._extract_text_from_message(context.message)
+        if not user_text.strip():
+            user_text = "Hello"  # Default greeting
+        
+        logger.info(f"User query: {user_text[:100]}...")
+        
+        # Earlier turns of the conversation, recorded by the previous tasks in this context
+        conversation_history, summary = await self._load_conversation(context.context_id)
+        skill_tags = self._extract_skill_tags(context)
+        
+        # Delegate to medical agent for business logic, streaming deltas
+        # to subscribers as artifact chunks when streaming is enabled
+        if config.server.streaming_enabled:
+            response_text = await self._stream_consultation_artifact(
+                updater,
+                user_text,
+                conversation_history,
+                summary,
+                skill_tags,
+                deadline
+            )
+        else:
+            response_text = await self.agent.process_medical_consultation(
+                user_text, 
+                conversation_history,
+                summary,
+                skill_tags,
+                deadline
+            )
+            
+            # Package substantial medical outputs as a named artifact
+            decision = self.agent.classify_response(response_text)
+            if decision.create_artifact:
+                await updater.add_artifact(
+                    [Part(root=TextPart(text=response_text))],
+                    name=decision.artifact_name
+                )
+        
+        # Send the full response as a status message so it is recorded in task history
+        await updater.update_status(
+            TaskState.working,  # Set state to working while processing response
+            message=updater.new_agent_message([Part(root=TextPart(text=response_text))])
+        )
+        
+        # Complete the task
+        await updater.complete()
+        
+        # Record the exchange for the next task in this conversation
+        conversation_history = self.history_cache.record_turn(context.context_id, user_text, response_text)
+        
+        # Compact older turns in the background now that the reply has been sent
+        if self.summarizer:
+            self.summarizer.schedule(context.context_id, conversation_history)
+
+    
+    async def _load_conversation(self, context_id: str) -> Tuple[List[dict], Optional[ConversationSummary]]:
+        """
+        Return the earlier turns and running summary of a conversation.
+        
+        With a shared store, completed turns this worker has not recorded (served
+        by another worker, or before a restart) are appended from SQLite first,
+        together with the newest persisted summary. Turns other workers
+        completed within the last flush interval are not visible yet.
+        """
+        conversation_history = self.history_cache.get_history(context_id)
+        summary = self.summarizer.get(context_id) if self.summarizer else None
+        
+        if self.shared_store is not None:
+            try:
+                missed = await self.shared_store.completed_in_context(context_id, skip=len(conversation_history) // 2)
+                for task in missed:
+                    conversation_history = self.history_cache.record_turn(context_id, *self._task_exchange(task))
+                if missed:
+                    logger.info(f"Restored {len(missed)} turns of context {context_id} from the shared task store")
+                    if self.summarizer:
+                        stored = await self.shared_store.get_summary(context_id)
+                        if stored is not None:
+                            summary = self.summarizer.restore(
+                                context_id, ConversationSummary(text=stored[0], covered_turns=stored[1])
+                            )
+            except Exception as e:
+                logger.error(f"Error restoring conversation {context_id} from the shared task store: {str(e)}")
+        
+        if summary is not None and summary.covered_turns > len(conversation_history):
+            # The history was evicted after the summary was built
+            summary = None
+        return conversation_history, summary
+    
+    def _task_exchange(self, task: Task) -> Tuple[str, str]:
+        """The user message and the reply of a completed consultation task."""
+        user_text = ""
+        response_text = ""
+        for message in task.history or []:
+            if message.role == Role.user and not user_text:
+                user_text = self._extract_text_from_message(message)
+            elif message.role == Role.agent:
+                response_text = self._extract_text_from_message(message)
+        return user_text or "Hello", response_text
+    
+    async def _persist_summary(self, context_id: str, summary: ConversationSummary) -> None:
+        """Store a new running summary where the other workers can restore it."""
+        await self.shared_store.save_summary(context_id, summary.text, summary.covered_turns)
     
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
         """
         Handle task cancellation following A2A SDK patterns.
+        
+        Aborts the task's in-flight consultation: the upstream Claude request or
+        stream is cancelled and its concurrency slot released. The running
+        execute() then publishes the canceled state. With nothing in flight
+        the canceled state is published here.
         """
         logger.info(f"Canceling task {context.task_id}")
+        
+        in_flight = self._in_flight.get(context.task_id)
+        if in_flight is not None and not in_flight.task.done():
+            in_flight.cancel_requested = True
+            in_flight.task.cancel()
+            try:
+                await asyncio.wait_for(in_flight.finished.wait(), timeout=CANCEL_GRACE_SECONDS)
+                return
+            except asyncio.TimeoutError:
+                logger.warning(f"Task {context.task_id} did not stop within {CANCEL_GRACE_SECONDS}s of cancel")
+        
         # Use TaskUpdater for proper cancellation
         updater = TaskUpdater(event_queue, context.task_id, context.context_id)
-        # The A2A framework handles cancellation responses automatically
+        await updater.cancel(message=updater.new_agent_message([Part(root=TextPart(
+            text="The consultation was canceled at the caller's request."
+        ))]))
+    
+    async def drain(self, timeout: float) -> int:
+        """
+        Wait up to timeout seconds for in-flight consultations to finish.
+        
+        Called when the server process shuts down, after it has stopped
+        accepting requests.
+        
+        Returns:
+            Number of consultations still running when the timeout passed
+        """
+        if not self._in_flight:
+            return 0
+        
+        logger.info(f"Draining {len(self._in_flight)} in-flight consultations")
+        waiters = [asyncio.ensure_future(in_flight.finished.wait()) for in_flight in self._in_flight.values()]
+        _, pending = await asyncio.wait(waiters, timeout=timeout)
+        for waiter in pending:
+            waiter.cancel()
+        return len(self._in_flight)
+    
+    def stats(self) -> Dict[str, object]:
+        """Return in-flight consultations, admission and rate limiting counters, and the agent's stats."""
+        result = {"in_flight_consultations": len(self._in_flight)}
+        if self.admission is not None:
+            result["admission"] = self.admission.stats()
+        if self.rate_limiter is not None:
+            result["rate_limiter"] = self.rate_limiter.stats()
+        result.update(self.agent.stats())
+        return result
+    
+    async def _stream_consultation_artifact(self, updater: TaskUpdater, user_text: str, conversation_history: List[dict],
+                                            summary: Optional[ConversationSummary] = None,
+                                            skill_tags: Optional[List[str]] = None,
+                                            deadline: Optional[Deadline] = None) -> str:
+        """
+        Stream the agent's response deltas to subscribers as incremental artifact chunks.
+        
+        The first chunk creates the artifact and every following chunk is appended to it.
+        One delta is held back so the final chunk can be flagged with last_chunk.
+        
+        Returns:
+            The complete response text
+        """
+        artifact_id = str(uuid.uuid4())
+        response_parts = []
+        pending = None
+        
+        async for delta in self.agent.stream_medical_consultation(
+            user_text, conversation_history, summary, skill_tags, deadline
+        ):
+            if not delta:
+                continue
+            if pending is not None:
+                await updater.add_artifact(
+                    [Part(root=TextPart(text=pending))],
+                    artifact_id=artifact_id,
+                    name=config.artifacts.default_artifact_name,
+                    append=bool(response_parts),
+                    last_chunk=False
+                )
+                response_parts.append(pending)
+            pending = delta
+        
+        if pending is not None:
+            await updater.add_artifact(
+                [Part(root=TextPart(text=pending))],
+                artifact_id=artifact_id,
+                name=config.artifacts.default_artifact_name,
+                append=bool(response_parts),
+                last_chunk=True
+            )
+            response_parts.append(pending)
+        
+        return "".join(response_parts)
     
     def _extract_text_from_message(self, message: Message) -> str:
         """Extract text content from A2A message parts."""
         text_parts = []
         
         for part in message.parts:
-            # Simple direct access to text parts
-            if hasattr(part, 'text') and part.text:
-                text_parts.append(part.text.strip())
+            # Parts wrap their TextPart/FilePart/DataPart payload in `root`
+            part_content = getattr(part, 'root', part)
+            if isinstance(part_content, TextPart) and part_content.text:
+                text_parts.append(part_content.text.strip())
         
         return " ".join(text_parts)
     
-    def _build_conversation_history(self, current_task) -> List[dict]:
-        """Build conversation history for agent context from A2A task history."""
-        history = []
-        
-        # Extract conversation history from task if available
-        if current_task and current_task.history:
-            for msg in current_task.history:
-                content = self._extract_text_from_message(msg)
-                if content:
-                    if msg.role == "user":
-                        history.append({"role": "user", "content": content})
-                    elif msg.role == "agent":
-                        history.append({"role": "assistant", "content": content})
-        
-        return history
\ No newline at end of file
+    def _caller_key(self, context: RequestContext) -> str:
+        """
+        Identify the calling agent for rate limiting.
+        
+        Uses the authenticated user name, then the peer address. The configured
+        caller header and X-Forwarded-For are client-controlled, so they are only
+        honoured when the peer is one of RATE_LIMIT_TRUSTED_PROXIES; unidentified
+        callers share one key.
+        """
+        call_context = context.call_context
+        if call_context is None:
+            return "anonymous"
+        if call_context.user.is_authenticated and call_context.user.user_name:
+            return f"user:{call_context.user.user_name}"
+        
+        peer = call_context.state.get("client_host")
+        if not peer:
+            return "anonymous"
+        if not self._is_trusted_proxy(peer):
+            return f"ip:{peer}"
+        
+        headers = call_context.state.get("headers") or {}
+        caller = headers.get(config.security.rate_limit_key_header.lower())
+        if caller:
+            return f"agent:{caller}"
+        
+        # Walk X-Forwarded-For from the nearest hop; the first address not added
+        # by a trusted proxy is the client (earlier entries may be forged)
+        client = peer
+        for hop in reversed(headers.get("x-forwarded-for", "").split(",")):
+            hop = hop.strip()
+            if not hop:
+                continue
+            client = hop
+            if not self._is_trusted_proxy(hop):
+                break
+        return f"ip:{client}"
+    
+    def _is_trusted_proxy(self, address: str) -> bool:
+        """Whether address falls inside one of RATE_LIMIT_TRUSTED_PROXIES."""
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+    
+    def _extract_skill_tags(self, context: RequestContext) -> List[str]:
+        """
+        Collect caller-supplied skill tags from message and request metadata.
+        
+        Calling agents may send "skill_id" and "skill_tags" (or "tags") to say
+        which advertised skill a message is for.
+        """
+        skill_tags = []
+        for metadata in (context.message.metadata if context.message else None, context.metadata):
+            if not metadata:
+                continue
+            skill_id = metadata.get("skill_id")
+            if isinstance(skill_id, str):
+                skill_tags.append(skill_id)
+            for key in ("skill_tags", "tags"):
+                tags = metadata.get(key)
+                if isinstance(tags, str):
+                    skill_tags.append(tags)
+                elif isinstance(tags, list):
+                    skill_tags.extend(tag for tag in tags if isinstance(tag, str))
+        return skill_tags
+    
+    def _consultation_lane(self, context: RequestContext) -> str:
+        """Scheduler lane of the task's message, for admission decisions."""
+        if self.agent.urgency_classifier is None:
+            return ROUTINE
+        return self.agent.urgency_classifier.classify(
+            self._extract_text_from_message(context.message),
+            self._extract_skill_tags(context)
+        )
+    
+    def _task_deadline_seconds(self, context: RequestContext) -> float:
+        """
+        Time budget of a task in seconds.
+        
+        Calling agents may send "deadline_seconds" in message or request
+        metadata; requests are clamped to the configured minimum and maximum,
+        so a tiny budget cannot fail every consultation it touches.
+        """
+        for metadata in (context.message.metadata if context.message else None, context.metadata):
+            if not metadata:
+                continue
+            requested = metadata.get("deadline_seconds")
+            if isinstance(requested, (int, float)) and not isinstance(requested, bool) and requested > 0:
+                return min(
+                    max(float(requested), config.resilience.min_task_deadline_seconds),
+                    config.resilience.max_task_deadline_seconds
+                )
+        return config.resilience.task_deadline_seconds
@@ -0,0 +1,136 @@
+"""
+Cancel Storm Benchmark for Dr. Walter Reed's Interventional Cardiology Agent
+
+Fills every upstream concurrency slot (and the queue behind them) with slow
+consultations through the real A2A request path (DefaultRequestHandler ->
+InterventionalCardiologyExecutor -> agent) against the local LLM stand-in,
+then cancels all of them with tasks/cancel and sends a batch of fresh
+consultations. It reports how fast the slots come back and how long the
+fresh batch takes, next to the same run where the storm is left running
+(which is what a cancel that does not abort the upstream call amounts to).
+
+Usage:
+    python benchmarks/cancel_storm.py [--storm 64] [--probes 16] [--slots 16] [--latency-ms 2000]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_BACKEND", "local")
+os.environ.setdefault("LOCAL_LLM_LATENCY_DISTRIBUTION", "constant")
+os.environ.setdefault("LOCAL_LLM_CHUNK_DELAY_MS", "0")
+os.environ.setdefault("ADAPTIVE_CONCURRENCY_ENABLED", "false")
+os.environ.setdefault("ADMISSION_CONTROL_ENABLED", "false")
+os.environ.setdefault("ACUTE_RESERVED_SLOTS", "0")
+os.environ.setdefault("LLM_HEDGING_ENABLED", "false")
+os.environ.setdefault("LLM_MAX_QUEUE_WAIT_SECONDS", "600")
+os.environ.setdefault("TASK_DEADLINE_SECONDS", "600")
+
+from a2a.server.request_handlers.default_request_handler import DefaultRequestHandler  # noqa: E402
+from a2a.types import (  # noqa: E402
+    Message, MessageSendConfiguration, MessageSendParams, Part, Role, TaskIdParams, TaskState, TextPart
+)
+
+from agent_executor import InterventionalCardiologyExecutor  # noqa: E402
+from config import config  # noqa: E402
+from scheduler import ROUTINE  # noqa: E402
+from task_store import BoundedTaskStore  # noqa: E402
+
+
+def consultation(label: str, index: int, blocking: bool) -> MessageSendParams:
+    """A distinct clinical question, so neither the cache nor coalescing answers it."""
+    return MessageSendParams(
+        message=Message(
+            message_id=str(uuid.uuid4()),
+            role=Role.user,
+            parts=[Part(root=TextPart(text=(
+                f"Case {label}-{index}: outpatient with stable angina and a positive stress test, "
+                f"what are the options for revascularization and the expected recovery?"
+            )))]
+        ),
+        configuration=MessageSendConfiguration(blocking=blocking)
+    )
+
+
+async def wait_until(predicate, timeout: float = 10.0) -> float:
+    """Poll predicate until it holds; return the seconds waited."""
+    started = time.perf_counter()
+    while not predicate():
+        if time.perf_counter() - started > timeout:
+            raise TimeoutError("condition not reached")
+        await asyncio.sleep(0.001)
+    return time.perf_counter() - started
+
+
+async def run_scenario(args: argparse.Namespace, cancel: bool) -> None:
+    executor = InterventionalCardiologyExecutor()
+    handler = DefaultRequestHandler(agent_executor=executor, task_store=BoundedTaskStore(
+        max_tasks=10_000, ttl_seconds=3600, max_bytes=1 << 30
+    ))
+    scheduler = executor.agent.scheduler
+    backend = executor.agent.llm_backend
+
+    # Start the storm and let it take every slot
+    storm = [await handler.on_message_send(consultation("storm", i, blocking=False)) for i in range(args.storm)]
+    await wait_until(lambda: scheduler.stats()[ROUTINE]["active"] == min(args.slots, args.storm))
+    print(f"\n{'cancel storm' if cancel else 'storm left running'}: "
+          f"{args.storm} consultations, {scheduler.stats()[ROUTINE]['active']} slots busy, "
+          f"{scheduler.stats()[ROUTINE]['queued']} queued")
+
+    if cancel:
+        cancel_started = time.perf_counter()
+        results = await asyncio.gather(*(handler.on_cancel_task(TaskIdParams(id=task.id)) for task in storm))
+        cancel_seconds = time.perf_counter() - cancel_started
+        freed_seconds = cancel_seconds + await wait_until(lambda: scheduler.stats()[ROUTINE]["active"] == 0)
+        canceled = sum(1 for task in results if task.status.state == TaskState.canceled)
+        print(f"  {canceled}/{args.storm} tasks canceled in {cancel_seconds * 1000:.1f} ms, "
+              f"all slots free after {freed_seconds * 1000:.1f} ms")
+        print(f"  in-flight consultations left: {len(executor._in_flight)}")
+
+    # Fresh consultations arriving right after the storm
+    probe_latencies = []
+
+    async def probe(index: int) -> None:
+        started = time.perf_counter()
+        task = await handler.on_message_send(consultation("probe", index, blocking=True))
+        assert task.status.state == TaskState.completed, task.status.state
+        probe_latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(probe(i) for i in range(args.probes)))
+    print(f"  {args.probes} fresh consultations: p50 {statistics.median(probe_latencies):.2f}s, "
+          f"max {max(probe_latencies):.2f}s")
+    print(f"  upstream calls started: {backend.calls}")
+
+    # Let a storm left running finish so the next scenario starts clean
+    await wait_until(lambda: not executor._in_flight, timeout=600)
+
+
+async def run(args: argparse.Namespace) -> None:
+    config.scheduler.max_concurrent_llm_calls = args.slots
+    config.llm_backend.local_latency_mean_ms = args.latency_ms
+    print(f"{args.slots} upstream slots, {args.latency_ms:.0f} ms per local LLM call")
+    await run_scenario(args, cancel=False)
+    await run_scenario(args, cancel=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storm", type=int, default=64, help="consultations started and then canceled")
+    parser.add_argument("--probes", type=int, default=16, help="fresh consultations sent after the storm")
+    parser.add_argument("--slots", type=int, default=16, help="upstream concurrency limit")
+    parser.add_argument("--latency-ms", type=float, default=2000, help="local LLM latency per call")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Conversation History Benchmark for Dr. Walter Reed's Interventional Cardiology Agent
+
+Runs 200-turn conversations through the real A2A request path
+(DefaultRequestHandler -> InterventionalCardiologyExecutor -> agent) against
+the local LLM stand-in. Every turn is a new task in the same context, as A2A
+multi-turn clients send them. It reports per-turn latency at the start and
+the end of the conversation, and compares the executor's incremental history
+with rebuilding the history from every earlier task in the task store on each
+turn.
+
+Usage:
+    python benchmarks/conversation_history.py [--turns 200] [--conversations 5]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_BACKEND", "local")
+os.environ.setdefault("LOCAL_LLM_LATENCY_MEAN_MS", "0")
+os.environ.setdefault("LOCAL_LLM_CHUNK_DELAY_MS", "0")
+
+from a2a.server.request_handlers.default_request_handler import DefaultRequestHandler  # noqa: E402
+from a2a.types import Message, MessageSendParams, Part, Role, TextPart  # noqa: E402
+
+from agent_executor import InterventionalCardiologyExecutor  # noqa: E402
+from task_store import BoundedTaskStore  # noqa: E402
+
+
+def consultation_message(turn: int, context_id: str) -> MessageSendParams:
+    """A distinct clinical follow-up question, so no cache answers it."""
+    return MessageSendParams(message=Message(
+        message_id=str(uuid.uuid4()),
+        role=Role.user,
+        context_id=context_id,
+        parts=[Part(root=TextPart(text=(
+            f"Follow-up {turn}: the patient's troponin trend and ECG changes after stenting "
+            f"on day {turn}, should we adjust the antiplatelet plan?"
+        )))]
+    ))
+
+
+def rebuild_from_task_store(executor: InterventionalCardiologyExecutor, tasks) -> list:
+    """The non-incremental alternative: re-extract every earlier task of the context."""
+    turns = []
+    for task in tasks:
+        for message in task.history or []:
+            content = executor._extract_text_from_message(message)
+            if content:
+                turns.append({"role": "user" if message.role == Role.user else "assistant", "content": content})
+        if task.status.message is not None:
+            turns.append({"role": "assistant", "content": executor._extract_text_from_message(task.status.message)})
+    return turns
+
+
+async def run(turns: int, conversations: int) -> None:
+    executor = InterventionalCardiologyExecutor()
+    store = BoundedTaskStore(max_tasks=turns * conversations + 1, ttl_seconds=3600, max_bytes=1 << 30)
+    handler = DefaultRequestHandler(agent_executor=executor, task_store=store)
+
+    early, late = [], []
+    rebuild_seconds = 0.0
+    started = time.perf_counter()
+    for _ in range(conversations):
+        context_id = str(uuid.uuid4())
+        tasks = []
+        for turn in range(turns):
+            turn_started = time.perf_counter()
+            task = await handler.on_message_send(consultation_message(turn, context_id))
+            elapsed = time.perf_counter() - turn_started
+            if turn < 10:
+                early.append(elapsed)
+            elif turn >= turns - 10:
+                late.append(elapsed)
+
+            # Cost the executor would pay per turn without the incremental history
+            rebuild_started = time.perf_counter()
+            rebuild_from_task_store(executor, tasks)
+            rebuild_seconds += time.perf_counter() - rebuild_started
+            tasks.append(task)
+
+        history = executor.history_cache.get_history(context_id)
+        assert len(history) == 2 * turns, len(history)
+    total = time.perf_counter() - started
+
+    print(f"{conversations} conversations x {turns} turns through DefaultRequestHandler")
+    print(f"  total {total:.2f}s, {conversations * turns / total:.0f} turns/s")
+    print(f"  turn latency p50: turns 1-10 {statistics.median(early) * 1000:.2f} ms, "
+          f"turns {turns - 9}-{turns} {statistics.median(late) * 1000:.2f} ms")
+    print(f"  history recorded per context: {2 * turns} turns")
+    print(f"  rebuilding history from earlier tasks every turn would add "
+          f"{rebuild_seconds / conversations * 1000:.1f} ms per conversation "
+          f"({rebuild_seconds / (conversations * turns) * 1000:.3f} ms per turn on average)")
+    if executor.summarizer is not None:
+        await asyncio.sleep(0.1)
+        print(f"  upstream calls (consultations and background summaries): {executor.agent.llm_backend.calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--conversations", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.turns, args.conversations))
+
+
+if __name__ == "__main__":
+    main()
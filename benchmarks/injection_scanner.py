@@ -0,0 +1,103 @@
+"""
+Prompt Injection Scanner Benchmark for Dr. Walter Reed's Interventional Cardiology Agent
+
+Times PromptInjectionScanner.scan() against the check it replaced (lowercase
+the message, then one substring test per pattern) over growing pattern counts
+and message sizes. Messages are clinical text with no injection in them, the
+common case and the worst one for both checks, since every pattern has to be
+ruled out over the whole message. Patterns beyond the configured defaults are
+generated phrases in the same style.
+
+Usage:
+    python benchmarks/injection_scanner.py [--patterns 5,50,500] [--sizes 1000,10000,100000] [--repeat 200]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from typing import Callable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config  # noqa: E402
+from injection_scanner import PromptInjectionScanner  # noqa: E402
+
+VERBS = ["ignore", "disregard", "forget", "override", "bypass", "reveal", "pretend", "act as"]
+OBJECTS = ["previous", "prior", "system", "all", "your", "the above", "hidden", "developer"]
+NOUNS = ["instructions", "prompt", "rules", "guidelines", "policy", "constraints", "messages", "context"]
+
+CLINICAL_TEXT = (
+    "Referral for a 68-year-old with stable angina, a positive exercise stress test and "
+    "moderate left anterior descending stenosis on CT angiography. Current medications are "
+    "aspirin, atorvastatin and metoprolol. Please advise on revascularization options, "
+    "expected recovery after stenting and when the patient may resume driving. "
+)
+
+
+def make_patterns(count: int) -> List[str]:
+    """The configured patterns, topped up with generated ones to count."""
+    patterns = list(dict.fromkeys(config.security.prompt_injection_patterns))[:count]
+    rng = random.Random(count)
+    while len(patterns) < count:
+        phrase = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(NOUNS)} {len(patterns)}"
+        patterns.append(phrase)
+    return patterns
+
+
+def make_message(size: int) -> str:
+    return (CLINICAL_TEXT * (size // len(CLINICAL_TEXT) + 1))[:size]
+
+
+def substring_check(patterns: List[str], text: str) -> Optional[str]:
+    """The check PromptInjectionScanner replaced."""
+    suspicious_patterns = list(patterns)
+    text_lower = text.lower()
+    for pattern in suspicious_patterns:
+        if pattern in text_lower:
+            return pattern
+    return None
+
+
+def time_per_call(fn: Callable[[], object], repeat: int) -> float:
+    """Mean seconds per call of fn over repeat calls."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def run(args: argparse.Namespace) -> None:
+    counts = [int(count) for count in args.patterns.split(",")]
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"{'patterns':>8} {'chars':>8} {'substring loop':>15} {'scanner':>10} {'speedup':>8}")
+    for count in counts:
+        patterns = make_patterns(count)
+        build_started = time.perf_counter()
+        scanner = PromptInjectionScanner(patterns)
+        build_seconds = time.perf_counter() - build_started
+        for size in sizes:
+            text = make_message(size)
+            assert scanner.scan(text) is None and substring_check(patterns, text) is None
+            repeat = max(1, args.repeat * 1000 // max(size, 1000))
+            loop = time_per_call(lambda: substring_check(patterns, text), repeat)
+            compiled = time_per_call(lambda: scanner.scan(text), repeat)
+            print(f"{count:>8} {size:>8} {loop * 1e6:>12.1f} us {compiled * 1e6:>7.1f} us {loop / compiled:>7.1f}x")
+        print(f"{'':>8} scanner built once in {build_seconds * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patterns", default="5,50,500", help="comma-separated pattern counts")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated message sizes in characters")
+    parser.add_argument("--repeat", type=int, default=200, help="scans per measurement of a 1000-character message")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
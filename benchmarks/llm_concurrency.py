@@ -0,0 +1,101 @@
+"""
+LLM Concurrency Benchmark for Dr. Walter Reed's Interventional Cardiology Agent
+
+Sends distinct consultations through InterventionalCardiologyAgent against the
+local LLM stand-in with 1, 4, 16, ... requests in flight, and reports
+throughput and latency for each in-flight count. With the async backend,
+throughput grows with the number of requests in flight until the upstream
+concurrency limit; the same run against a backend that blocks the event loop
+for each call (what the synchronous Anthropic client amounted to) stays at
+one call per latency period however many requests are in flight.
+
+Usage:
+    python benchmarks/llm_concurrency.py [--in-flight 1,4,16,64] [--requests 128] [--latency-ms 200]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_BACKEND", "local")
+os.environ.setdefault("LOCAL_LLM_LATENCY_DISTRIBUTION", "constant")
+os.environ.setdefault("LOCAL_LLM_CHUNK_DELAY_MS", "0")
+os.environ.setdefault("ADAPTIVE_CONCURRENCY_ENABLED", "false")
+os.environ.setdefault("ADMISSION_CONTROL_ENABLED", "false")
+os.environ.setdefault("LLM_HEDGING_ENABLED", "false")
+os.environ.setdefault("LLM_MAX_QUEUE_WAIT_SECONDS", "600")
+
+from agent import InterventionalCardiologyAgent  # noqa: E402
+from config import config  # noqa: E402
+from llm_backend import LLMResponse, LocalLLMBackend  # noqa: E402
+
+
+class BlockingLocalLLMBackend(LocalLLMBackend):
+    """Local stand-in that sleeps on the event loop thread, like a synchronous client call."""
+
+    async def create(self, params: dict, timeout: float) -> LLMResponse:
+        self.calls += 1
+        time.sleep(self._latency())
+        return self._respond(params)
+
+
+async def run_level(agent: InterventionalCardiologyAgent, in_flight: int, requests: int,
+                    label: str) -> None:
+    """Answer requests distinct consultations with in_flight of them running at once."""
+    latencies = []
+    next_index = iter(range(requests))
+
+    async def client() -> None:
+        for index in next_index:
+            started = time.perf_counter()
+            await agent.process_medical_consultation(
+                f"Case {label}-{in_flight}-{index}: outpatient with stable angina and a positive "
+                f"stress test, what are the options for revascularization?"
+            )
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(in_flight)))
+    elapsed = time.perf_counter() - started
+    print(f"  {in_flight:>4} in flight: {requests / elapsed:8.1f} req/s, "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms, max {max(latencies) * 1000:7.1f} ms")
+
+
+async def run(args: argparse.Namespace) -> None:
+    levels = [int(level) for level in args.in_flight.split(",")]
+    config.scheduler.max_concurrent_llm_calls = max(levels)
+    config.llm_backend.local_latency_mean_ms = args.latency_ms
+    print(f"{args.requests} consultations per level, {args.latency_ms:.0f} ms per local LLM call, "
+          f"upstream limit {max(levels)}")
+
+    for label, blocking in (("async backend", False), ("blocking backend", True)):
+        print(f"\n{label}:")
+        agent = InterventionalCardiologyAgent()
+        if blocking:
+            agent.llm_backend = BlockingLocalLLMBackend(
+                default_response=config.llm_backend.local_response,
+                latency_mean=args.latency_ms / 1000
+            )
+        for in_flight in levels:
+            await run_level(agent, in_flight, args.requests, label.split()[0])
+        await agent.llm_backend.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--in-flight", default="1,4,16,64", help="comma-separated requests kept in flight")
+    parser.add_argument("--requests", type=int, default=128, help="consultations per in-flight level")
+    parser.add_argument("--latency-ms", type=float, default=200, help="local LLM latency per call")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
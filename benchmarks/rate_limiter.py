@@ -0,0 +1,95 @@
+"""
+Rate Limiter Benchmark for Dr. Walter Reed's Interventional Cardiology Agent
+
+Drives TokenBucketLimiter with 100k distinct caller keys and reports:
+- first-acquire latency, when every call creates a bucket
+- steady-state latency, when calls land on random existing buckets
+- memory per tracked key (the bucket and its OrderedDict entry, not the key string)
+- idle eviction: once every bucket has gone idle long enough to refill, the
+  next request drops all of them, and the cost per evicted key
+
+Usage:
+    python benchmarks/rate_limiter.py [--keys 100000] [--rpm 60] [--burst 10]
+"""
+
+import argparse
+import gc
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import TokenBucketLimiter  # noqa: E402
+
+
+def report(label: str, samples_ns: List[int]) -> None:
+    samples = sorted(samples_ns)
+    p99 = samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+    print(f"  {label:<22} mean {statistics.fmean(samples) / 1000:6.2f} us, "
+          f"p50 {samples[len(samples) // 2] / 1000:6.2f} us, p99 {p99 / 1000:6.2f} us")
+
+
+def timed_acquires(limiter: TokenBucketLimiter, keys: List[str]) -> List[int]:
+    """Acquire once for each key in order, returning each call's duration in nanoseconds."""
+    samples = []
+    clock = time.perf_counter_ns
+    for key in keys:
+        started = clock()
+        limiter.acquire(key)
+        samples.append(clock() - started)
+    return samples
+
+
+def run(args: argparse.Namespace) -> None:
+    keys = [f"agent-{index:06d}.partner-clinic.example" for index in range(args.keys)]
+    print(f"{args.keys} keys, {args.rpm:g} requests/minute, burst {args.burst}")
+
+    limiter = TokenBucketLimiter(args.rpm, args.burst, max_keys=args.keys)
+    report("first acquire", timed_acquires(limiter, keys))
+    rng = random.Random(0)
+    report("steady state", timed_acquires(limiter, [rng.choice(keys) for _ in range(args.keys)]))
+    print(f"  tracked keys {len(limiter)}, allowed {limiter.allowed}, limited {limiter.limited}")
+
+    # Bucket memory, with the key strings already allocated outside the measurement
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    measured = TokenBucketLimiter(args.rpm, args.burst, max_keys=args.keys)
+    for key in keys:
+        measured.acquire(key)
+    per_key = (tracemalloc.get_traced_memory()[0] - before) / args.keys
+    tracemalloc.stop()
+    print(f"  memory                 {per_key:6.1f} bytes per key")
+
+    # A rate that refills a bucket within a fraction of a second, so the wait stays short
+    eviction = TokenBucketLimiter(args.burst * 60 / 0.2, args.burst, max_keys=args.keys)
+    for key in keys:
+        eviction.acquire(key)
+    time.sleep(eviction.idle_seconds)
+    started = time.perf_counter_ns()
+    eviction.acquire("newcomer")
+    elapsed = time.perf_counter_ns() - started
+    print(f"  idle eviction          {eviction.evictions} keys dropped by one request in "
+          f"{elapsed / 1e6:.1f} ms ({elapsed / max(1, eviction.evictions):.0f} ns per key), "
+          f"{len(eviction)} key left")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=100_000, help="distinct caller keys")
+    parser.add_argument("--rpm", type=float, default=60, help="requests per minute allowed per key")
+    parser.add_argument("--burst", type=int, default=10, help="bucket capacity")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Task Store Latency Benchmark for Dr. Walter Reed's Interventional Cardiology Agent
+
+Compares save and get latency of the SDK's InMemoryTaskStore, BoundedTaskStore
+and TieredTaskStore (memory tier over SQLite in WAL mode) on consultation-sized
+tasks. For the tiered store it also measures reads that miss the memory tier
+and go to SQLite, as they do after a restart or for a task saved by another
+worker, and how many transactions the background writer used to persist the saves.
+
+Usage:
+    python benchmarks/task_store_latency.py [--tasks 20000]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2a.server.tasks import InMemoryTaskStore  # noqa: E402
+from a2a.types import Message, Part, Role, Task, TaskState, TaskStatus, TextPart  # noqa: E402
+
+from config import config  # noqa: E402
+from task_store import BoundedTaskStore, TieredTaskStore  # noqa: E402
+
+ANSWER = (
+    "Recovery after elective PCI with stent placement is usually quick: most patients go home the next "
+    "day and return to desk work within a week. Dual antiplatelet therapy must not be interrupted. "
+) * 4
+
+
+def make_tasks(count: int) -> list:
+    """Completed consultation tasks with a question and an answer in their history."""
+    tasks = []
+    for index in range(count):
+        task_id = str(uuid.uuid4())
+        question = Message(
+            message_id=str(uuid.uuid4()), role=Role.user, task_id=task_id,
+            parts=[Part(root=TextPart(text=f"Consultation {index}: what is the recovery after elective PCI?"))]
+        )
+        answer = Message(message_id=str(uuid.uuid4()), role=Role.agent, task_id=task_id,
+                         parts=[Part(root=TextPart(text=ANSWER))])
+        tasks.append(Task(id=task_id, context_id=str(uuid.uuid4()), history=[question],
+                          status=TaskStatus(state=TaskState.completed, message=answer)))
+    return tasks
+
+
+def bounded_store(tasks: int) -> BoundedTaskStore:
+    return BoundedTaskStore(
+        max_tasks=tasks,
+        ttl_seconds=config.task_store.task_store_ttl_seconds,
+        max_bytes=1 << 32,
+        active_ttl_seconds=config.task_store.task_store_active_ttl_seconds
+    )
+
+
+def tiered_store(path: str, tasks: int) -> TieredTaskStore:
+    return TieredTaskStore(
+        bounded_store(tasks),
+        path,
+        batch_size=config.task_store.task_store_batch_size,
+        flush_interval=config.task_store.task_store_flush_interval_seconds,
+        retention_seconds=config.task_store.task_store_retention_seconds
+    )
+
+
+async def timed(operation, items) -> list:
+    """Latency of operation(item) for each item, in microseconds."""
+    latencies = []
+    for item in items:
+        started = time.perf_counter()
+        await operation(item)
+        latencies.append((time.perf_counter() - started) * 1e6)
+        # Yield between operations, as a server does, so background flushes run
+        await asyncio.sleep(0)
+    return latencies
+
+
+def report(name: str, latencies: list) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"  {name:<38} p50 {statistics.median(ordered):>8.1f} us   p99 {p99:>8.1f} us")
+
+
+async def run(count: int) -> None:
+    tasks = make_tasks(count)
+    task_ids = [task.id for task in tasks]
+    print(f"{count:,} completed consultation tasks, "
+          f"{len(tasks[0].model_dump_json(exclude_none=True)):,} bytes serialized each")
+
+    for name, store in (("InMemoryTaskStore", InMemoryTaskStore()), ("BoundedTaskStore", bounded_store(count))):
+        print(f"\n{name}")
+        report("save", await timed(store.save, tasks))
+        report("get", await timed(store.get, task_ids))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.db")
+        store = tiered_store(path, count)
+        print(f"\nTieredTaskStore (batch {store.batch_size}, flush every {store.flush_interval * 1000:g} ms)")
+        report("save", await timed(store.save, tasks))
+        report("get (memory tier)", await timed(store.get, task_ids))
+
+        flush_started = time.perf_counter()
+        await store.aclose()
+        print(f"  {store.rows_written:,} rows persisted in {store.flushes} transactions; "
+              f"final flush and close took {(time.perf_counter() - flush_started) * 1000:.1f} ms")
+
+        # A fresh store over the same file reads like a restarted or another worker
+        cold = tiered_store(path, count)
+        report("get (SQLite, cold memory tier)", await timed(cold.get, task_ids))
+        report("get (memory tier after cold read)", await timed(cold.get, task_ids))
+        await cold.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=20_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.tasks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Task Store Soak Test for Dr. Walter Reed's Interventional Cardiology Agent
+
+Pushes a million consultation-sized tasks through BoundedTaskStore, each
+saved as submitted, working and then completed with its question and answer
+in the history, and read back once. Resident memory is sampled as the run
+goes; with the store bounded it should level off once the store is full,
+while InMemoryTaskStore (run for a shorter stretch for comparison) grows with
+every task. Each store runs in its own process so neither inherits the
+other's heap.
+
+Usage:
+    python benchmarks/task_store_soak.py [--tasks 1000000] [--baseline-tasks 100000] [--store bounded|memory]
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import resource
+import subprocess
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2a.server.tasks import InMemoryTaskStore  # noqa: E402
+from a2a.types import Message, Part, Role, Task, TaskState, TaskStatus, TextPart  # noqa: E402
+
+from config import config  # noqa: E402
+from task_store import BoundedTaskStore  # noqa: E402
+
+ANSWER = (
+    "Recovery after elective PCI with stent placement is usually quick: most patients go home the next "
+    "day and return to desk work within a week. Dual antiplatelet therapy must not be interrupted. "
+) * 4
+
+
+def rss_mb() -> float:
+    """Current resident set size in MiB (peak on platforms without /proc)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1 << 20)
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def consult(store, index: int) -> None:
+    """Save one consultation through its lifecycle, then read the result back."""
+    task_id = str(uuid.uuid4())
+    question = Message(
+        message_id=str(uuid.uuid4()), role=Role.user, task_id=task_id,
+        parts=[Part(root=TextPart(text=f"Consultation {index}: what is the recovery after elective PCI?"))]
+    )
+    task = Task(id=task_id, context_id=str(uuid.uuid4()), status=TaskStatus(state=TaskState.submitted),
+                history=[question])
+    await store.save(task)
+
+    task = task.model_copy(update={"status": TaskStatus(state=TaskState.working)})
+    await store.save(task)
+
+    answer = Message(message_id=str(uuid.uuid4()), role=Role.agent, task_id=task_id,
+                     parts=[Part(root=TextPart(text=ANSWER))])
+    task = task.model_copy(update={"status": TaskStatus(state=TaskState.completed, message=answer)})
+    await store.save(task)
+    await store.get(task_id)
+
+
+async def soak(name: str, store, tasks: int, samples: int = 10) -> None:
+    gc.collect()
+    started_rss = rss_mb()
+    started = time.perf_counter()
+    every = max(1, tasks // samples)
+
+    print(f"\n{name}: {tasks:,} tasks")
+    print(f"  {'tasks':>10}  {'RSS MiB':>8}  {'retained':>9}  {'tasks/s':>8}")
+    for index in range(1, tasks + 1):
+        await consult(store, index)
+        if index % every == 0:
+            gc.collect()
+            print(f"  {index:>10,}  {rss_mb():>8.1f}  {len(getattr(store, 'tasks', store)):>9,}  "
+                  f"{index / (time.perf_counter() - started):>8,.0f}")
+    print(f"  RSS grew {rss_mb() - started_rss:.1f} MiB")
+    if isinstance(store, BoundedTaskStore):
+        print(f"  {store.stats()}")
+
+
+async def run(store_name: str, tasks: int) -> None:
+    if store_name == "memory":
+        await soak("InMemoryTaskStore", InMemoryTaskStore(), tasks)
+        return
+
+    bounded = BoundedTaskStore(
+        max_tasks=config.task_store.task_store_max_tasks,
+        ttl_seconds=config.task_store.task_store_ttl_seconds,
+        max_bytes=config.task_store.task_store_max_bytes,
+        active_ttl_seconds=config.task_store.task_store_active_ttl_seconds
+    )
+    await soak(f"BoundedTaskStore (max_tasks={bounded.max_tasks:,})", bounded, tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--baseline-tasks", type=int, default=100_000,
+                        help="tasks pushed through InMemoryTaskStore for comparison (0 to skip)")
+    parser.add_argument("--store", choices=("bounded", "memory"),
+                        help="soak only this store in this process")
+    args = parser.parse_args()
+
+    if args.store is None:
+        runs = [("bounded", args.tasks)] + ([("memory", args.baseline_tasks)] if args.baseline_tasks else [])
+        for store_name, tasks in runs:
+            subprocess.run([sys.executable, __file__, "--store", store_name, "--tasks", str(tasks)], check=True)
+        return
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.store, args.tasks))
+
+
+if __name__ == "__main__":
+    main()
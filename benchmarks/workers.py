@@ -0,0 +1,169 @@
+"""
+Worker Scaling Benchmark for Dr. Walter Reed's Interventional Cardiology Agent
+
+Starts the real server (python __main__.py) with WORKERS=1, 2, 4, ... against
+the local LLM stand-in and a shared SQLite task store, drives it over HTTP
+with concurrent message/send requests for a fixed time, and reports requests
+per second and latency for each worker count. Every request is a distinct
+question, so the response cache does not answer it.
+
+Load is generated from separate processes so the client does not share an
+event loop with a worker. Scaling is bounded by the cores of the host, which
+the servers and load generators share: compare the printed core count with
+the worker counts before reading anything into the curve.
+
+Usage:
+    python benchmarks/workers.py [--workers 1,2,4] [--seconds 10] [--concurrency 64] [--latency-ms 50]
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def port_in_use(port: int) -> bool:
+    """Whether something is already listening on the port (a leftover server would skew results)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+def start_server(workers: int, port: int, latency_ms: float, directory: str) -> subprocess.Popen:
+    """Start the agent with the given worker count and wait until it accepts connections."""
+    env = dict(
+        os.environ,
+        WORKERS=str(workers),
+        PORT=str(port),
+        HOST="127.0.0.1",
+        LOG_LEVEL="warning",
+        LLM_BACKEND="local",
+        LOCAL_LLM_LATENCY_DISTRIBUTION="constant",
+        LOCAL_LLM_LATENCY_MEAN_MS=str(latency_ms),
+        TASK_STORE_BACKEND="sqlite",
+        TASK_STORE_PATH=os.path.join(directory, f"tasks-{workers}.db"),
+        RATE_LIMIT_ENABLED="false",
+        ADMISSION_CONTROL_ENABLED="false"
+    )
+    server = subprocess.Popen([sys.executable, "__main__.py"], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while not port_in_use(port):
+        if server.poll() is not None or time.monotonic() > deadline:
+            server.kill()
+            raise RuntimeError(f"Server with {workers} workers did not start")
+        time.sleep(0.1)
+    # Every worker binds its own socket; give the rest a moment after the first listens
+    time.sleep(1.0 + 0.2 * workers)
+    return server
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    """Drain and stop the server, and make sure no worker outlives it."""
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+async def generate_load(port: int, seconds: float, concurrency: int) -> list:
+    """Send distinct consultations from concurrency clients for seconds; return latencies of successes."""
+    import httpx
+
+    url = f"http://127.0.0.1:{port}/"
+    latencies = []
+    stop_at = time.monotonic() + seconds
+
+    async def client(client_id: int) -> None:
+        async with httpx.AsyncClient(timeout=30) as http:
+            sequence = 0
+            while time.monotonic() < stop_at:
+                sequence += 1
+                started = time.perf_counter()
+                response = await http.post(url, json={
+                    "jsonrpc": "2.0", "id": sequence, "method": "message/send",
+                    "params": {"message": {
+                        "role": "user", "messageId": str(uuid.uuid4()),
+                        "parts": [{"kind": "text", "text": (
+                            f"Case {uuid.uuid4().hex[:8]}: recovery after elective PCI for patient "
+                            f"{client_id}-{sequence}?"
+                        )}]
+                    }}
+                })
+                if response.status_code == 200 and "result" in response.json():
+                    latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return latencies
+
+
+def load_process(port: int, seconds: float, concurrency: int, results) -> None:
+    logging.disable(logging.CRITICAL)
+    results.put(asyncio.run(generate_load(port, seconds, concurrency)))
+
+
+def measure(port: int, seconds: float, concurrency: int, processes: int) -> list:
+    """Run the load from several processes and collect every request latency."""
+    results = multiprocessing.Queue()
+    share = max(1, concurrency // processes)
+    loaders = [multiprocessing.Process(target=load_process, args=(port, seconds, share, results))
+               for _ in range(processes)]
+    for loader in loaders:
+        loader.start()
+    latencies = []
+    for _ in loaders:
+        latencies.extend(results.get())
+    for loader in loaders:
+        loader.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent clients in total")
+    parser.add_argument("--load-processes", type=int, default=2, help="processes generating load")
+    parser.add_argument("--latency-ms", type=float, default=50, help="local LLM latency per call")
+    parser.add_argument("--port", type=int, default=9899)
+    args = parser.parse_args()
+
+    if port_in_use(args.port):
+        sys.exit(f"Port {args.port} is already in use; stop the server listening on it first")
+
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    print(f"{os.cpu_count()} CPU cores, {args.concurrency} clients in {args.load_processes} processes, "
+          f"{args.latency_ms:g} ms local LLM latency, {args.seconds:g}s per run")
+    print(f"  {'workers':>7}  {'req/s':>8}  {'p50 ms':>8}  {'p99 ms':>8}  {'vs 1 worker':>11}")
+
+    baseline = None
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in worker_counts:
+            server = start_server(workers, args.port, args.latency_ms, directory)
+            try:
+                latencies = measure(args.port, args.seconds, args.concurrency, args.load_processes)
+            finally:
+                stop_server(server)
+
+            rps = len(latencies) / args.seconds
+            baseline = baseline or rps
+            ordered = sorted(latencies) or [0.0]
+            p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+            print(f"  {workers:>7}  {rps:>8.1f}  {statistics.median(ordered) * 1000:>8.1f}  "
+                  f"{p99 * 1000:>8.1f}  {rps / baseline:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
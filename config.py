@@ -11,8 +11,10 @@ Requirements:
 - Clear documentation for all configuration options
 """
 
+import json
+import math
 import os
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -95,6 +97,15 @@ class ServerConfig:
     debug: bool = os.getenv("DEBUG", "false").lower() == "true"
     log_level: str = os.getenv("LOG_LEVEL", "info")
     
+    # Worker processes sharing the port through SO_REUSEPORT, and how long a
+    # stopping worker waits for in-flight requests and consultations
+    workers: int = int(os.getenv("WORKERS", "1"))
+    drain_timeout_seconds: float = float(os.getenv("WORKER_DRAIN_TIMEOUT_SECONDS", "30"))
+    
+    # Path serving this worker's retry, routing, breaker and task store counters as JSON
+    # (empty disables it); with WORKERS > 1 each request is answered by one worker
+    stats_path: str = os.getenv("STATS_PATH", "/stats")
+    
     # A2A Protocol Configuration
     protocol_version: str = os.getenv("A2A_PROTOCOL_VERSION", "0.2.9")
     streaming_enabled: bool = os.getenv("STREAMING_ENABLED", "true").lower() == "true"
@@ -139,6 +150,16 @@ class ClaudeConfig:
     max_tokens: int = int(os.getenv("CLAUDE_MAX_TOKENS", "1500"))
     temperature: float = float(os.getenv("CLAUDE_TEMPERATURE", "0.3"))
     
+    # Connection Pool Configuration (shared async HTTP client)
+    max_connections: int = int(os.getenv("CLAUDE_MAX_CONNECTIONS", "100"))
+    max_keepalive_connections: int = int(os.getenv("CLAUDE_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    request_timeout: float = float(os.getenv("CLAUDE_REQUEST_TIMEOUT", "60"))
+    
+    # Prompt Caching Configuration (system prompt and stable conversation prefix)
+    prompt_caching_enabled: bool = os.getenv("CLAUDE_PROMPT_CACHING_ENABLED", "true").lower() == "true"
+    # Shortest prefix the API will cache (Haiku models need twice this); shorter breakpoints are not sent
+    prompt_cache_min_tokens: int = int(os.getenv("CLAUDE_PROMPT_CACHE_MIN_TOKENS", "1024"))
+    
     # System Prompt Configuration (configurable but with medical default)
     system_prompt_template: str = os.getenv("SYSTEM_PROMPT_TEMPLATE", """
 You are an AI agent representing {practice_name}.
@@ -180,6 +201,51 @@ Your responses should demonstrate deep knowledge of interventional cardiology wh
             raise ValueError("ANTHROPIC_API_KEY environment variable is required")
         return True
 
+@dataclass
+class LLMBackendConfig:
+    """Configuration for the language model backend (Claude or the local stand-in)"""
+    
+    # "anthropic" for Claude, "local" for the deterministic in-process stand-in
+    provider: str = os.getenv("LLM_BACKEND", "anthropic").lower()
+    
+    # Local stand-in responses ("{prompt}" is replaced by the last user message)
+    local_response: str = os.getenv(
+        "LOCAL_LLM_RESPONSE",
+        "This is a simulated interventional cardiology response from the local LLM backend to: {prompt}"
+    )
+    local_responses_file: str = os.getenv("LOCAL_LLM_RESPONSES_FILE", "")  # JSON object of keyword -> response
+    local_canned_responses: List[Tuple[str, str]] = None
+    
+    # Local stand-in latency (time to first token) and streaming cadence
+    local_latency_distribution: str = os.getenv("LOCAL_LLM_LATENCY_DISTRIBUTION", "lognormal")
+    local_latency_mean_ms: float = float(os.getenv("LOCAL_LLM_LATENCY_MEAN_MS", "200"))
+    local_latency_stddev_ms: float = float(os.getenv("LOCAL_LLM_LATENCY_STDDEV_MS", "100"))
+    local_chunk_chars: int = int(os.getenv("LOCAL_LLM_CHUNK_CHARS", "20"))
+    local_chunk_delay_ms: float = float(os.getenv("LOCAL_LLM_CHUNK_DELAY_MS", "5"))
+    
+    # Local stand-in error injection
+    local_error_rate: float = float(os.getenv("LOCAL_LLM_ERROR_RATE", "0"))
+    local_error_status_codes: List[int] = None
+    local_seed: int = int(os.getenv("LOCAL_LLM_SEED", "0"))
+    
+    def __post_init__(self):
+        """Initialize local stand-in responses and error codes from environment variables"""
+        if self.local_canned_responses is None:
+            self.local_canned_responses = []
+            if self.local_responses_file:
+                with open(self.local_responses_file, encoding="utf-8") as responses_file:
+                    self.local_canned_responses = list(json.load(responses_file).items())
+        
+        if self.local_error_status_codes is None:
+            codes = os.getenv("LOCAL_LLM_ERROR_STATUS_CODES", "529,429,500")
+            self.local_error_status_codes = [int(code) for code in codes.split(",") if code.strip()]
+    
+    def validate(self) -> bool:
+        """Validate LLM backend configuration"""
+        if self.provider not in ("anthropic", "local"):
+            raise ValueError(f"Invalid LLM_BACKEND: {self.provider} (expected 'anthropic' or 'local')")
+        return True
+
 @dataclass  
 class SecurityConfig:
     """Configuration for security and validation settings"""
@@ -192,10 +258,18 @@ class SecurityConfig:
     # Security Feature Configuration
     enable_input_sanitization: bool = os.getenv("ENABLE_INPUT_SANITIZATION", "true").lower() == "true"
     enable_prompt_injection_protection: bool = os.getenv("ENABLE_PROMPT_INJECTION_PROTECTION", "true").lower() == "true"
+    prompt_injection_patterns: List[str] = None
     
     # Rate Limiting Configuration
     rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
     rate_limit_requests_per_minute: int = int(os.getenv("RATE_LIMIT_RPM", "60"))
+    rate_limit_burst: int = int(os.getenv("RATE_LIMIT_BURST", os.getenv("RATE_LIMIT_RPM", "60")))
+    rate_limit_max_keys: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    
+    # Header identifying the calling agent when the request is not authenticated.
+    # It and X-Forwarded-For are only honoured when the peer is a trusted proxy
+    rate_limit_key_header: str = os.getenv("RATE_LIMIT_KEY_HEADER", "x-agent-id")
+    rate_limit_trusted_proxies: List[str] = None
     
     def __post_init__(self):
         """Initialize allowed file types from environment"""
@@ -207,6 +281,369 @@ class SecurityConfig:
                 "image/png",
                 "image/jpeg"
             ])
+        
+        if self.prompt_injection_patterns is None:
+            self.prompt_injection_patterns = self._get_list_from_env("PROMPT_INJECTION_PATTERNS", [
+                "ignore previous instructions",
+                "disregard system prompt",
+                "act as a different",
+                "pretend you are",
+                "override your instructions"
+            ])
+        
+        if self.rate_limit_trusted_proxies is None:
+            self.rate_limit_trusted_proxies = self._get_list_from_env("RATE_LIMIT_TRUSTED_PROXIES", [])
+    
+    def _get_list_from_env(self, env_var: str, default: List[str]) -> List[str]:
+        """Get a list from environment variable (comma-separated) or use default"""
+        env_value = os.getenv(env_var)
+        if env_value:
+            return [item.strip() for item in env_value.split(",") if item.strip()]
+        return default
+
+@dataclass
+class ResilienceConfig:
+    """Configuration for retries, hedging and deadlines around Claude calls"""
+    
+    # Per-task deadline for a whole consultation. Callers may ask for another budget
+    # (between the minimum and maximum) with "deadline_seconds" in message or request metadata
+    task_deadline_seconds: float = float(os.getenv("TASK_DEADLINE_SECONDS", "90"))
+    min_task_deadline_seconds: float = float(os.getenv("MIN_TASK_DEADLINE_SECONDS", "5"))
+    max_task_deadline_seconds: float = float(os.getenv("MAX_TASK_DEADLINE_SECONDS", "300"))
+    
+    # Per-request deadline budget shared by all attempts, backoff and hedges
+    request_deadline_seconds: float = float(os.getenv("LLM_REQUEST_DEADLINE_SECONDS", "60"))
+    
+    # Retry Configuration (full-jitter exponential backoff, Retry-After honored)
+    max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    retry_base_delay: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+    retry_max_delay: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+    
+    # Hedged Request Configuration
+    hedging_enabled: bool = os.getenv("LLM_HEDGING_ENABLED", "true").lower() == "true"
+    hedge_percentile: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+    latency_window: int = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+    hedge_min_samples: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    # Hedges allowed per call on average, with a burst allowance; a hedge also needs a free LLM slot
+    hedge_budget_ratio: float = float(os.getenv("LLM_HEDGE_BUDGET_RATIO", "0.05"))
+    hedge_budget_burst: float = float(os.getenv("LLM_HEDGE_BUDGET_BURST", "5"))
+    
+    # Circuit Breaker Configuration (fail fast and serve cached answers while open)
+    circuit_breaker_enabled: bool = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    breaker_failure_rate: float = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+    breaker_slow_call_seconds: float = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "20"))
+    breaker_slow_call_rate: float = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", "0.8"))
+    breaker_window_size: int = int(os.getenv("CIRCUIT_BREAKER_WINDOW_SIZE", "50"))
+    breaker_min_calls: int = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "10"))
+    breaker_open_seconds: float = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
+    breaker_half_open_max_calls: int = int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS", "2"))
+
+@dataclass
+class ConversationConfig:
+    """Configuration for multi-turn conversation history management"""
+    
+    # Incremental per-context (multi-task conversation) history cache in the executor
+    history_cache_max_contexts: int = int(os.getenv("HISTORY_CACHE_MAX_CONTEXTS", os.getenv("HISTORY_CACHE_MAX_TASKS", "1024")))
+    
+    # Token budget for the history forwarded to Claude on each turn
+    history_token_budget: int = int(os.getenv("HISTORY_TOKEN_BUDGET", "8000"))
+    pin_first_turn: bool = os.getenv("HISTORY_PIN_FIRST_TURN", "true").lower() == "true"
+    
+    # Background rolling summarization of older turns
+    summarization_enabled: bool = os.getenv("SUMMARIZATION_ENABLED", "true").lower() == "true"
+    summary_keep_recent_turns: int = int(os.getenv("SUMMARY_KEEP_RECENT_TURNS", "6"))
+    summary_min_turns_to_compact: int = int(os.getenv("SUMMARY_MIN_TURNS_TO_COMPACT", "8"))
+    summary_max_tokens: int = int(os.getenv("SUMMARY_MAX_TOKENS", "500"))
+    summary_cache_max_contexts: int = int(os.getenv("SUMMARY_CACHE_MAX_CONTEXTS", os.getenv("SUMMARY_CACHE_MAX_TASKS", "1024")))
+
+@dataclass
+class ArtifactConfig:
+    """Configuration for packaging medical responses as A2A artifacts"""
+    
+    # Responses longer than this always become artifacts
+    min_artifact_length: int = int(os.getenv("ARTIFACT_MIN_LENGTH", "500"))
+    default_artifact_name: str = os.getenv("ARTIFACT_DEFAULT_NAME", "cardiology_consultation.md")
+    
+    # Keywords that make a response an artifact
+    artifact_keywords: List[str] = None
+    
+    # Keyword to artifact name mappings in priority order ("keyword:name" pairs)
+    artifact_name_rules: List[Tuple[str, str]] = None
+    
+    def __post_init__(self):
+        """Initialize artifact keyword mappings from environment variables"""
+        if self.artifact_keywords is None:
+            self.artifact_keywords = self._get_list_from_env("ARTIFACT_KEYWORDS", [
+                "procedure",
+                "assessment",
+                "recommendation",
+                "treatment plan",
+                "follow-up"
+            ])
+        
+        if self.artifact_name_rules is None:
+            rules = self._get_list_from_env("ARTIFACT_NAME_RULES", [
+                "procedure:procedure_information.md",
+                "assessment:medical_assessment.md",
+                "treatment:treatment_plan.md",
+                "follow-up:follow_up_care.md"
+            ])
+            self.artifact_name_rules = [
+                (keyword.strip(), name.strip())
+                for keyword, _, name in (rule.partition(":") for rule in rules)
+                if keyword.strip() and name.strip()
+            ]
+    
+    def _get_list_from_env(self, env_var: str, default: List[str]) -> List[str]:
+        """Get a list from environment variable (comma-separated) or use default"""
+        env_value = os.getenv(env_var)
+        if env_value:
+            return [item.strip() for item in env_value.split(",") if item.strip()]
+        return default
+
+@dataclass
+class CacheConfig:
+    """Configuration for response caching in front of the Claude API"""
+    
+    # Exact-match Response Cache Configuration
+    response_cache_enabled: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    response_cache_max_entries: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    response_cache_ttl_seconds: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+    response_cache_max_bytes: int = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    # SQLite file shared by all workers on the host as a second cache tier (empty to disable)
+    response_cache_shared_path: str = os.getenv("RESPONSE_CACHE_SHARED_PATH", "")
+    
+    # Semantic (near-duplicate) Cache Configuration for first-turn queries
+    semantic_cache_enabled: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    semantic_cache_max_entries: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1024"))
+    semantic_cache_threshold: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+    semantic_cache_ttl_seconds: float = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+    semantic_cache_dimensions: int = int(os.getenv("SEMANTIC_CACHE_DIMENSIONS", "1024"))
+
+@dataclass
+class TaskStoreConfig:
+    """Configuration for A2A task storage"""
+    
+    # "memory" keeps tasks in this process only; "sqlite" adds a persistent tier shared by workers
+    task_store_backend: str = os.getenv("TASK_STORE_BACKEND", "memory").lower()
+    
+    # Finished tasks are kept in memory for result retrieval within these bounds;
+    # running tasks are kept until they go stale and count against the byte cap
+    task_store_max_tasks: int = int(os.getenv("TASK_STORE_MAX_TASKS", "10000"))
+    task_store_ttl_seconds: float = float(os.getenv("TASK_STORE_TTL_SECONDS", "3600"))
+    task_store_max_bytes: int = int(os.getenv("TASK_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+    
+    # Running tasks not updated for this long were abandoned (e.g. by a hung
+    # consultation or crashed worker) and are dropped from memory and SQLite;
+    # well above MAX_TASK_DEADLINE_SECONDS
+    task_store_active_ttl_seconds: float = float(os.getenv("TASK_STORE_ACTIVE_TTL_SECONDS", "3600"))
+    
+    # SQLite tier (WAL mode, batched writes)
+    task_store_path: str = os.getenv("TASK_STORE_PATH", "tasks.db")
+    task_store_batch_size: int = int(os.getenv("TASK_STORE_BATCH_SIZE", "256"))
+    task_store_flush_interval_seconds: float = float(os.getenv("TASK_STORE_FLUSH_INTERVAL_SECONDS", "0.05"))
+    task_store_retention_seconds: float = float(os.getenv("TASK_STORE_RETENTION_SECONDS", str(7 * 24 * 3600)))
+    
+    # Workers heartbeat at this interval; one silent for five intervals no longer owns its tasks
+    task_store_heartbeat_seconds: float = float(os.getenv("TASK_STORE_HEARTBEAT_SECONDS", "2"))
+    
+    def validate(self) -> bool:
+        """Validate task store configuration"""
+        if self.task_store_backend not in ("memory", "sqlite"):
+            raise ValueError(
+                f"Invalid TASK_STORE_BACKEND: {self.task_store_backend} (expected 'memory' or 'sqlite')"
+            )
+        return True
+
+@dataclass
+class SchedulerConfig:
+    """Configuration for the acute/routine priority queue in front of Claude calls"""
+    
+    scheduler_enabled: bool = os.getenv("PRIORITY_SCHEDULER_ENABLED", "true").lower() == "true"
+    
+    # Upstream Claude calls in flight, and how many of them only acute work may use
+    # (the initial limit, and the acute share of it, when the limit is adaptive).
+    # These are host-wide budgets; each worker process gets an equal share
+    max_concurrent_llm_calls: int = int(os.getenv("MAX_CONCURRENT_LLM_CALLS", "32"))
+    acute_reserved_slots: int = int(os.getenv("ACUTE_RESERVED_SLOTS", "8"))
+    max_queue_wait_seconds: float = float(os.getenv("LLM_MAX_QUEUE_WAIT_SECONDS", "10"))
+    
+    # Adaptive concurrency (AIMD on upstream latency and 429/529 responses)
+    adaptive_concurrency_enabled: bool = os.getenv("ADAPTIVE_CONCURRENCY_ENABLED", "true").lower() == "true"
+    min_concurrent_llm_calls: int = int(os.getenv("LLM_CONCURRENCY_MIN", "2"))
+    max_adaptive_llm_calls: int = int(os.getenv("LLM_CONCURRENCY_MAX", "128"))
+    latency_tolerance: float = float(os.getenv("LLM_LATENCY_TOLERANCE", "2.0"))
+    overload_backoff: float = float(os.getenv("LLM_OVERLOAD_BACKOFF", "0.5"))
+    
+    # Admission control: shed new routine consultations before any task events once
+    # too many are in flight or the oldest queued Claude call has waited too long
+    admission_control_enabled: bool = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+    max_in_flight_consultations: int = int(os.getenv("MAX_IN_FLIGHT_CONSULTATIONS", "256"))
+    acute_admission_headroom: int = int(os.getenv("ACUTE_ADMISSION_HEADROOM", "64"))
+    max_admission_queue_delay_seconds: float = float(os.getenv("MAX_ADMISSION_QUEUE_DELAY_SECONDS", "5"))
+    
+    # Terms in skill tags or query text that mark a consultation as acute
+    acute_terms: List[str] = None
+    
+    def __post_init__(self):
+        """Initialize acute terms from environment variables"""
+        if self.acute_terms is None:
+            self.acute_terms = self._get_list_from_env("ACUTE_TERMS", [
+                "STEMI",
+                "NSTEMI",
+                "acute MI",
+                "acute myocardial infarction",
+                "acute coronary syndrome",
+                "ST elevation",
+                "ST-elevation",
+                "cardiogenic shock",
+                "cardiac arrest",
+                "stroke onset",
+                "acute stroke",
+                "code STEMI",
+                "door-to-balloon"
+            ])
+    
+    def _get_list_from_env(self, env_var: str, default: List[str]) -> List[str]:
+        """Get a list from environment variable (comma-separated) or use default"""
+        env_value = os.getenv(env_var)
+        if env_value:
+            return [item.strip() for item in env_value.split(",") if item.strip()]
+        return default
+
+@dataclass
+class FastPathConfig:
+    """Configuration for answering greetings and service catalog questions without Claude"""
+    
+    fast_path_enabled: bool = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+    
+    # Share of query words that must belong to a known intent, and longest query considered
+    min_confidence: float = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "0.85"))
+    max_words: int = int(os.getenv("FAST_PATH_MAX_WORDS", "16"))
+    
+    # Answer templates (rendered once with the configured practice and service lists)
+    greeting_template: str = os.getenv("FAST_PATH_GREETING_TEMPLATE", """
+Hello, this is the assistant for {practice_name}. I provide interventional cardiology information and care coordination for healthcare providers and agents.
+
+Our services include:
+{primary_services}
+
+How can I help with your referral or consultation today?
+""".strip())
+    
+    services_template: str = os.getenv("FAST_PATH_SERVICES_TEMPLATE", """
+{practice_name} offers the following services.
+
+PRIMARY SERVICES:
+{primary_services}
+
+DIAGNOSTIC CAPABILITIES:
+{diagnostic_services}
+
+SPECIALIZED PROCEDURES:
+{specialized_procedures}
+
+Please let me know if you would like details on any of these or help coordinating a referral.
+""".strip())
+    
+    diagnostics_template: str = os.getenv("FAST_PATH_DIAGNOSTICS_TEMPLATE", """
+{practice_name} provides these diagnostic services:
+{diagnostic_services}
+
+Please let me know if you would like details on any of these tests or help coordinating a referral.
+""".strip())
+    
+    procedures_template: str = os.getenv("FAST_PATH_PROCEDURES_TEMPLATE", """
+{practice_name} performs these specialized procedures:
+{specialized_procedures}
+
+Please let me know if you would like details on any of these procedures or help coordinating a referral.
+""".strip())
+
+@dataclass
+class RoutingConfig:
+    """Configuration for complexity-based routing between a fast and a deep Claude model"""
+    
+    routing_enabled: bool = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+    
+    # Fast model for service catalog and logistics questions (the deep model is CLAUDE_MODEL)
+    fast_model: str = os.getenv("CLAUDE_FAST_MODEL", "claude-3-5-haiku-20241022")
+    
+    # Per-class response length limits
+    service_catalog_max_tokens: int = int(os.getenv("ROUTE_SERVICE_CATALOG_MAX_TOKENS", "600"))
+    logistics_max_tokens: int = int(os.getenv("ROUTE_LOGISTICS_MAX_TOKENS", "400"))
+    clinical_max_tokens: int = int(os.getenv("ROUTE_CLINICAL_MAX_TOKENS", os.getenv("CLAUDE_MAX_TOKENS", "1500")))
+    
+    # Queries longer than this many words always go to the deep model
+    fast_max_words: int = int(os.getenv("ROUTE_FAST_MAX_WORDS", "40"))
+    
+    # Keywords that classify a query; clinical keywords take precedence
+    service_catalog_keywords: List[str] = None
+    logistics_keywords: List[str] = None
+    clinical_keywords: List[str] = None
+    
+    # Prices in USD per million tokens, for per-route cost stats
+    deep_input_cost_per_mtok: float = float(os.getenv("CLAUDE_INPUT_COST_PER_MTOK", "3.0"))
+    deep_output_cost_per_mtok: float = float(os.getenv("CLAUDE_OUTPUT_COST_PER_MTOK", "15.0"))
+    fast_input_cost_per_mtok: float = float(os.getenv("CLAUDE_FAST_INPUT_COST_PER_MTOK", "0.8"))
+    fast_output_cost_per_mtok: float = float(os.getenv("CLAUDE_FAST_OUTPUT_COST_PER_MTOK", "4.0"))
+    
+    def __post_init__(self):
+        """Initialize routing keyword lists from environment variables"""
+        if self.service_catalog_keywords is None:
+            self.service_catalog_keywords = self._get_list_from_env("ROUTE_SERVICE_CATALOG_KEYWORDS", [
+                "services",
+                "do you offer",
+                "do you provide",
+                "do you perform",
+                "what procedures",
+                "capabilities",
+                "specialties",
+                "what can you"
+            ])
+        
+        if self.logistics_keywords is None:
+            self.logistics_keywords = self._get_list_from_env("ROUTE_LOGISTICS_KEYWORDS", [
+                "office hours",
+                "hours",
+                "address",
+                "location",
+                "phone",
+                "fax",
+                "appointment",
+                "schedule",
+                "referral form",
+                "insurance",
+                "parking",
+                "contact"
+            ])
+        
+        if self.clinical_keywords is None:
+            self.clinical_keywords = self._get_list_from_env("ROUTE_CLINICAL_KEYWORDS", [
+                "patient",
+                "year-old",
+                "year old",
+                "presents",
+                "presenting",
+                "history of",
+                "multivessel",
+                "stemi",
+                "nstemi",
+                "troponin",
+                "ejection fraction",
+                "lvef",
+                "stenosis",
+                "occlusion",
+                "lesion",
+                "ecg shows",
+                "contraindicat",
+                "anticoagula",
+                "antiplatelet",
+                "dose",
+                "should we",
+                "would you recommend",
+                "differential"
+            ])
     
     def _get_list_from_env(self, env_var: str, default: List[str]) -> List[str]:
         """Get a list from environment variable (comma-separated) or use default"""
@@ -222,22 +659,41 @@ class ConfigManager:
         self.agent = AgentConfig()
         self.server = ServerConfig()
         self.claude = ClaudeConfig()
+        self.llm_backend = LLMBackendConfig()
         self.security = SecurityConfig()
+        self.resilience = ResilienceConfig()
+        self.conversation = ConversationConfig()
+        self.artifacts = ArtifactConfig()
+        self.cache = CacheConfig()
+        self.routing = RoutingConfig()
+        self.fast_path = FastPathConfig()
+        self.scheduler = SchedulerConfig()
+        self.task_store = TaskStoreConfig()
         
         # Validate all configurations
         self._validate_all()
     
     def _validate_all(self):
         """Validate all configuration sections"""
-        self.claude.validate()
+        self.llm_backend.validate()
+        self.task_store.validate()
+        if self.llm_backend.provider == "anthropic":
+            self.claude.validate()
         
         # Additional cross-configuration validation
+        if self.server.workers > 1 and self.task_store.task_store_backend != "sqlite":
+            raise ValueError("WORKERS > 1 requires TASK_STORE_BACKEND=sqlite so workers share task state")
+        
         if self.server.port < 1024 or self.server.port > 65535:
             raise ValueError(f"Invalid port number: {self.server.port}")
         
         if self.claude.max_tokens < 100 or self.claude.max_tokens > 4096:
             raise ValueError(f"Invalid max_tokens: {self.claude.max_tokens}")
     
+    def worker_share(self, host_limit: int) -> int:
+        """One worker's share of a limit that applies to the whole host, such as upstream concurrency."""
+        return math.ceil(host_limit / max(1, self.server.workers))
+    
     def get_formatted_system_prompt(self) -> str:
         """Get the system prompt formatted with current configuration"""
         return self.claude.system_prompt_template.format(
@@ -247,6 +703,21 @@ class ConfigManager:
             specialized_procedures="\n".join(f"- {procedure}" for procedure in self.agent.specialized_procedures)
         )
     
+    def get_fast_path_answers(self) -> Dict[str, str]:
+        """Get the fast path answer templates rendered with current configuration, by intent"""
+        values = {
+            "practice_name": self.agent.practice_name,
+            "primary_services": "\n".join(f"- {service}" for service in self.agent.primary_services),
+            "diagnostic_services": "\n".join(f"- {service}" for service in self.agent.diagnostic_services),
+            "specialized_procedures": "\n".join(f"- {procedure}" for procedure in self.agent.specialized_procedures)
+        }
+        return {
+            "greeting": self.fast_path.greeting_template.format(**values),
+            "services": self.fast_path.services_template.format(**values),
+            "diagnostics": self.fast_path.diagnostics_template.format(**values),
+            "procedures": self.fast_path.procedures_template.format(**values)
+        }
+    
     def get_agent_card_data(self) -> Dict:
         """Generate agent card data from configuration"""
         return {
@@ -269,7 +740,10 @@ class ConfigManager:
         print(f"  Agent: {self.agent.agent_name}")
         print(f"  Version: {self.agent.agent_version}")
         print(f"  Server: {self.server.host}:{self.server.port}")
+        print(f"  LLM Backend: {self.llm_backend.provider}")
         print(f"  Claude Model: {self.claude.model}")
+        if self.routing.routing_enabled:
+            print(f"  Fast Model: {self.routing.fast_model}")
         print(f"  Services: {len(self.agent.primary_services)} primary, {len(self.agent.diagnostic_services)} diagnostic")
         print(f"  Security: Input validation={self.security.enable_input_sanitization}")
 
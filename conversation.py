@@ -0,0 +1,268 @@
+"""
+Conversation State for Dr. Walter Reed's Interventional Cardiology Agent
+
+Conversation history per A2A context, maintained incrementally by the
+executor. Each completed turn appends its own exchange, so the cumulative cost
+of a consultation grows linearly rather than quadratically with its length.
+
+Also provides the token budget window that bounds how much of a long
+consultation is forwarded to Claude on each turn, and the rolling summarizer
+that compacts older turns in the background so early clinical context survives
+truncation.
+"""
+
+import asyncio
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationHistoryCache:
+    """
+    Bounded cache of conversation history per A2A context.
+
+    A2A multi-turn consultations run as a sequence of tasks sharing one
+    context_id, and each task ends in a terminal state after a single reply.
+    The executor therefore records every completed exchange under the
+    task's context_id, so the next task in the conversation starts from the
+    turns extracted so far instead of re-reading earlier tasks. Contexts are
+    evicted in least-recently-used order once more than max_contexts are
+    tracked.
+    """
+
+    def __init__(self, max_contexts: int):
+        self.max_contexts = max_contexts
+        self._contexts: "OrderedDict[str, List[dict]]" = OrderedDict()
+
+    def get_history(self, context_id: str) -> List[dict]:
+        """
+        Return the conversation turns recorded for a context, oldest first.
+
+        The returned list is owned by the cache and must not be modified.
+        """
+        turns = self._contexts.get(context_id)
+        if turns is None:
+            return []
+        self._contexts.move_to_end(context_id)
+        return turns
+
+    def record_turn(self, context_id: str, user_text: str, response_text: str) -> List[dict]:
+        """Append a completed exchange to the context's history and return the history."""
+        turns = self._contexts.get(context_id)
+        if turns is None:
+            turns = []
+            self._contexts[context_id] = turns
+        self._contexts.move_to_end(context_id)
+
+        turns.append({"role": "user", "content": user_text})
+        turns.append({"role": "assistant", "content": response_text})
+
+        while len(self._contexts) > self.max_contexts:
+            self._contexts.popitem(last=False)
+
+        return turns
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+
+# Words, digit runs and individual symbols, roughly as Claude's tokenizer splits text
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+
+# Role markers and message framing added by the Messages API per turn
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the Claude token count of text without a network round trip.
+
+    Words cost one token per four characters, digit runs one token per three
+    digits and every other symbol one token.
+    """
+    tokens = 0
+    for piece in TOKEN_PATTERN.findall(text):
+        if piece[0].isdigit():
+            tokens += (len(piece) + 2) // 3
+        elif piece[0].isalpha():
+            tokens += (len(piece) + 3) // 4
+        else:
+            tokens += 1
+    return tokens
+
+
+def message_tokens(message: dict) -> int:
+    """Estimated tokens of a conversation turn, cached on the turn itself."""
+    tokens = message.get("tokens")
+    if tokens is None:
+        tokens = estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+        message["tokens"] = tokens
+    return tokens
+
+
+class TokenBudgetWindow:
+    """
+    Select the conversation turns that fit a per-request token budget.
+
+    The first exchange of the consultation is pinned (it usually carries the
+    referral reason), then the newest turns are added until the budget runs out.
+    Only the turns that are kept are examined, so the cost of selecting a window
+    does not grow with the length of the conversation.
+    """
+
+    def __init__(self, max_tokens: int, pin_first_turn: bool = True):
+        self.max_tokens = max_tokens
+        self.pin_first_turn = pin_first_turn
+
+    def select(self, conversation_history: List[dict], user_text: str, reserved_tokens: int = 0,
+               pin_first_turn: Optional[bool] = None) -> List[dict]:
+        """
+        Return the history turns to send alongside user_text within the budget.
+
+        Args:
+            conversation_history: Prior turns, oldest first
+            user_text: The new user turn
+            reserved_tokens: Budget already spent elsewhere (such as a running summary)
+            pin_first_turn: Override the configured pinning of the first exchange
+        """
+        remaining = self.max_tokens - reserved_tokens - estimate_tokens(user_text) - MESSAGE_OVERHEAD_TOKENS
+        if pin_first_turn is None:
+            pin_first_turn = self.pin_first_turn
+
+        pinned: List[dict] = []
+        if pin_first_turn and conversation_history:
+            # Pin the opening user turn and the reply to it
+            pinned = conversation_history[:2] if len(conversation_history) > 1 else conversation_history[:1]
+            pinned_tokens = sum(message_tokens(msg) for msg in pinned)
+            if pinned_tokens <= remaining:
+                remaining -= pinned_tokens
+            else:
+                pinned = []
+
+        recent: List[dict] = []
+        for index in range(len(conversation_history) - 1, len(pinned) - 1, -1):
+            msg = conversation_history[index]
+            tokens = message_tokens(msg)
+            if tokens > remaining:
+                break
+            remaining -= tokens
+            recent.append(msg)
+        recent.reverse()
+
+        # The window must open on a user turn and alternate roles after the pinned exchange
+        expected_role = "assistant" if not pinned else pinned[-1].get("role")
+        if recent and recent[0].get("role") == expected_role:
+            recent = recent[1:]
+
+        dropped = len(conversation_history) - len(pinned) - len(recent)
+        if dropped:
+            logger.debug(f"Token budget window dropped {dropped} of {len(conversation_history)} turns")
+
+        return pinned + recent
+
+
+@dataclass(frozen=True)
+class ConversationSummary:
+    """Running summary of a conversation's older turns."""
+
+    text: str
+    covered_turns: int
+
+
+class RollingSummarizer:
+    """
+    Background compaction of older consultation turns into a running summary.
+
+    After a reply has been sent, schedule() compacts the turns that have aged
+    out of the recent window into the conversation's summary without delaying the
+    user-visible turn. The next turn sends the summary plus the recent turns.
+    Summaries are kept per A2A context in least-recently-used order up to
+    max_contexts, and handed to persist, when given, so other workers can
+    restore() them.
+
+    Args:
+        summarize: Coroutine that merges a previous summary with older turns
+        keep_recent_turns: Newest turns that are always sent verbatim
+        min_turns_to_compact: Smallest batch of aged-out turns worth summarizing
+        max_contexts: Number of conversation summaries kept
+        persist: Optional coroutine that stores a new summary for a context
+    """
+
+    def __init__(self, summarize: Callable[[Optional[str], List[dict]], Awaitable[str]],
+                 keep_recent_turns: int, min_turns_to_compact: int, max_contexts: int,
+                 persist: Optional[Callable[[str, ConversationSummary], Awaitable[None]]] = None):
+        self.summarize = summarize
+        self.keep_recent_turns = keep_recent_turns
+        self.min_turns_to_compact = min_turns_to_compact
+        self.max_contexts = max_contexts
+        self.persist = persist
+
+        self._summaries: "OrderedDict[str, ConversationSummary]" = OrderedDict()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    def get(self, context_id: str) -> Optional[ConversationSummary]:
+        """Return the running summary of a conversation, if one has been built."""
+        summary = self._summaries.get(context_id)
+        if summary is not None:
+            self._summaries.move_to_end(context_id)
+        return summary
+
+    def restore(self, context_id: str, summary: ConversationSummary) -> ConversationSummary:
+        """Adopt a summary built elsewhere unless the local one already covers as many turns."""
+        current = self._summaries.get(context_id)
+        if current is not None and current.covered_turns >= summary.covered_turns:
+            return current
+        self._store(context_id, summary)
+        return summary
+
+    def schedule(self, context_id: str, conversation_history: List[dict]) -> None:
+        """Compact aged-out turns of a conversation in the background if enough have accumulated."""
+        if context_id in self._running:
+            return
+
+        summary = self._summaries.get(context_id)
+        covered = summary.covered_turns if summary else 0
+        compact_until = len(conversation_history) - self.keep_recent_turns
+
+        # Keep the window opening on a user turn after the summarized prefix
+        if 0 < compact_until < len(conversation_history) and conversation_history[compact_until].get("role") != "user":
+            compact_until -= 1
+
+        if compact_until - covered < self.min_turns_to_compact:
+            return
+
+        turns = list(conversation_history[covered:compact_until])
+        background = asyncio.create_task(
+            self._compact(context_id, summary.text if summary else None, turns, compact_until)
+        )
+        self._running[context_id] = background
+        self._background.add(background)
+        background.add_done_callback(self._background.discard)
+
+    async def _compact(self, context_id: str, previous_summary: Optional[str], turns: List[dict],
+                       covered_turns: int) -> None:
+        """Summarize turns into the conversation's running summary."""
+        try:
+            text = await self.summarize(previous_summary, turns)
+            if text:
+                summary = ConversationSummary(text=text, covered_turns=covered_turns)
+                self._store(context_id, summary)
+                logger.info(f"Compacted {len(turns)} turns of context {context_id} into running summary")
+                if self.persist is not None:
+                    await self.persist(context_id, summary)
+        except Exception as e:
+            logger.error(f"Error summarizing conversation for context {context_id}: {str(e)}")
+        finally:
+            self._running.pop(context_id, None)
+
+    def _store(self, context_id: str, summary: ConversationSummary) -> None:
+        """Keep a summary as the context's most recently used one, evicting the least recently used."""
+        self._summaries[context_id] = summary
+        self._summaries.move_to_end(context_id)
+        while len(self._summaries) > self.max_contexts:
+            self._summaries.popitem(last=False)
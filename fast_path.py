@@ -0,0 +1,140 @@
+"""
+Deterministic Fast Path for Dr. Walter Reed's Interventional Cardiology Agent
+
+Answers greetings and service catalog questions ("what services do you
+offer?", "which diagnostic tests do you do?") from the configured service
+lists without calling Claude. Answers are rendered once from templates at
+startup, so a match is a tokenization, a few set lookups and a dict read.
+
+Every intent has anchor words (at least one must appear) and a vocabulary of
+words it may also contain. Confidence is the share of the query's words that
+are anchors, vocabulary or generic question words; anything else ("do you
+offer stress testing for a patient with LBBB?") lowers confidence and the query
+falls through to Claude.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional
+
+logger = logging.getLogger(__name__)
+
+GREETING = "greeting"
+SERVICES = "services"
+DIAGNOSTICS = "diagnostics"
+PROCEDURES = "procedures"
+
+# Question framing shared by every intent
+QUESTION_WORDS = frozenset({
+    "a", "about", "all", "an", "and", "are", "available", "can", "could", "do", "does",
+    "give", "have", "i", "is", "kind", "kinds", "know", "list", "me", "of", "offer",
+    "offered", "please", "provide", "provided", "the", "there", "to", "type", "types",
+    "us", "want", "we", "what", "whats", "which", "would", "you", "your", "yours"
+})
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class FastPathIntent:
+    """A locally answerable intent and the words that identify it."""
+    
+    name: str
+    anchors: FrozenSet[str]
+    vocabulary: FrozenSet[str]
+
+
+@dataclass(frozen=True)
+class FastPathMatch:
+    """A matched intent, its confidence and the templated answer."""
+    
+    intent: str
+    confidence: float
+    answer: str
+
+
+DEFAULT_INTENTS = (
+    FastPathIntent(
+        GREETING,
+        anchors=frozenset({"hello", "hi", "hey", "greetings", "morning", "afternoon", "evening"}),
+        vocabulary=frozenset({"good", "there", "dr", "doctor", "walter", "reed", "team", "everyone"})
+    ),
+    FastPathIntent(
+        SERVICES,
+        anchors=frozenset({"services", "service", "specialties", "specialty", "capabilities", "offerings"}),
+        vocabulary=frozenset({"office", "practice", "clinic", "cardiology", "interventional", "main",
+                              "primary", "general", "overview", "provide", "currently"})
+    ),
+    FastPathIntent(
+        DIAGNOSTICS,
+        anchors=frozenset({"diagnostic", "diagnostics", "tests", "testing"}),
+        vocabulary=frozenset({"cardiac", "services", "imaging", "office", "practice", "run", "perform",
+                              "performed", "currently"})
+    ),
+    FastPathIntent(
+        PROCEDURES,
+        anchors=frozenset({"procedures", "interventions"}),
+        vocabulary=frozenset({"specialized", "interventional", "cardiac", "perform", "performed", "services",
+                              "practice", "office", "currently"})
+    ),
+)
+
+
+class FastPathResponder:
+    """
+    Local intent matcher plus templated answers for catalog questions.
+    
+    Args:
+        answers: Rendered answer text per intent name
+        min_confidence: Lowest confidence answered locally
+        max_words: Longer queries always fall through to Claude
+        intents: Intents to match, in priority order for ties
+    """
+    
+    def __init__(self, answers: Dict[str, str], min_confidence: float, max_words: int,
+                 intents=DEFAULT_INTENTS):
+        self.answers = answers
+        self.min_confidence = min_confidence
+        self.max_words = max_words
+        self.intents: List[FastPathIntent] = [intent for intent in intents if answers.get(intent.name)]
+        
+        self.hits = 0
+        self.fallthroughs = 0
+    
+    def match(self, text: str) -> Optional[FastPathMatch]:
+        """Return the matched intent and answer for text, or None if confidence is low."""
+        normalized = text.casefold().replace("\u2019", "'").replace("'s", "").replace("'", "")
+        words = WORD_PATTERN.findall(normalized)
+        
+        # An empty message is the default greeting
+        if not words:
+            if GREETING in self.answers:
+                self.hits += 1
+                return FastPathMatch(GREETING, 1.0, self.answers[GREETING])
+            self.fallthroughs += 1
+            return None
+        
+        best: Optional[FastPathMatch] = None
+        if len(words) <= self.max_words:
+            for intent in self.intents:
+                if intent.anchors.isdisjoint(words):
+                    continue
+                covered = sum(
+                    1 for word in words
+                    if word in intent.anchors or word in intent.vocabulary or word in QUESTION_WORDS
+                )
+                confidence = covered / len(words)
+                if best is None or confidence > best.confidence:
+                    best = FastPathMatch(intent.name, confidence, self.answers[intent.name])
+        
+        if best is None or best.confidence < self.min_confidence:
+            self.fallthroughs += 1
+            return None
+        
+        self.hits += 1
+        return best
+    
+    def stats(self) -> Dict[str, int]:
+        """Return fast path hit and fall-through counters."""
+        return {"hits": self.hits, "fallthroughs": self.fallthroughs}
@@ -0,0 +1,89 @@
+"""
+Prompt Injection Scanner for Dr. Walter Reed's Interventional Cardiology Agent
+
+Compiles the configured prompt injection patterns once into a single regular
+expression so each message is scanned in one pass, regardless of how many
+patterns are configured.
+
+Patterns are inserted into a trie and rendered as a prefix-factored regex, so
+patterns sharing a prefix ("ignore previous ...", "ignore all ...") share the
+work of matching it. Messages are NFKC-normalized and case-folded before the
+scan, zero-width characters are removed, and any run of whitespace matches the
+single space in a pattern.
+"""
+
+import logging
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Characters that render as nothing but split a pattern to slip past filters
+ZERO_WIDTH_CHARACTERS = dict.fromkeys(map(ord, "\u00ad\u200b\u200c\u200d\u2060\ufeff"))
+
+# Terminal marker for patterns that end at a trie node
+_PATTERN_END = ""
+
+
+def normalize_for_scan(text: str) -> str:
+    """NFKC-normalize, case-fold and strip zero-width characters from text."""
+    return unicodedata.normalize("NFKC", text).casefold().translate(ZERO_WIDTH_CHARACTERS)
+
+
+class PromptInjectionScanner:
+    """Single-pass scanner for a fixed set of prompt injection patterns."""
+
+    def __init__(self, patterns: List[str]):
+        # Canonical pattern text -> pattern as configured, for reporting matches
+        self._patterns: Dict[str, str] = {}
+        for pattern in patterns:
+            canonical = " ".join(normalize_for_scan(pattern).split())
+            if canonical:
+                self._patterns.setdefault(canonical, pattern)
+
+        self._regex = None
+        if self._patterns:
+            trie: dict = {}
+            for canonical in self._patterns:
+                node = trie
+                for char in canonical:
+                    node = node.setdefault(char, {})
+                node[_PATTERN_END] = {}
+            self._regex = re.compile(self._trie_to_regex(trie))
+
+        logger.debug(f"Compiled prompt injection scanner with {len(self._patterns)} patterns")
+
+    @classmethod
+    def _trie_to_regex(cls, node: dict) -> str:
+        """Render a character trie as a prefix-factored regular expression."""
+        alternatives = []
+        optional = False
+        for char, child in sorted(node.items()):
+            if char == _PATTERN_END:
+                optional = True
+                continue
+            char_regex = r"\s+" if char == " " else re.escape(char)
+            alternatives.append(char_regex + cls._trie_to_regex(child))
+
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and not optional:
+            return alternatives[0]
+
+        group = "(?:" + "|".join(alternatives) + ")"
+        return group + "?" if optional else group
+
+    def scan(self, text: str) -> Optional[str]:
+        """Return the first configured pattern found in text, or None."""
+        if self._regex is None:
+            return None
+
+        match = self._regex.search(normalize_for_scan(text))
+        if match is None:
+            return None
+
+        return self._patterns.get(" ".join(match.group(0).split()), match.group(0))
+
+    def __len__(self) -> int:
+        return len(self._patterns)
@@ -0,0 +1,327 @@
+"""
+LLM Backends for Dr. Walter Reed's Interventional Cardiology Agent
+
+The agent talks to its language model through the LLMBackend interface:
+async and sync completion, streamed text deltas and token usage. Requests use
+the Anthropic Messages parameter shape (model, max_tokens, temperature,
+system, messages) whichever backend serves them.
+
+Two implementations are provided:
+- AnthropicLLMBackend: Claude over a shared, pooled async HTTP client
+- LocalLLMBackend: a deterministic in-process stand-in with canned or
+  streamed responses, configurable latency distributions and error
+  injection, for load testing the executor and server without API calls
+"""
+
+import asyncio
+import functools
+import logging
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import anthropic
+import httpx
+
+from conversation import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackendError(Exception):
+    """Base class for errors raised by non-Anthropic LLM backends."""
+
+
+class LLMConnectionError(LLMBackendError):
+    """The backend could not be reached."""
+
+
+class LLMStatusError(LLMBackendError):
+    """The backend answered with an error status (same codes as the Anthropic API)."""
+
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass
+class TokenUsage:
+    """Token usage of one response, including prompt cache reads and writes."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+
+
+@dataclass
+class LLMResponse:
+    """A complete model response."""
+
+    text: str
+    usage: TokenUsage = field(default_factory=TokenUsage)
+    model: str = ""
+    stop_reason: Optional[str] = None
+
+
+class LLMBackend(ABC):
+    """
+    Interface to a language model backend.
+
+    stream() yields text deltas as str and finishes with the complete
+    LLMResponse (carrying token usage) as its last item.
+    """
+
+    name = "backend"
+
+    @abstractmethod
+    async def create(self, params: dict, timeout: float) -> LLMResponse:
+        """Generate a complete response for Messages API style params."""
+
+    @abstractmethod
+    def stream(self, params: dict, timeout: float) -> AsyncIterator[Union[str, LLMResponse]]:
+        """Stream text deltas for params, then the complete response."""
+
+    def create_sync(self, params: dict, timeout: float) -> LLMResponse:
+        """Blocking create() for scripts and tools; must not be called from a running event loop."""
+        return asyncio.run(self.create(params, timeout))
+
+    async def aclose(self) -> None:
+        """Release connections held by the backend."""
+
+
+def _usage_from_anthropic(usage) -> TokenUsage:
+    """Convert an Anthropic usage block into TokenUsage."""
+    return TokenUsage(
+        input_tokens=getattr(usage, "input_tokens", None) or 0,
+        output_tokens=getattr(usage, "output_tokens", None) or 0,
+        cache_read_input_tokens=getattr(usage, "cache_read_input_tokens", None) or 0,
+        cache_creation_input_tokens=getattr(usage, "cache_creation_input_tokens", None) or 0
+    )
+
+
+def _text_from_anthropic(message) -> str:
+    """Concatenate the text blocks of an Anthropic message."""
+    return "".join(block.text for block in message.content if getattr(block, "type", "text") == "text")
+
+
+class AnthropicLLMBackend(LLMBackend):
+    """
+    Claude backend over a shared, pooled async HTTP connection.
+
+    SDK retries are disabled; retries are handled by the resilience layer.
+    Anthropic API errors are raised unchanged.
+    """
+
+    name = "anthropic"
+
+    def __init__(self, api_key: str, timeout: float, max_connections: int, max_keepalive_connections: int):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            timeout=timeout,
+            max_retries=0,
+            http_client=anthropic.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections
+                )
+            )
+        )
+        self._sync_client: Optional[anthropic.Anthropic] = None
+
+    async def create(self, params: dict, timeout: float) -> LLMResponse:
+        message = await self.client.messages.create(**params, timeout=timeout)
+        return LLMResponse(
+            text=_text_from_anthropic(message),
+            usage=_usage_from_anthropic(message.usage),
+            model=message.model,
+            stop_reason=message.stop_reason
+        )
+
+    async def stream(self, params: dict, timeout: float) -> AsyncIterator[Union[str, LLMResponse]]:
+        async with self.client.messages.stream(**params, timeout=timeout) as stream:
+            async for text in stream.text_stream:
+                yield text
+            message = await stream.get_final_message()
+            yield LLMResponse(
+                text=_text_from_anthropic(message),
+                usage=_usage_from_anthropic(message.usage),
+                model=message.model,
+                stop_reason=message.stop_reason
+            )
+
+    def create_sync(self, params: dict, timeout: float) -> LLMResponse:
+        if self._sync_client is None:
+            self._sync_client = anthropic.Anthropic(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+        message = self._sync_client.messages.create(**params, timeout=timeout)
+        return LLMResponse(
+            text=_text_from_anthropic(message),
+            usage=_usage_from_anthropic(message.usage),
+            model=message.model,
+            stop_reason=message.stop_reason
+        )
+
+    async def aclose(self) -> None:
+        await self.client.close()
+        if self._sync_client is not None:
+            self._sync_client.close()
+
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+
+
+@functools.lru_cache(maxsize=64)
+def _system_prompt_tokens(system: str) -> int:
+    """Token estimate of a system prompt, which repeats on every request."""
+    return estimate_tokens(system)
+
+
+class LocalLLMBackend(LLMBackend):
+    """
+    Deterministic in-process stand-in for load testing without API calls.
+
+    The response is the first canned response whose keyword appears in the
+    last user message, otherwise default_response ("{prompt}" is replaced by
+    that message). Time to first token is drawn from the configured latency
+    distribution, streamed chunks are chunk_chars long and chunk_delay apart,
+    and error_rate of calls fail with one of error_status_codes. All random
+    draws come from one seeded generator, so a run is reproducible.
+
+    Args:
+        default_response: Response text template
+        canned_responses: (keyword, response) pairs checked in order
+        latency_distribution: One of LATENCY_DISTRIBUTIONS
+        latency_mean: Mean time to first token in seconds
+        latency_stddev: Spread of the distribution in seconds (ignored by constant and exponential)
+        chunk_chars: Characters per streamed delta
+        chunk_delay: Seconds between streamed deltas (create() waits for all of them)
+        error_rate: Share of calls that fail, 0.0 to 1.0
+        error_status_codes: Status codes injected errors are drawn from
+        seed: Random seed for latency and error draws
+    """
+
+    name = "local"
+
+    def __init__(self, default_response: str, canned_responses: Optional[List[Tuple[str, str]]] = None,
+                 latency_distribution: str = "constant", latency_mean: float = 0.0,
+                 latency_stddev: float = 0.0, chunk_chars: int = 20, chunk_delay: float = 0.0,
+                 error_rate: float = 0.0, error_status_codes: Tuple[int, ...] = (529,),
+                 seed: Optional[int] = None):
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+
+        self.default_response = default_response
+        self.canned_responses = [(keyword.casefold(), response) for keyword, response in canned_responses or []]
+        self.latency_distribution = latency_distribution
+        self.latency_mean = latency_mean
+        self.latency_stddev = latency_stddev
+        self.chunk_chars = max(1, chunk_chars)
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+        self.error_status_codes = tuple(error_status_codes) or (529,)
+        self._random = random.Random(seed)
+
+        self.calls = 0
+        self.injected_errors = 0
+
+    def _latency(self) -> float:
+        """Draw a time to first token from the configured distribution."""
+        mean, stddev = self.latency_mean, self.latency_stddev
+        if mean <= 0:
+            return 0.0
+        if self.latency_distribution == "uniform":
+            return self._random.uniform(max(0.0, mean - stddev), mean + stddev)
+        if self.latency_distribution == "normal":
+            return max(0.0, self._random.gauss(mean, stddev))
+        if self.latency_distribution == "lognormal":
+            # Parameters chosen so the draws have the configured mean and standard deviation
+            variance_ratio = 1 + (stddev / mean) ** 2
+            return self._random.lognormvariate(
+                math.log(mean / math.sqrt(variance_ratio)), math.sqrt(math.log(variance_ratio))
+            )
+        if self.latency_distribution == "exponential":
+            return self._random.expovariate(1.0 / mean)
+        return mean
+
+    def _maybe_fail(self) -> None:
+        """Raise an injected error for error_rate of calls."""
+        if self.error_rate > 0 and self._random.random() < self.error_rate:
+            self.injected_errors += 1
+            status_code = self._random.choice(self.error_status_codes)
+            raise LLMStatusError(status_code, "Injected error from local LLM backend")
+
+    def _respond(self, params: dict) -> LLMResponse:
+        """Select the response for params and estimate its token usage."""
+        messages = params.get("messages") or []
+        prompt = ""
+        if messages:
+            content = messages[-1].get("content", "")
+            if isinstance(content, list):
+                content = "".join(block.get("text", "") for block in content)
+            prompt = content
+
+        lowered = prompt.casefold()
+        text = next(
+            (response for keyword, response in self.canned_responses if keyword in lowered),
+            self.default_response
+        ).replace("{prompt}", prompt)
+
+        system = params.get("system") or ""
+        if isinstance(system, list):
+            system = "".join(block.get("text", "") for block in system)
+        input_tokens = _system_prompt_tokens(system) + sum(
+            estimate_tokens(message["content"]) if isinstance(message.get("content"), str)
+            else sum(estimate_tokens(block.get("text", "")) for block in message.get("content", []))
+            for message in messages
+        )
+        output_tokens = min(estimate_tokens(text), params.get("max_tokens") or estimate_tokens(text))
+
+        return LLMResponse(
+            text=text,
+            usage=TokenUsage(input_tokens=input_tokens, output_tokens=output_tokens),
+            model=params.get("model", ""),
+            stop_reason="end_turn"
+        )
+
+    async def create(self, params: dict, timeout: float) -> LLMResponse:
+        self.calls += 1
+        response = self._respond(params)
+        delay = self._latency() + self.chunk_delay * (-(-len(response.text) // self.chunk_chars) - 1)
+        if delay > timeout:
+            await asyncio.sleep(timeout)
+            raise LLMConnectionError("Local LLM backend timed out")
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._maybe_fail()
+        return response
+
+    async def stream(self, params: dict, timeout: float) -> AsyncIterator[Union[str, LLMResponse]]:
+        self.calls += 1
+        started = time.monotonic()
+        response = self._respond(params)
+        first_token_delay = self._latency()
+        if first_token_delay > timeout:
+            await asyncio.sleep(timeout)
+            raise LLMConnectionError("Local LLM backend timed out")
+        if first_token_delay > 0:
+            await asyncio.sleep(first_token_delay)
+        self._maybe_fail()
+
+        text = response.text
+        for offset in range(0, len(text), self.chunk_chars):
+            if offset and self.chunk_delay > 0:
+                await asyncio.sleep(self.chunk_delay)
+            if time.monotonic() - started > timeout:
+                raise LLMConnectionError("Local LLM backend timed out")
+            yield text[offset:offset + self.chunk_chars]
+        yield response
+
+    def stats(self) -> Dict[str, int]:
+        """Return call and injected error counters."""
+        return {"calls": self.calls, "injected_errors": self.injected_errors}
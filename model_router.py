@@ -0,0 +1,181 @@
+"""
+Model Router for Dr. Walter Reed's Interventional Cardiology Agent
+
+Classifies each consultation query locally (service catalog, logistics or
+clinical depth) and picks the Claude model and response length for it. Catalog
+and logistics questions go to a fast model with a short max_tokens; anything
+with clinical content, anything long and anything unrecognized goes to the
+deep model. All keywords are compiled into one regex, so classification is a
+single pass over the query. A query that matches no keyword is classified as
+unrecognized, not clinical, even though it takes the same deep route.
+
+Per-route latency, token and cost statistics show what the routing saves.
+"""
+
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVICE_CATALOG = "service_catalog"
+LOGISTICS = "logistics"
+CLINICAL = "clinical"
+UNRECOGNIZED = "unrecognized"
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Model and response length limit chosen for a query class."""
+    
+    name: str
+    model: str
+    max_tokens: int
+
+
+@dataclass(frozen=True)
+class ModelPricing:
+    """Model prices in USD per million tokens."""
+    
+    input_cost_per_mtok: float
+    output_cost_per_mtok: float
+    
+    def cost(self, usage) -> float:
+        """Cost of one response usage block, billing prompt cache reads and writes at their rates."""
+        input_tokens = getattr(usage, "input_tokens", None) or 0
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_creation = getattr(usage, "cache_creation_input_tokens", None) or 0
+        output_tokens = getattr(usage, "output_tokens", None) or 0
+        return (
+            (input_tokens + 0.1 * cache_read + 1.25 * cache_creation) * self.input_cost_per_mtok
+            + output_tokens * self.output_cost_per_mtok
+        ) / 1_000_000
+
+
+class RouteStats:
+    """Request count, latency window, token usage and cost of one route."""
+    
+    def __init__(self, pricing: ModelPricing, latency_window: int):
+        self.pricing = pricing
+        self.requests = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+    
+    def record(self, latency: float, usage=None) -> None:
+        """Record the latency (seconds) and, if available, token usage of one response."""
+        self.requests += 1
+        self._latencies.append(latency)
+        if usage is not None:
+            self.input_tokens += (
+                (getattr(usage, "input_tokens", None) or 0)
+                + (getattr(usage, "cache_read_input_tokens", None) or 0)
+                + (getattr(usage, "cache_creation_input_tokens", None) or 0)
+            )
+            self.output_tokens += getattr(usage, "output_tokens", None) or 0
+            self.cost_usd += self.pricing.cost(usage)
+    
+    def as_dict(self) -> Dict[str, float]:
+        """Return counters plus median and p95 latency over the recent window."""
+        latencies = sorted(self._latencies)
+        
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))]
+        
+        return {
+            "requests": self.requests,
+            "latency_p50": percentile(50),
+            "latency_p95": percentile(95),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost_usd, 6)
+        }
+
+
+class QueryClassifier:
+    """
+    Single-pass keyword classifier of consultation queries.
+    
+    Args:
+        class_keywords: Keywords per class name; clinical keywords take precedence,
+            then classes in the order given
+    """
+    
+    def __init__(self, class_keywords: Dict[str, List[str]]):
+        self._class_order = [CLINICAL] + [name for name in class_keywords if name != CLINICAL]
+        
+        # Keyword -> query class, longer keywords first so they win overlapping matches
+        self._keyword_class: Dict[str, str] = {}
+        for class_name in self._class_order:
+            for keyword in class_keywords.get(class_name, []):
+                self._keyword_class.setdefault(keyword.lower(), class_name)
+        
+        self._regex = None
+        if self._keyword_class:
+            alternatives = sorted(self._keyword_class, key=len, reverse=True)
+            self._regex = re.compile(r"\b(?:" + "|".join(map(re.escape, alternatives)) + ")")
+    
+    def classify(self, user_text: str) -> str:
+        """Return the query class of user_text, or UNRECOGNIZED when no keyword matches."""
+        if self._regex is None:
+            return UNRECOGNIZED
+        matched = {self._keyword_class[match.group(0)] for match in self._regex.finditer(user_text.lower())}
+        for class_name in self._class_order:
+            if class_name in matched:
+                return class_name
+        return UNRECOGNIZED
+
+
+class ModelRouter:
+    """
+    Keyword and length based query router.
+    
+    Args:
+        deep_route: Route for clinical and unrecognized queries
+        fast_routes: Routes for the service catalog and logistics classes, by class name
+        classifier: Query classifier, shared with the agent
+        fast_max_words: Queries longer than this always take the deep route
+        pricing: Prices per model name, for cost stats
+        latency_window: Number of recent latencies kept per route
+    """
+    
+    def __init__(self, deep_route: ModelRoute, fast_routes: Dict[str, ModelRoute],
+                 classifier: QueryClassifier, fast_max_words: int,
+                 pricing: Dict[str, ModelPricing], latency_window: int = 200):
+        self.deep_route = deep_route
+        self.fast_routes = fast_routes
+        self.classifier = classifier
+        self.fast_max_words = fast_max_words
+        
+        no_pricing = ModelPricing(0.0, 0.0)
+        self._stats: Dict[str, RouteStats] = {
+            route.name: RouteStats(pricing.get(route.model, no_pricing), latency_window)
+            for route in (deep_route, *fast_routes.values())
+        }
+    
+    def route(self, user_text: str, query_class: Optional[str] = None) -> ModelRoute:
+        """
+        Return the route to serve user_text with.
+        
+        query_class is the classifier's verdict when the caller already has it.
+        """
+        if len(user_text.split()) > self.fast_max_words:
+            return self.deep_route
+        if query_class is None:
+            query_class = self.classifier.classify(user_text)
+        return self.fast_routes.get(query_class, self.deep_route)
+    
+    def record(self, route: ModelRoute, latency: float, usage=None) -> None:
+        """Record the outcome of a response served by route."""
+        stats = self._stats.get(route.name)
+        if stats is not None:
+            stats.record(latency, usage)
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return per-route latency, token and cost statistics."""
+        return {name: stats.as_dict() for name, stats in self._stats.items()}
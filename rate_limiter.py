@@ -0,0 +1,114 @@
+"""
+Rate Limiting for Dr. Walter Reed's Interventional Cardiology Agent
+
+In-process token-bucket limiter keyed by caller identity, enforcing
+RATE_LIMIT_RPM so one noisy calling agent cannot monopolize the Claude quota.
+
+Each key holds two floats (token count and last refill time) and refills
+lazily on access, so checking a request is O(1) with no background timers.
+Buckets live in an OrderedDict in last-access order; a bucket idle long enough
+to have refilled completely is indistinguishable from a new one, so idle
+buckets are dropped from the front as new requests arrive and memory tracks
+the number of recently active callers.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class _Bucket:
+    """Token count of one caller and when it was last refilled."""
+    
+    __slots__ = ("tokens", "updated")
+    
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token bucket with fixed memory per key and idle-key eviction.
+    
+    Args:
+        requests_per_minute: Sustained rate allowed per key
+        burst: Bucket capacity (requests a key may make at once after being idle)
+        max_keys: Upper bound on tracked keys; the least recently seen key is
+            dropped beyond it
+    """
+    
+    def __init__(self, requests_per_minute: float, burst: int, max_keys: int):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.max_keys = max_keys
+        
+        # A bucket untouched this long is full again and can be forgotten
+        self.idle_seconds = self.capacity / self.rate if self.rate > 0 else float("inf")
+        
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+        
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+    
+    def acquire(self, key: str) -> float:
+        """
+        Take one token for key.
+        
+        Returns:
+            0.0 if the request is allowed, otherwise the seconds until a token
+            becomes available (infinite when the configured rate is zero)
+        """
+        # A zero rate admits nothing, so no bucket is worth tracking
+        if self.rate <= 0:
+            self.limited += 1
+            return float("inf")
+        
+        now = time.monotonic()
+        self._evict_idle(now)
+        
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(self.capacity, now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+            self._buckets.move_to_end(key)
+        
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            self.allowed += 1
+            return 0.0
+        
+        self.limited += 1
+        return (1.0 - bucket.tokens) / self.rate
+    
+    def _evict_idle(self, now: float) -> None:
+        """Drop buckets, oldest access first, that have been idle long enough to refill."""
+        buckets = self._buckets
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if now - oldest.updated < self.idle_seconds:
+                break
+            buckets.popitem(last=False)
+            self.evictions += 1
+    
+    def __len__(self) -> int:
+        return len(self._buckets)
+    
+    def stats(self) -> Dict[str, int]:
+        """Return tracked key count and allow/limit/eviction counters."""
+        return {
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evictions": self.evictions
+        }
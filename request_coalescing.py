@@ -0,0 +1,161 @@
+"""
+Request Coalescing for Dr. Walter Reed's Interventional Cardiology Agent
+
+Single-flight coalescing of identical concurrent Claude requests. When a referral
+network broadcasts the same question from many agents at once, only the first
+request goes upstream and every concurrent duplicate waits for its result,
+or subscribes to its stream of text deltas.
+"""
+
+import asyncio
+import contextlib
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _InFlightCall:
+    """
+    A shared upstream call and the number of callers waiting on it.
+
+    Streamed calls also keep the deltas produced so far, so subscribers that
+    join late replay them, and an event that is set whenever a delta arrives.
+    """
+
+    __slots__ = ("future", "waiters", "chunks", "changed")
+
+    def __init__(self, future: Optional[asyncio.Future] = None, streamed: bool = False):
+        self.future = future
+        self.waiters = 0
+        self.chunks: Optional[List[str]] = [] if streamed else None
+        self.changed: Optional[asyncio.Event] = asyncio.Event() if streamed else None
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between all concurrent callers with the same key.
+
+    Calls run as a separate task, so a cancelled, timed out or disconnected
+    caller does not cancel the result for the others; the upstream call is only
+    cancelled once every waiter has gone. The call itself must not depend on
+    which caller started it (its deadline or where its result is stored), since
+    that caller may leave first. Streamed calls made through stream() are
+    consumed by that task too and their text deltas are fanned out to every
+    subscriber; do() callers joining a stream receive the complete text.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _InFlightCall] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """
+        Run fn for key, or join the identical call that is already in flight.
+
+        timeout bounds only this caller's wait: on expiry it raises
+        asyncio.TimeoutError while the shared call carries on for the others.
+        """
+        call = self._join(key)
+        if call is None:
+            call = self._register(key, _InFlightCall(asyncio.ensure_future(fn())))
+
+        call.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(call.future), timeout)
+        finally:
+            self._leave(key, call)
+
+    async def stream(self, key: str, open_stream: Callable[[], AsyncIterator[str]],
+                     timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Stream the text deltas of open_stream() for key, or subscribe to the identical stream in flight.
+
+        A subscriber joining late first receives the deltas it missed. When the
+        call in flight for key is a do() call, its complete result is yielded
+        as a single delta. Upstream errors are raised to every subscriber.
+        timeout bounds only this subscriber, as in do().
+        """
+        loop = asyncio.get_running_loop()
+        expires_at = None if timeout is None else loop.time() + timeout
+
+        call = self._join(key)
+        if call is None:
+            call = _InFlightCall(streamed=True)
+            call.future = asyncio.ensure_future(self._pump(call, open_stream))
+            self._register(key, call)
+
+        call.waiters += 1
+        try:
+            if call.chunks is None:
+                yield await asyncio.wait_for(asyncio.shield(call.future), timeout)
+                return
+
+            index = 0
+            while True:
+                if index < len(call.chunks):
+                    index += 1
+                    yield call.chunks[index - 1]
+                    continue
+                if call.future.done():
+                    call.future.result()
+                    return
+                remaining = None if expires_at is None else max(0.0, expires_at - loop.time())
+                await asyncio.wait_for(call.changed.wait(), remaining)
+        finally:
+            self._leave(key, call)
+
+    @staticmethod
+    async def _pump(call: _InFlightCall, open_stream: Callable[[], AsyncIterator[str]]) -> str:
+        """Consume a shared stream, publishing each delta to the subscribers; return the complete text."""
+        try:
+            async with contextlib.aclosing(open_stream()) as deltas:
+                async for delta in deltas:
+                    call.chunks.append(delta)
+                    changed, call.changed = call.changed, asyncio.Event()
+                    changed.set()
+            return "".join(call.chunks)
+        finally:
+            call.changed.set()
+
+    def _join(self, key: str) -> Optional[_InFlightCall]:
+        """Return the live call in flight for key, if any, counting the caller as coalesced."""
+        call = self._calls.get(key)
+        if call is None:
+            return None
+        self.coalesced += 1
+        logger.debug(f"Coalescing request onto in-flight call ({call.waiters} waiting)")
+        return call
+
+    def _leave(self, key: str, call: _InFlightCall) -> None:
+        """Drop one waiter, cancelling the shared call once nobody is waiting for it."""
+        call.waiters -= 1
+        if call.waiters == 0 and not call.future.done():
+            # Forget it now so a caller arriving before the cancellation lands starts afresh
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            call.future.cancel()
+
+    def _register(self, key: str, call: _InFlightCall) -> _InFlightCall:
+        """Track a new leading call until it completes."""
+        self._calls[key] = call
+        self.leaders += 1
+        call.future.add_done_callback(lambda done: self._release(key, done))
+        return call
+
+    def _release(self, key: str, future: asyncio.Future) -> None:
+        """Forget a finished call and mark any exception as retrieved."""
+        call = self._calls.get(key)
+        if call is not None and call.future is future:
+            del self._calls[key]
+        if future.done() and not future.cancelled():
+            future.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Return coalescing counters and the number of calls in flight."""
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced
+        }
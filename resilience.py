@@ -0,0 +1,490 @@
+"""
+LLM Call Resilience for Dr. Walter Reed's Interventional Cardiology Agent
+
+Wraps upstream Claude calls with:
+- Retries using full-jitter exponential backoff that honor Retry-After
+- Hedged requests: once a call runs past the observed p95 latency a second
+  identical request is fired and the first response wins. Hedges are capped
+  by a token bucket (a share of calls) and need a free concurrency slot, so
+  they never multiply upstream load during an overload
+- A per-request deadline budget shared by every attempt, backoff and hedge
+- A circuit breaker that fails fast while the backend is unhealthy
+
+Retry and hedge counters are published through ResilientCaller.stats() so tail
+latency can be traded against the extra upstream spend.
+"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+import anthropic
+
+from llm_backend import LLMConnectionError, LLMStatusError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Takes a concurrency slot for a hedged request without waiting and returns its
+# release callback, or returns None when no slot is free
+HedgeSlot = Callable[[], Optional[Callable[[], None]]]
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server/overload errors
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+# HTTP statuses that mean the upstream wants less concurrency: rate limited or overloaded
+OVERLOAD_STATUS_CODES = frozenset({429, 529})
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline budget runs out."""
+
+
+class TaskDeadlineExceeded(DeadlineExceeded):
+    """Raised when a task's overall deadline runs out; the task fails rather than answering."""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the backend while the circuit breaker is open."""
+
+
+class Deadline:
+    """Absolute deadline for a request, measured on the monotonic clock."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, timeout_seconds: float):
+        self.expires_at = time.monotonic() + timeout_seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str) -> float:
+        """Return the remaining budget, raising DeadlineExceeded if none is left."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded before {stage}")
+        return remaining
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies for percentile estimates."""
+
+    def __init__(self, window: int, min_samples: int):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Return the given latency percentile, or None until enough samples exist."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an upstream error is transient and worth retrying."""
+    if isinstance(error, (anthropic.APIConnectionError, anthropic.APITimeoutError, LLMConnectionError)):
+        return True
+    if isinstance(error, (anthropic.APIStatusError, LLMStatusError)):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def is_overload(error: BaseException) -> bool:
+    """Whether an upstream error signals rate limiting or overload."""
+    return (
+        isinstance(error, (anthropic.APIStatusError, LLMStatusError))
+        and error.status_code in OVERLOAD_STATUS_CODES
+    )
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Extract the server's requested retry delay from Retry-After headers, if any."""
+    if isinstance(error, LLMStatusError):
+        return error.retry_after
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+        if retry_at is None:
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+
+class ResilientCaller:
+    """
+    Retry, hedge and deadline policy for upstream LLM calls.
+
+    Args:
+        max_retries: Retries after the first attempt for transient errors
+        base_delay: Backoff base in seconds (doubled per retry, full jitter)
+        max_delay: Upper bound of a single backoff sleep
+        hedging_enabled: Fire a second request once an attempt runs past the hedge percentile
+        hedge_percentile: Latency percentile that triggers a hedge
+        latency_window: Number of recent latencies tracked
+        hedge_min_samples: Latencies required before hedging starts
+        hedge_budget_ratio: Hedge tokens earned per call; each hedge spends one
+        hedge_budget_burst: Most hedge tokens that can be saved up
+    """
+
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float,
+                 hedging_enabled: bool, hedge_percentile: float, latency_window: int,
+                 hedge_min_samples: int, hedge_budget_ratio: float = 0.05,
+                 hedge_budget_burst: float = 5.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedging_enabled = hedging_enabled
+        self.hedge_percentile = hedge_percentile
+        self.latency = LatencyTracker(latency_window, hedge_min_samples)
+        self.hedge_budget_ratio = hedge_budget_ratio
+        self.hedge_budget_burst = max(1.0, hedge_budget_burst)
+        self._hedge_tokens = 0.0
+
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_over_budget = 0
+        self.hedges_without_slot = 0
+        self.deadline_exceeded = 0
+        self.failures = 0
+
+    def backoff_delay(self, retry: int, error: BaseException) -> float:
+        """Delay before the given retry: Retry-After if sent, else full-jitter backoff."""
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+    async def call(self, fn: Callable[[float], Awaitable[T]], deadline: Deadline,
+                   hedge_slot: Optional[HedgeSlot] = None) -> T:
+        """
+        Call fn(timeout) under the retry, hedge and deadline policy.
+
+        fn receives the remaining deadline budget to use as its upstream timeout.
+        A hedge is only fired when the hedge budget has a token and hedge_slot
+        (if given) grants a concurrency slot for it.
+        """
+        self.calls += 1
+        self._hedge_tokens = min(self.hedge_budget_burst, self._hedge_tokens + self.hedge_budget_ratio)
+        retry = 0
+        while True:
+            try:
+                return await self._attempt(fn, deadline, hedge_slot)
+            except DeadlineExceeded:
+                self.deadline_exceeded += 1
+                raise
+            except Exception as e:
+                if not is_retryable(e) or retry >= self.max_retries:
+                    self.failures += 1
+                    raise
+
+                delay = self.backoff_delay(retry, e)
+                if delay >= deadline.remaining():
+                    self.failures += 1
+                    raise
+
+                retry += 1
+                self.retries += 1
+                logger.warning(f"Retrying Claude call ({retry}/{self.max_retries}) in {delay:.2f}s after: {str(e)}")
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, fn: Callable[[float], Awaitable[T]], deadline: Deadline,
+                       hedge_slot: Optional[HedgeSlot] = None) -> T:
+        """One attempt, hedged with a second request if it runs past the hedge delay."""
+        self.attempts += 1
+        started = time.monotonic()
+        primary = asyncio.ensure_future(fn(deadline.check("upstream call")))
+        pending = {primary}
+
+        try:
+            hedge_delay = self.latency.percentile(self.hedge_percentile) if self.hedging_enabled else None
+            if hedge_delay is not None and hedge_delay < deadline.remaining():
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+                if not done:
+                    hedge = self._start_hedge(fn, deadline, hedge_slot)
+                    if hedge is not None:
+                        logger.info(f"Hedging Claude call after {hedge_delay:.2f}s")
+                        pending.add(hedge)
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=deadline.remaining(), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise DeadlineExceeded("Deadline exceeded waiting for Claude response")
+
+                for finished in done:
+                    if finished.exception() is None:
+                        if finished is not primary:
+                            self.hedge_wins += 1
+                        self.latency.record(time.monotonic() - started)
+                        return finished.result()
+                    error = finished.exception()
+
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _start_hedge(self, fn: Callable[[float], Awaitable[T]], deadline: Deadline,
+                     hedge_slot: Optional[HedgeSlot]) -> Optional[asyncio.Future]:
+        """Fire a hedged request if the budget and a free slot allow it."""
+        if self._hedge_tokens < 1.0:
+            self.hedges_over_budget += 1
+            return None
+        release = hedge_slot() if hedge_slot is not None else None
+        if hedge_slot is not None and release is None:
+            self.hedges_without_slot += 1
+            return None
+
+        self._hedge_tokens -= 1.0
+        self.hedges += 1
+        hedge = asyncio.ensure_future(fn(deadline.check("hedged call")))
+        if release is not None:
+            # A done callback also runs if the hedge is cancelled before it starts
+            hedge.add_done_callback(lambda _: release())
+        return hedge
+
+    async def stream(self, open_stream: Callable[[float], AsyncIterator[T]],
+                     deadline: Deadline) -> AsyncIterator[T]:
+        """
+        Iterate a streamed call under the retry and deadline policy.
+
+        open_stream(timeout) returns a fresh async iterator per attempt. Transient
+        errors are retried only until the first item has been yielded; after that
+        an error is raised to the caller. Streams are not hedged.
+        """
+        self.calls += 1
+        retry = 0
+        while True:
+            self.attempts += 1
+            started = time.monotonic()
+            yielded = False
+            iterator = open_stream(deadline.check("upstream stream"))
+            try:
+                while True:
+                    try:
+                        item = await asyncio.wait_for(iterator.__anext__(), timeout=deadline.check("next delta"))
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        raise DeadlineExceeded("Deadline exceeded while streaming Claude response")
+                    if not yielded:
+                        yielded = True
+                        self.latency.record(time.monotonic() - started)
+                    yield item
+                return
+            except DeadlineExceeded:
+                self.deadline_exceeded += 1
+                raise
+            except Exception as e:
+                if yielded or not is_retryable(e) or retry >= self.max_retries:
+                    self.failures += 1
+                    raise
+
+                delay = self.backoff_delay(retry, e)
+                if delay >= deadline.remaining():
+                    self.failures += 1
+                    raise
+
+                retry += 1
+                self.retries += 1
+                logger.warning(f"Retrying Claude stream ({retry}/{self.max_retries}) in {delay:.2f}s after: {str(e)}")
+                await asyncio.sleep(delay)
+            finally:
+                await iterator.aclose()
+
+    def stats(self) -> Dict[str, float]:
+        """Return retry, hedge and deadline counters plus the current hedge latency."""
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedges_over_budget": self.hedges_over_budget,
+            "hedges_without_slot": self.hedges_without_slot,
+            "deadline_exceeded": self.deadline_exceeded,
+            "failures": self.failures,
+            "hedge_latency_seconds": self.latency.percentile(self.hedge_percentile) or 0.0
+        }
+
+
+@dataclass(frozen=True)
+class BreakerPermit:
+    """
+    A call admitted by the circuit breaker, handed back with its outcome.
+
+    generation identifies the breaker state period the call was admitted in;
+    probe marks the limited half-open calls that decide whether the circuit closes.
+    """
+
+    generation: int
+    probe: bool = False
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over a sliding window of recent upstream call outcomes.
+
+    The circuit opens when the failure rate or the slow-call rate of the last
+    window_size calls crosses its threshold. While open every call fails fast
+    with CircuitOpenError; after open_seconds a limited number of half-open
+    probe calls are let through, and the circuit closes again if they succeed.
+
+    Only transient upstream errors and deadline misses count as failures;
+    request errors such as a 400 leave the circuit untouched. Every call
+    reports its outcome with the BreakerPermit returned by before_call(), and
+    outcomes of calls admitted before the last state change are ignored, so a
+    slow call from a closed period cannot close (or reopen) a half-open circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_rate_threshold: float, slow_call_seconds: float,
+                 slow_call_rate_threshold: float, window_size: int, min_calls: int,
+                 open_seconds: float, half_open_max_calls: int):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window_size)  # (failed, slow) per call
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._generation = 0
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Whether before_call() would reject a call now; unlike before_call(), never admits one."""
+        if self.state == self.OPEN:
+            return time.monotonic() - self._opened_at < self.open_seconds
+        return self.state == self.HALF_OPEN and self._probes_in_flight >= self.half_open_max_calls
+
+    def before_call(self) -> BreakerPermit:
+        """Admit a call or raise CircuitOpenError to fail fast; report its outcome with the permit."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                raise CircuitOpenError("Claude circuit breaker is open")
+            self._transition(self.HALF_OPEN)
+            self._probes_in_flight = 0
+            logger.info("Claude circuit breaker half-open, probing backend")
+
+        if self.state == self.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError("Claude circuit breaker is half-open and probing")
+            self._probes_in_flight += 1
+            return BreakerPermit(self._generation, probe=True)
+
+        return BreakerPermit(self._generation)
+
+    def on_success(self, permit: BreakerPermit, latency_seconds: float) -> None:
+        """Record a successful call and its latency."""
+        if permit.generation != self._generation:
+            return
+        if permit.probe:
+            self._probes_in_flight -= 1
+            if latency_seconds < self.slow_call_seconds:
+                self._close()
+            else:
+                self._open()
+            return
+        self._record(False, latency_seconds >= self.slow_call_seconds)
+
+    def on_failure(self, permit: BreakerPermit, error: BaseException) -> None:
+        """Record a failed call; errors that say nothing about backend health are ignored."""
+        if permit.generation != self._generation:
+            return
+        # A caller's own task deadline running out says nothing about the backend
+        countable = (
+            isinstance(error, DeadlineExceeded) and not isinstance(error, TaskDeadlineExceeded)
+        ) or is_retryable(error)
+        if permit.probe:
+            self._probes_in_flight -= 1
+            if countable:
+                self._open()
+            return
+        if countable:
+            self._record(True, False)
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        """Add an outcome to the window and open the circuit if a threshold is crossed."""
+        self._outcomes.append((failed, slow))
+        if self.state != self.CLOSED or len(self._outcomes) < self.min_calls:
+            return
+
+        failure_rate = sum(1 for failed, _ in self._outcomes if failed) / len(self._outcomes)
+        slow_rate = sum(1 for _, slow in self._outcomes if slow) / len(self._outcomes)
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+            logger.warning(
+                f"Opening Claude circuit breaker (failure rate {failure_rate:.0%}, slow rate {slow_rate:.0%})"
+            )
+            self._open()
+
+    def _transition(self, state: str) -> None:
+        """Enter state, starting a new generation so outcomes of earlier calls are ignored."""
+        self.state = state
+        self._generation += 1
+
+    def _open(self) -> None:
+        self._transition(self.OPEN)
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def _close(self) -> None:
+        logger.info("Claude circuit breaker closed, backend healthy")
+        self._transition(self.CLOSED)
+        self._outcomes.clear()
+
+    def stats(self) -> Dict[str, object]:
+        """Return the breaker state and counters."""
+        return {
+            "state": self.state,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "window_calls": len(self._outcomes)
+        }
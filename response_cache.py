@@ -0,0 +1,249 @@
+"""
+Response Cache for Dr. Walter Reed's Interventional Cardiology Agent
+
+Bounded in-process cache of Claude responses for repeat consultation questions.
+Calling agents ask the same service-catalog and procedure questions many times
+a day; serving those from memory avoids a full Claude round trip.
+
+Entries are keyed on the normalized query, a hash of the conversation history,
+the model, the temperature and a hash of the system prompt, and are evicted by
+LRU order, TTL expiry and a total memory cap.
+
+With several worker processes, SharedResponseCache adds a SQLite file shared
+by every worker on the host behind the in-process cache, so an answer produced
+by one worker serves repeat questions on all of them.
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """Normalize a query for cache lookups (case folding and whitespace collapsing)."""
+    return " ".join(text.casefold().split())
+
+
+def hash_text(text: str) -> str:
+    """Stable hex digest for prompt and history fingerprints."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of consultation responses with a memory cap.
+
+    Lookups and insertions are O(1); the byte size of each entry is tracked so
+    the cache never holds more than max_bytes of response text.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        # key -> (response_text, expires_at, size_bytes)
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(user_text: str, conversation_history: List[dict], model: str,
+                 temperature: float, system_prompt_hash: str) -> str:
+        """Build a cache key from everything that determines the Claude response."""
+        history_hash = hash_text(json.dumps(
+            [(msg.get("role"), msg.get("content")) for msg in conversation_history],
+            ensure_ascii=False
+        ))
+        return hash_text("\x1f".join([
+            normalize_query(user_text),
+            history_hash,
+            model,
+            repr(temperature),
+            system_prompt_hash
+        ]))
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[str]:
+        """
+        Return the cached response for key, or None if missing or expired.
+
+        Expired entries stay in place until LRU eviction or replacement, so
+        with allow_stale they can still be served while the backend is down.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        response_text, expires_at, size_bytes = entry
+        if expires_at <= time.monotonic():
+            if allow_stale:
+                self.stale_hits += 1
+                return response_text
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response_text
+
+    async def aget(self, key: str, allow_stale: bool = False) -> Optional[str]:
+        """Awaitable get(), for caches with tiers that must not be read on the event loop."""
+        return self.get(key, allow_stale)
+
+    def put(self, key: str, response_text: str, ttl_seconds: Optional[float] = None) -> None:
+        """Store a response, evicting least recently used entries as needed."""
+        size_bytes = len(response_text.encode("utf-8")) + len(key)
+        if size_bytes > self.max_bytes or self.max_entries <= 0:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
+        self._entries[key] = (response_text, time.monotonic() + ttl_seconds, size_bytes)
+        self._bytes += size_bytes
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry and release its accounted bytes."""
+        _, _, size_bytes = self._entries.pop(key)
+        self._bytes -= size_bytes
+
+    def stats(self) -> Dict[str, int]:
+        """Return live cache size and hit/miss counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+class SharedResponseCache(ResponseCache):
+    """
+    ResponseCache with a second tier in a SQLite file shared between processes.
+
+    The in-process LRU is checked first. Misses fall through to SQLite, and
+    new responses are written to both tiers. Shared entries carry wall-clock
+    expiry times, since monotonic clocks differ between processes, and are
+    kept for one TTL past expiry so they can still be served stale while the
+    backend is down. SQLite is only touched on in-process misses (through
+    aget()) and new responses; both are primary-key operations on a local
+    WAL-mode file, run on the thread that owns the connection. put() returns
+    once the in-process tier is updated and the shared write is queued. A
+    failing shared tier is logged and treated as a miss.
+    """
+
+    # Puts between deletions of long-expired shared entries
+    PRUNE_EVERY = 256
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: int, path: str):
+        super().__init__(max_entries, ttl_seconds, max_bytes)
+        self.path = path
+        self._puts = 0
+
+        # One thread owns the connection, so SQLite calls never block the event loop
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-cache")
+        self._connection = self._executor.submit(self._connect).result()
+
+        self.shared_hits = 0
+        self.shared_errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the shared tier in WAL mode and create the schema (cache thread)."""
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)")
+        return connection
+
+    async def aget(self, key: str, allow_stale: bool = False) -> Optional[str]:
+        """Return the response for key from this process or, failing that, the shared tier."""
+        response_text = self.get(key, allow_stale)
+        if response_text is not None:
+            return response_text
+
+        try:
+            row = await asyncio.get_running_loop().run_in_executor(self._executor, self._select, key)
+        except sqlite3.Error as e:
+            self.shared_errors += 1
+            logger.warning(f"Shared response cache read failed: {str(e)}")
+            return None
+        if row is None:
+            return None
+
+        response_text, expires_at = row
+        remaining = expires_at - time.time()
+        if remaining <= 0 and not allow_stale:
+            return None
+
+        self.shared_hits += 1
+        if remaining > 0:
+            super().put(key, response_text, ttl_seconds=remaining)
+        return response_text
+
+    def put(self, key: str, response_text: str, ttl_seconds: Optional[float] = None) -> None:
+        """Store a response in this process and queue its write to the shared tier."""
+        super().put(key, response_text, ttl_seconds)
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
+
+        now = time.time()
+        self._puts += 1
+        prune_before = now - self.ttl_seconds if self._puts % self.PRUNE_EVERY == 0 else None
+        self._executor.submit(self._write, key, response_text, now + ttl_seconds, prune_before)
+
+    def _select(self, key: str) -> Optional[Tuple[str, float]]:
+        """Read the shared entry for key (cache thread)."""
+        return self._connection.execute(
+            "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+
+    def _write(self, key: str, response_text: str, expires_at: float, prune_before: Optional[float]) -> None:
+        """Write a shared entry and, now and then, delete long-expired ones (cache thread)."""
+        try:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires_at) VALUES (?, ?, ?)",
+                (key, response_text, expires_at)
+            )
+            if prune_before is not None:
+                self._connection.execute("DELETE FROM responses WHERE expires_at < ?", (prune_before,))
+        except sqlite3.Error as e:
+            self.shared_errors += 1
+            logger.warning(f"Shared response cache write failed: {str(e)}")
+
+    def close(self) -> None:
+        """Finish queued writes and close the shared tier."""
+        self._executor.submit(self._connection.close).result()
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Return in-process cache stats plus shared tier counters."""
+        return {
+            **super().stats(),
+            "shared_hits": self.shared_hits,
+            "shared_errors": self.shared_errors
+        }
@@ -0,0 +1,76 @@
+"""
+Response Classifier for Dr. Walter Reed's Interventional Cardiology Agent
+
+Decides in a single pass over a generated response whether it should be packaged
+as an artifact and which artifact name describes it. The response is lowercased
+once and all configured keywords are compiled into one regex, so post-processing
+stays O(n) in the response length however many keyword mappings are configured.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ArtifactDecision:
+    """Outcome of classifying a response for artifact packaging."""
+
+    create_artifact: bool
+    artifact_name: str
+
+
+class ResponseClassifier:
+    """
+    Single-pass keyword classifier for artifact decisions.
+
+    Args:
+        artifact_keywords: Keywords whose presence makes a response an artifact
+        name_rules: (keyword, artifact name) pairs in priority order
+        default_artifact_name: Name used when no naming keyword is present
+        min_artifact_length: Responses longer than this always become artifacts
+    """
+
+    def __init__(self, artifact_keywords: List[str], name_rules: List[Tuple[str, str]],
+                 default_artifact_name: str, min_artifact_length: int):
+        self.artifact_keywords = {keyword.lower() for keyword in artifact_keywords}
+        self.name_rules = [(keyword.lower(), name) for keyword, name in name_rules]
+        self.default_artifact_name = default_artifact_name
+        self.min_artifact_length = min_artifact_length
+
+        keywords = self.artifact_keywords | {keyword for keyword, _ in self.name_rules}
+
+        # A longer keyword match also implies every keyword it contains
+        # ("treatment plan" implies "treatment")
+        self._implied: Dict[str, Set[str]] = {
+            keyword: {other for other in keywords if other in keyword}
+            for keyword in keywords
+        }
+
+        self._regex = None
+        if keywords:
+            alternatives = sorted(keywords, key=len, reverse=True)
+            self._regex = re.compile("|".join(map(re.escape, alternatives)))
+
+    def classify(self, response_text: str) -> ArtifactDecision:
+        """Scan response_text once and return the artifact decision and name."""
+        found: Set[str] = set()
+        if self._regex is not None:
+            for match in self._regex.finditer(response_text.lower()):
+                found |= self._implied[match.group(0)]
+
+        create_artifact = (
+            len(response_text) > self.min_artifact_length
+            or not self.artifact_keywords.isdisjoint(found)
+        )
+
+        artifact_name = self.default_artifact_name
+        for keyword, name in self.name_rules:
+            if keyword in found:
+                artifact_name = name
+                break
+
+        return ArtifactDecision(create_artifact=create_artifact, artifact_name=artifact_name)
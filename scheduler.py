@@ -0,0 +1,357 @@
+"""
+Priority Scheduling for Dr. Walter Reed's Interventional Cardiology Agent
+
+Admission queue in front of the Claude call. Acute work (STEMI, acute MI,
+stroke onset and similar) and routine work wait in separate lanes, each ordered
+earliest-deadline-first. A share of the upstream concurrency is reserved for
+the acute lane, so a backlog of routine scheduling questions never delays an
+acute coronary syndrome consultation by more than one call.
+
+Urgency is detected locally from the caller's skill tags and the query text
+with one precompiled regex.
+
+The concurrency cap itself can be adaptive: AdaptiveConcurrencyLimit grows the
+number of in-flight permits while upstream latency stays near its baseline and
+cuts it on rate-limit (429) and overload (529) responses, so the agent rides
+the upstream capacity ceiling without manual tuning.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Iterable, List, Optional, Tuple
+
+from resilience import Deadline, DeadlineExceeded, is_overload
+
+logger = logging.getLogger(__name__)
+
+ACUTE = "acute"
+ROUTINE = "routine"
+LANES = (ACUTE, ROUTINE)
+
+# Latency signals of the adaptive limit, each compared only against its own baseline
+# (callers may qualify them further, e.g. per model route): time to first token of a
+# stream, and a whole response's duration per output token
+FIRST_TOKEN = "first_token"
+PER_OUTPUT_TOKEN = "per_output_token"
+
+
+class QueueWaitExceeded(DeadlineExceeded):
+    """Raised when a call waits longer than its deadline or the queue wait bound for a slot."""
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD concurrency limit steered by upstream latency and overload signals.
+    
+    Each completed upstream attempt reports its latency as one of several
+    signals (time to first token of a stream, or a whole response's duration
+    per output token), and every signal keeps its own averages, so a mix of
+    streaming and non-streaming calls or of short and long answers does not
+    read as a latency shift. While each signal's short-term latency average
+    stays within tolerance of its long-term baseline and the
+    permits are actually in use, the limit grows additively (about one permit
+    per limit's worth of completions). When latency drifts above tolerance the
+    limit shrinks gently in proportion; a 429 or 529 response cuts it
+    multiplicatively, at most once per cooldown so one burst of rejections
+    counts as one congestion event.
+    
+    Args:
+        initial_limit: Starting number of permits
+        min_limit: Lowest number of permits
+        max_limit: Highest number of permits
+        latency_tolerance: Short-term/baseline latency ratio still treated as stable
+        overload_backoff: Factor applied to the limit on a 429/529
+        cooldown_seconds: Minimum time between multiplicative decreases
+    """
+    
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int,
+                 latency_tolerance: float = 2.0, overload_backoff: float = 0.5,
+                 cooldown_seconds: float = 1.0):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_tolerance = latency_tolerance
+        self.overload_backoff = overload_backoff
+        self.cooldown_seconds = cooldown_seconds
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        
+        # Exponentially weighted latency averages per signal (seconds)
+        self._baseline: Dict[str, float] = {}
+        self._short_term: Dict[str, float] = {}
+        self._last_decrease = float("-inf")
+        
+        self.increases = 0
+        self.decreases = 0
+        self.overloads = 0
+    
+    @property
+    def limit(self) -> int:
+        """Current number of permits."""
+        return int(self._limit)
+    
+    @property
+    def shrinking(self) -> bool:
+        """Whether latency is above tolerance or the limit was cut within the cooldown."""
+        if time.monotonic() - self._last_decrease < self.cooldown_seconds:
+            return True
+        return any(self._ratio(signal) > self.latency_tolerance for signal in self._baseline)
+    
+    def _ratio(self, signal: str) -> float:
+        """Short-term to baseline latency ratio of a signal."""
+        baseline = self._baseline[signal]
+        return self._short_term[signal] / baseline if baseline > 0 else 1.0
+    
+    def on_sample(self, latency: float, in_flight: int, signal: str = FIRST_TOKEN) -> None:
+        """Adjust the limit after an upstream attempt reported latency seconds for signal."""
+        baseline = self._baseline.get(signal)
+        if baseline is None:
+            self._baseline[signal] = self._short_term[signal] = latency
+            return
+        self._short_term[signal] += 0.3 * (latency - self._short_term[signal])
+        # The baseline follows improvements quickly and degradations slowly
+        self._baseline[signal] = baseline + (0.3 if latency < baseline else 0.01) * (latency - baseline)
+        
+        ratio = self._ratio(signal)
+        if ratio <= self.latency_tolerance:
+            # Only grow when the permits are being used
+            if in_flight >= self._limit / 2 and self._limit < self.max_limit:
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+                self.increases += 1
+        else:
+            self._decrease(max(0.9, self.latency_tolerance / ratio))
+    
+    def on_overload(self) -> None:
+        """Cut the limit after an upstream 429/529."""
+        self.overloads += 1
+        self._decrease(self.overload_backoff)
+    
+    def _decrease(self, factor: float) -> None:
+        """Shrink the limit by factor unless it was shrunk within the cooldown."""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_seconds:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), self._limit * factor)
+        self.decreases += 1
+        logger.info(f"Reducing LLM concurrency limit to {self.limit}")
+    
+    def stats(self) -> Dict[str, float]:
+        """Return the current limit, latency averages per signal and adjustment counters."""
+        latencies = {}
+        for signal, baseline in self._baseline.items():
+            latencies[f"{signal}_baseline_latency"] = baseline
+            latencies[f"{signal}_short_term_latency"] = self._short_term[signal]
+        return {
+            "limit": self.limit,
+            **latencies,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "overloads": self.overloads
+        }
+
+
+class UrgencyClassifier:
+    """Single-pass detection of acute presentations in skill tags and query text."""
+    
+    def __init__(self, acute_terms: List[str]):
+        terms = sorted({term.casefold() for term in acute_terms if term.strip()}, key=len, reverse=True)
+        self._regex = None
+        if terms:
+            # Any whitespace run matches the space in a term ("acute  MI")
+            alternatives = (re.escape(term).replace(r"\ ", r"\s+") for term in terms)
+            self._regex = re.compile(r"\b(?:" + "|".join(alternatives) + r")\b")
+    
+    def classify(self, text: str, skill_tags: Optional[Iterable[str]] = None) -> str:
+        """Return ACUTE if any acute term appears in the tags or text, otherwise ROUTINE."""
+        if self._regex is None:
+            return ROUTINE
+        for tag in skill_tags or ():
+            if self._regex.search(tag.casefold()):
+                return ACUTE
+        return ACUTE if self._regex.search(text.casefold()) else ROUTINE
+
+
+class PriorityScheduler:
+    """
+    Two-lane admission control with reserved acute concurrency.
+    
+    At most max_concurrency calls run at once (or the current adaptive limit).
+    Routine calls may not use the reserved acute share of those slots; acute
+    calls may use any free slot and are always admitted before waiting routine
+    calls. Waiters in a lane are admitted earliest deadline first, ordered by
+    the deadline of the work they serve (such as the task's overall deadline)
+    when one is given, and a waiter whose own call deadline or the queue wait
+    bound passes fails with QueueWaitExceeded.
+    
+    Args:
+        max_concurrency: Upstream calls allowed in flight (initial value when adaptive)
+        reserved_acute: Slots only the acute lane may use, at max_concurrency
+        wait_window: Number of recent queue waits kept per lane for stats
+        max_queue_wait: Longest a call waits for a slot, in seconds
+        adaptive_limit: Optional adaptive limit replacing max_concurrency
+    """
+    
+    def __init__(self, max_concurrency: int, reserved_acute: int, wait_window: int = 200,
+                 max_queue_wait: float = float("inf"),
+                 adaptive_limit: Optional[AdaptiveConcurrencyLimit] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue_wait = max_queue_wait
+        self.adaptive_limit = adaptive_limit
+        
+        # The acute reservation scales with an adaptive limit
+        self.reserved_share = min(max(0, reserved_acute), self.max_concurrency - 1) / self.max_concurrency
+        
+        # Lane -> heap of (expires_at, sequence, future)
+        self._waiting: Dict[str, List[Tuple[float, int, asyncio.Future]]] = {lane: [] for lane in LANES}
+        self._active: Dict[str, int] = {lane: 0 for lane in LANES}
+        # Lane -> waiting future -> time it was queued, oldest first
+        self._queued_at: Dict[str, "OrderedDict[asyncio.Future, float]"] = {lane: OrderedDict() for lane in LANES}
+        self._sequence = itertools.count()
+        
+        self._admitted: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._expired: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._waits: Dict[str, Deque[float]] = {lane: deque(maxlen=wait_window) for lane in LANES}
+    
+    @asynccontextmanager
+    async def slot(self, lane: str, deadline: Deadline,
+                   order_by: Optional[Deadline] = None) -> AsyncIterator[None]:
+        """
+        Hold an upstream concurrency slot in lane for the duration of the block.
+        
+        The wait fails once deadline runs out; waiters are admitted in order of
+        order_by, defaulting to deadline.
+        """
+        await self._acquire(lane, deadline, order_by or deadline)
+        try:
+            yield
+        finally:
+            self._release(lane)
+    
+    def try_acquire(self, lane: str) -> bool:
+        """
+        Take a slot in lane only if one is free right now; release it with release().
+        
+        Used for optional extra work such as hedged requests, so it never jumps
+        ahead of queued calls and is refused while the adaptive limit is shrinking.
+        """
+        if any(self._waiting[queued] for queued in LANES) or not self._can_start(lane):
+            return False
+        if self.adaptive_limit is not None and self.adaptive_limit.shrinking:
+            return False
+        self._active[lane] += 1
+        return True
+    
+    def release(self, lane: str) -> None:
+        """Free a slot taken with try_acquire()."""
+        self._release(lane)
+    
+    @property
+    def concurrency_limit(self) -> int:
+        """Current number of upstream calls allowed in flight."""
+        if self.adaptive_limit is not None:
+            return self.adaptive_limit.limit
+        return self.max_concurrency
+    
+    @property
+    def in_flight(self) -> int:
+        """Number of upstream calls currently holding a slot."""
+        return sum(self._active.values())
+    
+    def queue_delay(self, lane: str) -> float:
+        """Seconds the oldest call still waiting in lane has been queued."""
+        queued = self._queued_at[lane]
+        if not queued:
+            return 0.0
+        return time.monotonic() - next(iter(queued.values()))
+    
+    def on_sample(self, latency: float, signal: str = FIRST_TOKEN) -> None:
+        """Report a latency signal of a completed upstream attempt to the adaptive limit."""
+        if self.adaptive_limit is not None:
+            self.adaptive_limit.on_sample(latency, self.in_flight, signal)
+            self._dispatch()
+    
+    def on_error(self, error: BaseException) -> None:
+        """Report a failed upstream attempt; 429/529 responses shrink the adaptive limit."""
+        if self.adaptive_limit is not None and is_overload(error):
+            self.adaptive_limit.on_overload()
+    
+    def _can_start(self, lane: str) -> bool:
+        """Check whether a call in lane may start now."""
+        limit = self.concurrency_limit
+        if self.in_flight >= limit:
+            return False
+        if lane == ROUTINE:
+            reserved = min(int(limit * self.reserved_share), limit - 1)
+            return self._active[ROUTINE] < limit - reserved
+        return True
+    
+    async def _acquire(self, lane: str, deadline: Deadline, order_by: Deadline) -> None:
+        """Wait for a slot in lane, in order_by order, until the deadline runs out."""
+        if not self._waiting[lane] and self._can_start(lane):
+            self._active[lane] += 1
+            self._admitted[lane] += 1
+            self._waits[lane].append(0.0)
+            return
+        
+        queued_at = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting[lane], (order_by.expires_at, next(self._sequence), future))
+        self._queued_at[lane][future] = queued_at
+        try:
+            await asyncio.wait_for(future, timeout=min(deadline.remaining(), self.max_queue_wait))
+        except asyncio.TimeoutError:
+            self._expired[lane] += 1
+            raise QueueWaitExceeded(
+                f"Timed out after {time.monotonic() - queued_at:.1f}s waiting for a {lane} LLM slot"
+            ) from None
+        except BaseException:
+            # A slot granted just as the waiter was cancelled must be handed on
+            if future.done() and not future.cancelled():
+                self._release(lane)
+            raise
+        finally:
+            del self._queued_at[lane][future]
+        self._waits[lane].append(time.monotonic() - queued_at)
+    
+    def _release(self, lane: str) -> None:
+        """Free a slot in lane and admit the next eligible waiters."""
+        self._active[lane] -= 1
+        self._dispatch()
+    
+    def _dispatch(self) -> None:
+        """Admit waiters, acute lane first, while slots are available."""
+        for lane in LANES:
+            waiting = self._waiting[lane]
+            while waiting and self._can_start(lane):
+                _, _, future = heapq.heappop(waiting)
+                if future.done():
+                    continue  # Timed out or cancelled while queued
+                self._active[lane] += 1
+                self._admitted[lane] += 1
+                future.set_result(None)
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return per-lane active, queued, admitted and expired counts plus p50/p99 queue wait."""
+        result = {"limit": self.adaptive_limit.stats() if self.adaptive_limit else {"limit": self.max_concurrency}}
+        for lane in LANES:
+            waits = sorted(self._waits[lane])
+            
+            def percentile(p: float) -> float:
+                if not waits:
+                    return 0.0
+                return waits[min(len(waits) - 1, int(p / 100 * len(waits)))]
+            
+            result[lane] = {
+                "active": self._active[lane],
+                "queued": sum(1 for _, _, future in self._waiting[lane] if not future.done()),
+                "admitted": self._admitted[lane],
+                "expired": self._expired[lane],
+                "wait_p50": percentile(50),
+                "wait_p99": percentile(99)
+            }
+        return result
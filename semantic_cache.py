@@ -0,0 +1,205 @@
+"""
+Semantic Cache for Dr. Walter Reed's Interventional Cardiology Agent
+
+Catches paraphrased FAQ traffic ("angioplasty info please" vs "tell me about
+angioplasty") that the exact-match response cache misses.
+
+Queries are embedded locally with a hashed word and character n-gram vectorizer,
+so no network or model download is needed. Cached query vectors live in one
+contiguous NumPy matrix and a lookup is a single matrix-vector product followed
+by an argmax over cosine similarities.
+
+Similarity alone cannot tell "stop clopidogrel" from "start clopidogrel" or a
+75-year-old from a 45-year-old, so each cached query also records its guard
+terms (numbers, negations and polarity words) and a match is only served when
+they are identical.
+"""
+
+import logging
+import re
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Conversational filler that carries no consultation meaning. Negations are
+# deliberately kept so "not a candidate for stenting" never matches its opposite.
+FILLER_WORDS = frozenset({
+    "a", "about", "an", "and", "any", "are", "can", "could", "details", "do", "does",
+    "explain", "for", "give", "hello", "hi", "i", "info", "information", "is", "it",
+    "know", "like", "me", "more", "need", "of", "on", "please", "provide", "regarding",
+    "some", "tell", "thanks", "the", "to", "us", "we", "what", "would", "you", "your"
+})
+
+# Negations flip clinical meaning, so they are weighted far above other words
+NEGATION_WORDS = frozenset({"no", "not", "never", "without", "cannot", "can't", "don't", "doesn't", "isn't"})
+
+# Words whose presence or absence flips or scopes a clinical question; a cached
+# answer is never reused when these differ between the two queries
+POLARITY_WORDS = NEGATION_WORDS | frozenset({
+    "start", "starting", "stop", "stopping", "continue", "continuing", "discontinue", "discontinuing",
+    "resume", "resuming", "hold", "holding", "increase", "increasing", "decrease", "decreasing",
+    "reduce", "raise", "lower", "higher", "high", "low", "before", "after", "pre", "post",
+    "above", "below", "over", "under", "with", "add", "remove", "avoid", "allow", "safe", "unsafe",
+    "indicated", "contraindicated", "maximum", "minimum", "max", "min", "less", "fewer",
+    "acute", "chronic", "elective", "emergency", "urgent", "male", "female", "pregnant"
+})
+
+NUMBER_WORDS = frozenset({
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "eleven", "twelve", "fifteen", "twenty", "thirty", "forty", "fifty", "sixty", "seventy",
+    "eighty", "ninety", "hundred", "once", "twice", "single", "double", "triple"
+})
+
+WORD_PATTERN = re.compile(r"[\w'-]+")
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)?")
+GUARD_WORD_PATTERN = re.compile(r"[a-z']+")
+
+
+class HashedNgramVectorizer:
+    """
+    Stateless text embedding from hashed word unigrams and character n-grams.
+
+    Uses a stable CRC32 hash (not Python's randomized hash) so vectors are
+    identical across processes and restarts.
+    """
+
+    def __init__(self, dimensions: int = 1024, char_ngram_sizes=(3, 4, 5)):
+        self.dimensions = dimensions
+        self.char_ngram_sizes = tuple(char_ngram_sizes)
+
+    def content_words(self, text: str) -> List[str]:
+        """Extract case-folded content words with conversational filler removed."""
+        return [word for word in WORD_PATTERN.findall(text.casefold()) if word not in FILLER_WORDS]
+
+    def guard_terms(self, text: str) -> frozenset:
+        """Numbers, negations and polarity words that must match exactly for a cached answer to apply."""
+        folded = text.casefold()
+        terms = {number.replace(",", ".") for number in NUMBER_PATTERN.findall(folded)}
+        terms.update(
+            word for word in GUARD_WORD_PATTERN.findall(folded)
+            if word in POLARITY_WORDS or word in NUMBER_WORDS
+        )
+        return frozenset(terms)
+
+    def transform(self, text: str) -> np.ndarray:
+        """Embed text as an L2-normalized float32 vector."""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        words = self.content_words(text)
+
+        for word in words:
+            weight = 8.0 if word in NEGATION_WORDS else 2.0
+            vector[zlib.crc32(b"w:" + word.encode("utf-8")) % self.dimensions] += weight
+
+        padded = f" {' '.join(words)} "
+        for size in self.char_ngram_sizes:
+            for start in range(len(padded) - size + 1):
+                ngram = padded[start:start + size]
+                vector[zlib.crc32(ngram.encode("utf-8")) % self.dimensions] += 1.0
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class SemanticCache:
+    """
+    Similarity-matched response cache over a contiguous matrix of query vectors.
+
+    Rows are evicted by TTL expiry and, when the matrix is full, by least
+    recent use. Each row also records a namespace (model and prompt fingerprint)
+    so responses produced under different settings never match, and the guard
+    terms of its query so questions differing in a number or polarity never match.
+    """
+
+    def __init__(self, max_entries: int, similarity_threshold: float, ttl_seconds: float,
+                 vectorizer: Optional[HashedNgramVectorizer] = None):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.vectorizer = vectorizer or HashedNgramVectorizer()
+
+        self._vectors = np.zeros((max_entries, self.vectorizer.dimensions), dtype=np.float32)
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._responses: List[Optional[str]] = [None] * max_entries
+        self._namespaces: List[Optional[str]] = [None] * max_entries
+        self._guards: List[Optional[frozenset]] = [None] * max_entries
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.guard_rejections = 0
+
+    def get(self, query: str, namespace: str, allow_stale: bool = False) -> Optional[str]:
+        """
+        Return the response of the most similar cached query above the threshold.
+
+        A row only matches when its guard terms equal those of the query. With
+        allow_stale, expired rows that have not been replaced yet also match.
+        """
+        if self._size == 0:
+            self.misses += 1
+            return None
+
+        now = time.monotonic()
+        query_vector = self.vectorizer.transform(query)
+        similarities = self._vectors[:self._size] @ query_vector
+        if not allow_stale:
+            similarities[self._expires_at[:self._size] <= now] = -1.0
+
+        # Walk candidates above the threshold from most to least similar
+        candidates = np.flatnonzero(similarities >= self.similarity_threshold)
+        guard = None
+        for row in candidates[np.argsort(similarities[candidates])[::-1]]:
+            if self._namespaces[row] != namespace:
+                continue
+            if guard is None:
+                guard = self.vectorizer.guard_terms(query)
+            if self._guards[row] != guard:
+                self.guard_rejections += 1
+                logger.debug(f"Semantic cache match with similarity {similarities[row]:.3f} rejected by guard terms")
+                continue
+            self._last_used[row] = now
+            self.hits += 1
+            logger.debug(f"Semantic cache hit with similarity {similarities[row]:.3f}")
+            return self._responses[row]
+
+        self.misses += 1
+        return None
+
+    def put(self, query: str, namespace: str, response_text: str) -> None:
+        """Cache a response, replacing an expired or least recently used row when full."""
+        if self.max_entries <= 0 or not self.vectorizer.content_words(query):
+            return
+
+        now = time.monotonic()
+        if self._size < self.max_entries:
+            row = self._size
+            self._size += 1
+        else:
+            expired = np.flatnonzero(self._expires_at <= now)
+            row = int(expired[0]) if expired.size else int(np.argmin(self._last_used))
+            self.evictions += 1
+
+        self._vectors[row] = self.vectorizer.transform(query)
+        self._expires_at[row] = now + self.ttl_seconds
+        self._last_used[row] = now
+        self._responses[row] = response_text
+        self._namespaces[row] = namespace
+        self._guards[row] = self.vectorizer.guard_terms(query)
+
+    def stats(self) -> Dict[str, int]:
+        """Return live cache size and hit/miss counters."""
+        return {
+            "entries": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "guard_rejections": self.guard_rejections
+        }
@@ -0,0 +1,610 @@
+"""
+Task Storage for Dr. Walter Reed's Interventional Cardiology Agent
+
+BoundedTaskStore is a bounded replacement for the SDK's InMemoryTaskStore,
+which keeps every task and its full message history for the life of the
+process. Tasks that are still running are kept until they have gone
+active_ttl_seconds without being saved, which only happens to tasks
+abandoned by a crashed or hung consultation. Once a task reaches a terminal
+state (completed, canceled, failed or rejected) it is only retained so
+callers can fetch the result: it expires after ttl_seconds without being
+read, and the least recently used terminal tasks are evicted once more than
+max_tasks are retained or the serialized size of all tasks exceeds max_bytes.
+Expiry is checked lazily from the oldest end on every store operation, so
+there are no background timers and every operation is O(1) amortized.
+
+TieredTaskStore puts a BoundedTaskStore in front of a SQLite database in WAL
+mode, so tasks survive restarts and can be read by every worker process on
+the host. Saves update the memory tier at once and are persisted in batches
+by a single writer thread; reads that miss the memory tier fall through to
+SQLite. The same database holds the running summaries of conversations, so a
+follow-up turn served by another worker can rebuild the conversation from the
+completed tasks of its context and pick up its summary.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks.task_store import TaskStore
+from a2a.types import Task, TaskState
+
+logger = logging.getLogger(__name__)
+
+# States after which a task no longer changes
+TERMINAL_STATES = frozenset({TaskState.completed, TaskState.canceled, TaskState.failed, TaskState.rejected})
+
+
+class _StoredTask:
+    """A retained task, its serialized size and when it expires."""
+
+    __slots__ = ("task", "size_bytes", "expires_at")
+
+    def __init__(self, task: Task, size_bytes: int, expires_at: float):
+        self.task = task
+        self.size_bytes = size_bytes
+        self.expires_at = expires_at
+
+
+class BoundedTaskStore(TaskStore):
+    """
+    In-memory task store with TTL and LRU eviction of terminal tasks.
+
+    Every task is measured, as the length of its JSON serialization, each time
+    it is saved. Running tasks are never evicted to make room, but their bytes
+    count against max_bytes, so terminal tasks give way to them; their number
+    is bounded by admission control and their lifetime by active_ttl_seconds.
+
+    Args:
+        max_tasks: Terminal tasks retained
+        ttl_seconds: How long a terminal task is retained since it was last saved or read
+        max_bytes: Total serialized size of retained tasks
+        active_ttl_seconds: How long a running task is retained since it was last saved
+    """
+
+    def __init__(self, max_tasks: int, ttl_seconds: float, max_bytes: int, active_ttl_seconds: float = 3600.0):
+        self.max_tasks = max_tasks
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.active_ttl_seconds = active_ttl_seconds
+
+        # Least recently saved first, which is also earliest expiry first
+        self._active: "OrderedDict[str, _StoredTask]" = OrderedDict()
+        self._active_bytes = 0
+        # Least recently used first, which is also earliest expiry first
+        self._terminal: "OrderedDict[str, _StoredTask]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.stale_expirations = 0
+        self.evictions = 0
+
+    async def save(self, task: Task, context: Optional[ServerCallContext] = None) -> None:
+        """Save or update a task, retaining it under the terminal task bounds once it is finished."""
+        now = time.monotonic()
+        self._expire(now)
+
+        self._remove_active(task.id)
+        self._remove_terminal(task.id)
+        size_bytes = len(task.model_dump_json(exclude_none=True))
+
+        if task.status.state not in TERMINAL_STATES:
+            self._active[task.id] = _StoredTask(task, size_bytes, now + self.active_ttl_seconds)
+            self._active_bytes += size_bytes
+            self._evict_terminal()
+            return
+
+        if size_bytes + self._active_bytes > self.max_bytes or self.max_tasks <= 0:
+            logger.warning(f"Task {task.id} not retained ({size_bytes} bytes)")
+            self.evictions += 1
+            return
+
+        self._terminal[task.id] = _StoredTask(task, size_bytes, now + self.ttl_seconds)
+        self._bytes += size_bytes
+        self._evict_terminal()
+
+    async def get(self, task_id: str, context: Optional[ServerCallContext] = None) -> Optional[Task]:
+        """Return a task by ID, or None if it is unknown, expired or evicted."""
+        entry = self._active.get(task_id)
+        if entry is not None:
+            self.hits += 1
+            return entry.task
+
+        now = time.monotonic()
+        self._expire(now)
+
+        entry = self._terminal.get(task_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        entry.expires_at = now + self.ttl_seconds
+        self._terminal.move_to_end(task_id)
+        self.hits += 1
+        return entry.task
+
+    async def delete(self, task_id: str, context: Optional[ServerCallContext] = None) -> None:
+        """Delete a task by ID."""
+        self._remove_active(task_id)
+        self._remove_terminal(task_id)
+
+    def _expire(self, now: float) -> None:
+        """Drop terminal tasks, least recently used first, and stale running tasks whose TTL has passed."""
+        terminal = self._terminal
+        while terminal:
+            oldest = next(iter(terminal.values()))
+            if oldest.expires_at > now:
+                break
+            self._remove_terminal(oldest.task.id)
+            self.expirations += 1
+
+        active = self._active
+        while active:
+            oldest = next(iter(active.values()))
+            if oldest.expires_at > now:
+                break
+            logger.warning(f"Dropping task {oldest.task.id}, still {oldest.task.status.state.value} "
+                           f"after {self.active_ttl_seconds:g}s without an update")
+            self._remove_active(oldest.task.id)
+            self.stale_expirations += 1
+
+    def _evict_terminal(self) -> None:
+        """Evict least recently used terminal tasks until the count and byte bounds hold."""
+        while self._terminal and (
+            len(self._terminal) > self.max_tasks or self._bytes + self._active_bytes > self.max_bytes
+        ):
+            self._remove_terminal(next(iter(self._terminal)))
+            self.evictions += 1
+
+    def _remove_active(self, task_id: str) -> None:
+        """Drop a running task and release its accounted bytes."""
+        entry = self._active.pop(task_id, None)
+        if entry is not None:
+            self._active_bytes -= entry.size_bytes
+
+    def _remove_terminal(self, task_id: str) -> None:
+        """Drop a retained terminal task and release its accounted bytes."""
+        entry = self._terminal.pop(task_id, None)
+        if entry is not None:
+            self._bytes -= entry.size_bytes
+
+    def __len__(self) -> int:
+        return len(self._active) + len(self._terminal)
+
+    def stats(self) -> Dict[str, int]:
+        """Return live task counts, retained bytes and hit/miss/eviction counters."""
+        return {
+            "active_tasks": len(self._active),
+            "active_bytes": self._active_bytes,
+            "terminal_tasks": len(self._terminal),
+            "terminal_bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "stale_expirations": self.stale_expirations,
+            "evictions": self.evictions
+        }
+
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        task_id TEXT PRIMARY KEY,
+        context_id TEXT NOT NULL,
+        state TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        data TEXT NOT NULL,
+        worker_id TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS tasks_context_id ON tasks (context_id)",
+    "CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, updated_at)",
+    """
+    CREATE TABLE IF NOT EXISTS summaries (
+        context_id TEXT PRIMARY KEY,
+        text TEXT NOT NULL,
+        covered_turns INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS workers (worker_id TEXT PRIMARY KEY, heartbeat_at REAL NOT NULL)",
+    """
+    CREATE TABLE IF NOT EXISTS cancel_requests (
+        task_id TEXT PRIMARY KEY,
+        worker_id TEXT NOT NULL,
+        requested_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS cancel_requests_worker_id ON cancel_requests (worker_id)"
+)
+
+_UPSERT = (
+    "INSERT INTO tasks (task_id, context_id, state, updated_at, data, worker_id) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (task_id) DO UPDATE SET context_id = excluded.context_id, state = excluded.state, "
+    "updated_at = excluded.updated_at, data = excluded.data, worker_id = excluded.worker_id"
+)
+
+_TERMINAL_STATE_VALUES = tuple(sorted(state.value for state in TERMINAL_STATES))
+
+_PRUNE = (
+    f"DELETE FROM tasks WHERE state IN ({', '.join('?' for _ in _TERMINAL_STATE_VALUES)}) AND updated_at < ?"
+)
+
+# Running tasks not saved for active_ttl_seconds were abandoned, e.g. by a worker that crashed
+_PRUNE_ABANDONED = (
+    f"DELETE FROM tasks WHERE state NOT IN ({', '.join('?' for _ in _TERMINAL_STATE_VALUES)}) AND updated_at < ?"
+)
+
+# Upserts keep a row's rowid, so rowid order is the order tasks were first persisted in
+_SELECT_CONTEXT = (
+    "SELECT data FROM tasks WHERE context_id = ? AND state = ? ORDER BY rowid LIMIT -1 OFFSET ?"
+)
+
+_UPSERT_SUMMARY = (
+    "INSERT INTO summaries (context_id, text, covered_turns, updated_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (context_id) DO UPDATE SET text = excluded.text, covered_turns = excluded.covered_turns, "
+    "updated_at = excluded.updated_at WHERE excluded.covered_turns >= summaries.covered_turns"
+)
+
+# Stands in for a pending delete in the write batch
+_DELETED = None
+
+# A worker that has missed this many heartbeats is treated as gone
+MISSED_HEARTBEATS = 5
+
+# Forwarded cancel requests older than this are dropped unserved
+CANCEL_REQUEST_TTL_SECONDS = 60.0
+
+
+class TieredTaskStore(TaskStore):
+    """
+    Memory tier over a persistent SQLite task store.
+
+    Every save updates the memory tier immediately and marks the task for
+    persistence; repeated saves of a task before the next flush are written
+    once, with its latest state. Pending writes are flushed in a single
+    transaction every flush_interval seconds, or as soon as batch_size tasks
+    are pending, and on aclose(). Terminal tasks and conversation summaries
+    older than retention_seconds are pruned from SQLite, and so are running
+    tasks not saved for the memory tier's active_ttl_seconds, which a worker
+    that crashed mid-consultation leaves behind.
+
+    Tasks are only mutated by the worker running them and never change once
+    terminal, so a worker caches the tasks it saves and terminal tasks it
+    reads, and reads running tasks of other workers from SQLite. Other
+    workers see a save within flush_interval.
+
+    Each store has a random worker ID, recorded on every row it saves, and
+    once it has saved a task it writes a heartbeat every heartbeat_interval.
+    A worker is live while its heartbeat is recent, so a restarted process
+    (which may get the same PID) never inherits the tasks of its predecessor.
+    Cancel requests for a live worker's task are queued in SQLite with
+    request_cancel(); the owning worker picks them up on its next flush
+    cycle and hands them to cancel_listener.
+
+    Args:
+        memory: The memory tier
+        path: SQLite database file shared by all workers on the host
+        batch_size: Pending tasks that trigger an immediate flush
+        flush_interval: Longest a save waits before it is persisted, in seconds
+        retention_seconds: How long terminal tasks are kept in SQLite
+        heartbeat_interval: Seconds between liveness heartbeats of this worker
+    """
+
+    def __init__(self, memory: BoundedTaskStore, path: str, batch_size: int, flush_interval: float,
+                 retention_seconds: float, heartbeat_interval: float = 2.0):
+        self.memory = memory
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.retention_seconds = retention_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.worker_id = uuid.uuid4().hex
+
+        # Called with the ID of each of this worker's tasks another worker asked to cancel
+        self.cancel_listener: Optional[Callable[[str], Awaitable[None]]] = None
+
+        # task_id -> latest unsaved task, or _DELETED
+        self._pending: Dict[str, Optional[Task]] = {}
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._closed = False
+        self._last_prune = 0.0
+        self._last_heartbeat = 0.0
+
+        # One thread owns the connection, so SQLite calls never block the event loop
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-store")
+        self._connection = self._executor.submit(self._connect).result()
+
+        self.flushes = 0
+        self.rows_written = 0
+        self.db_reads = 0
+        self.pruned = 0
+        self.abandoned_pruned = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database in WAL mode and create the schema (writer thread)."""
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        # Databases created before worker IDs were recorded
+        if "worker_id" not in {row[1] for row in connection.execute("PRAGMA table_info(tasks)")}:
+            connection.execute("ALTER TABLE tasks ADD COLUMN worker_id TEXT")
+        return connection
+
+    async def save(self, task: Task, context: Optional[ServerCallContext] = None) -> None:
+        """Save a task to the memory tier and queue it for persistence."""
+        if self._closed:
+            raise RuntimeError("Task store is closed")
+        await self.memory.save(task, context)
+        self._pending[task.id] = task
+        self._schedule_flush()
+
+    async def get(self, task_id: str, context: Optional[ServerCallContext] = None) -> Optional[Task]:
+        """Return a task from the memory tier, the pending writes or SQLite."""
+        task = await self.memory.get(task_id, context)
+        if task is not None:
+            return task
+        if task_id in self._pending:
+            return self._pending[task_id]
+
+        self.db_reads += 1
+        data = await self._run(self._select, task_id)
+        if data is None:
+            return None
+        task = Task.model_validate_json(data)
+        if task.status.state in TERMINAL_STATES:
+            await self.memory.save(task, context)
+        return task
+
+    async def delete(self, task_id: str, context: Optional[ServerCallContext] = None) -> None:
+        """Delete a task from both tiers."""
+        await self.memory.delete(task_id, context)
+        self._pending[task_id] = _DELETED
+        self._schedule_flush()
+
+    async def completed_in_context(self, context_id: str, skip: int = 0) -> List[Task]:
+        """
+        Completed tasks of a conversation in SQLite, oldest first, after the first skip.
+
+        Tasks saved by other workers appear here within their flush_interval.
+        """
+        rows = await self._run(self._select_context, context_id, skip)
+        return [Task.model_validate_json(data) for data in rows]
+
+    async def get_summary(self, context_id: str) -> Optional[Tuple[str, int]]:
+        """Text and covered turn count of a conversation's running summary, or None."""
+        return await self._run(self._select_summary, context_id)
+
+    async def save_summary(self, context_id: str, text: str, covered_turns: int) -> None:
+        """Persist a conversation's running summary unless a later one is already stored."""
+        await self._run(self._write_summary, context_id, text, covered_turns)
+
+    async def owner(self, task_id: str) -> Optional[str]:
+        """Worker ID of the worker that last saved a task, or None if it is unknown."""
+        if self._pending.get(task_id) is not None:
+            return self.worker_id
+        return await self._run(self._select_owner, task_id)
+
+    async def worker_alive(self, worker_id: str) -> bool:
+        """Whether the worker has sent a heartbeat within MISSED_HEARTBEATS intervals."""
+        if worker_id == self.worker_id:
+            return not self._closed
+        heartbeat_at = await self._run(self._select_heartbeat, worker_id)
+        return heartbeat_at is not None and time.time() - heartbeat_at < MISSED_HEARTBEATS * self.heartbeat_interval
+
+    async def request_cancel(self, task_id: str, worker_id: str) -> None:
+        """Ask the worker running a task to cancel it."""
+        await self._run(self._write_cancel_request, task_id, worker_id)
+
+    def _schedule_flush(self) -> None:
+        """Start the background flusher, and wake it once a full batch is pending."""
+        if self._flusher is None:
+            self._flush_requested = asyncio.Event()
+            self._flusher = asyncio.create_task(self._flush_periodically())
+        if len(self._pending) >= self.batch_size:
+            self._flush_requested.set()
+
+    async def _flush_periodically(self) -> None:
+        """Flush pending writes every flush_interval, or early when a batch fills up."""
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error persisting tasks: {str(e)}")
+            try:
+                await self._heartbeat()
+            except Exception as e:
+                logger.error(f"Error checking in with other workers: {str(e)}")
+
+    async def _heartbeat(self) -> None:
+        """Every heartbeat_interval, record that this worker is alive; every cycle, serve cancel requests."""
+        now = time.time()
+        if now - self._last_heartbeat >= self.heartbeat_interval:
+            self._last_heartbeat = now
+            await self._run(self._write_heartbeat, now)
+
+        # Only a worker with running tasks can have cancel requests to serve
+        if self.cancel_listener is None or not self.memory.stats()["active_tasks"]:
+            return
+        for task_id in await self._run(self._take_cancel_requests):
+            logger.info(f"Canceling task {task_id} at the request of another worker")
+            asyncio.create_task(self.cancel_listener(task_id))
+
+    async def flush(self) -> None:
+        """Write all pending saves and deletes to SQLite in one transaction."""
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        now = time.time()
+        upserts: List[Tuple[str, str, str, float, str, str]] = []
+        deletes: List[Tuple[str]] = []
+        for task_id, task in pending.items():
+            if task is _DELETED:
+                deletes.append((task_id,))
+            else:
+                # Serialized here, on the event loop, so a task is never read while it is being updated
+                upserts.append((task_id, task.context_id, task.status.state.value, now,
+                                task.model_dump_json(exclude_none=True), self.worker_id))
+
+        prune_before = abandoned_before = None
+        if now - self._last_prune >= min(self.retention_seconds, self.memory.active_ttl_seconds, 60.0):
+            self._last_prune = now
+            prune_before = now - self.retention_seconds
+            abandoned_before = now - self.memory.active_ttl_seconds
+
+        try:
+            pruned, abandoned = await self._run(self._write, upserts, deletes, prune_before, abandoned_before)
+        except Exception:
+            # Keep the batch for the next flush unless a newer save replaced it
+            for task_id, task in pending.items():
+                self._pending.setdefault(task_id, task)
+            raise
+
+        self.flushes += 1
+        self.rows_written += len(upserts) + len(deletes)
+        self.pruned += pruned
+        self.abandoned_pruned += abandoned
+        if abandoned:
+            logger.warning(f"Pruned {abandoned} running tasks not updated for "
+                           f"{self.memory.active_ttl_seconds:g}s from SQLite")
+
+    def _write(self, upserts: List[Tuple[str, str, str, float, str, str]], deletes: List[Tuple[str]],
+               prune_before: Optional[float], abandoned_before: Optional[float]) -> Tuple[int, int]:
+        """Apply a batch of writes in one transaction and prune old and abandoned tasks (writer thread)."""
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if upserts:
+                connection.executemany(_UPSERT, upserts)
+            if deletes:
+                connection.executemany("DELETE FROM tasks WHERE task_id = ?", deletes)
+            pruned = abandoned = 0
+            if prune_before is not None:
+                pruned = connection.execute(_PRUNE, (*_TERMINAL_STATE_VALUES, prune_before)).rowcount
+                abandoned = connection.execute(_PRUNE_ABANDONED,
+                                               (*_TERMINAL_STATE_VALUES, abandoned_before)).rowcount
+                connection.execute("DELETE FROM summaries WHERE updated_at < ?", (prune_before,))
+                connection.execute("DELETE FROM workers WHERE heartbeat_at < ?", (prune_before,))
+                connection.execute("DELETE FROM cancel_requests WHERE requested_at < ?",
+                                   (time.time() - CANCEL_REQUEST_TTL_SECONDS,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return pruned, abandoned
+
+    def _select(self, task_id: str) -> Optional[str]:
+        """Read the serialized task with task_id (writer thread)."""
+        row = self._connection.execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return row[0] if row else None
+
+    def _select_context(self, context_id: str, skip: int) -> List[str]:
+        """Read the serialized completed tasks of a context after the first skip (writer thread)."""
+        rows = self._connection.execute(_SELECT_CONTEXT, (context_id, TaskState.completed.value, skip))
+        return [row[0] for row in rows]
+
+    def _select_summary(self, context_id: str) -> Optional[Tuple[str, int]]:
+        """Read the running summary of a context (writer thread)."""
+        row = self._connection.execute(
+            "SELECT text, covered_turns FROM summaries WHERE context_id = ?", (context_id,)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _write_summary(self, context_id: str, text: str, covered_turns: int) -> None:
+        """Upsert the running summary of a context (writer thread)."""
+        self._connection.execute(_UPSERT_SUMMARY, (context_id, text, covered_turns, time.time()))
+
+    def _select_owner(self, task_id: str) -> Optional[str]:
+        """Read the worker ID of the task with task_id (writer thread)."""
+        row = self._connection.execute("SELECT worker_id FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return row[0] if row else None
+
+    def _select_heartbeat(self, worker_id: str) -> Optional[float]:
+        """Read the last heartbeat of a worker (writer thread)."""
+        row = self._connection.execute(
+            "SELECT heartbeat_at FROM workers WHERE worker_id = ?", (worker_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _write_heartbeat(self, now: float) -> None:
+        """Record this worker's heartbeat (writer thread)."""
+        self._connection.execute(
+            "INSERT INTO workers (worker_id, heartbeat_at) VALUES (?, ?) "
+            "ON CONFLICT (worker_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+            (self.worker_id, now)
+        )
+
+    def _write_cancel_request(self, task_id: str, worker_id: str) -> None:
+        """Queue a cancel request for the worker running a task (writer thread)."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO cancel_requests (task_id, worker_id, requested_at) VALUES (?, ?, ?)",
+            (task_id, worker_id, time.time())
+        )
+
+    def _take_cancel_requests(self) -> List[str]:
+        """Remove and return the task IDs other workers asked this worker to cancel (writer thread)."""
+        connection = self._connection
+        if connection.execute("SELECT 1 FROM cancel_requests WHERE worker_id = ? LIMIT 1",
+                              (self.worker_id,)).fetchone() is None:
+            return []
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            task_ids = [row[0] for row in connection.execute(
+                "SELECT task_id FROM cancel_requests WHERE worker_id = ?", (self.worker_id,)
+            )]
+            connection.execute("DELETE FROM cancel_requests WHERE worker_id = ?", (self.worker_id,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return task_ids
+
+    async def _run(self, fn, *args):
+        """Run fn on the thread that owns the SQLite connection."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def aclose(self) -> None:
+        """Flush pending writes and close the database."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._flusher is not None:
+            self._flush_requested.set()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+        await self.flush()
+        # Other workers take over this worker's tasks at once instead of waiting out its heartbeat
+        await self._run(self._connection.execute, "DELETE FROM workers WHERE worker_id = ?", (self.worker_id,))
+        await self._run(self._connection.close)
+        self._executor.shutdown(wait=True)
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+    def stats(self) -> Dict[str, int]:
+        """Return memory tier stats plus pending writes and SQLite counters."""
+        return {
+            **self.memory.stats(),
+            "pending_writes": len(self._pending),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "db_reads": self.db_reads,
+            "pruned": self.pruned,
+            "abandoned_pruned": self.abandoned_pruned
+        }
@@ -0,0 +1,131 @@
+"""
+Tests for the Claude circuit breaker.
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_BACKEND", "local")
+os.environ.setdefault("LOCAL_LLM_LATENCY_MEAN_MS", "0")
+os.environ.setdefault("LOCAL_LLM_CHUNK_DELAY_MS", "0")
+
+from agent import InterventionalCardiologyAgent  # noqa: E402
+from llm_backend import LLMConnectionError, LLMStatusError  # noqa: E402
+from resilience import CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded, TaskDeadlineExceeded  # noqa: E402
+from scheduler import ACUTE, ROUTINE  # noqa: E402
+
+
+def make_breaker(open_seconds: float = 60.0) -> CircuitBreaker:
+    return CircuitBreaker(failure_rate_threshold=0.5, slow_call_seconds=10.0, slow_call_rate_threshold=1.0,
+                          window_size=4, min_calls=4, open_seconds=open_seconds, half_open_max_calls=1)
+
+
+def trip(breaker: CircuitBreaker) -> None:
+    for _ in range(4):
+        breaker.on_failure(breaker.before_call(), LLMConnectionError("connection reset"))
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_opens_at_the_failure_rate_threshold(self):
+        breaker = make_breaker()
+        for _ in range(2):
+            breaker.on_success(breaker.before_call(), 0.1)
+        breaker.on_failure(breaker.before_call(), LLMConnectionError("connection reset"))
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        breaker.on_failure(breaker.before_call(), LLMStatusError(529, "overloaded"))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        self.assertEqual(breaker.stats()["rejected"], 1)
+
+    def test_opens_at_the_slow_call_rate_threshold(self):
+        breaker = make_breaker()
+        breaker.slow_call_rate_threshold = 0.5
+        for latency in (0.1, 0.1, 12.0, 12.0):
+            breaker.on_success(breaker.before_call(), latency)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_errors_that_say_nothing_about_the_backend_are_ignored(self):
+        breaker = make_breaker()
+        for error in (LLMStatusError(400, "bad request"), TaskDeadlineExceeded("task deadline")) * 4:
+            breaker.on_failure(breaker.before_call(), error)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        # A request's own budget running out does count
+        for _ in range(4):
+            breaker.on_failure(breaker.before_call(), DeadlineExceeded("request deadline"))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_successful_probe_closes_and_failed_probe_reopens(self):
+        breaker = make_breaker(open_seconds=0.0)
+        trip(breaker)
+        breaker.on_failure(breaker.before_call(), LLMConnectionError("still down"))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.times_opened, 2)
+
+        breaker.on_success(breaker.before_call(), 0.1)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.stats()["window_calls"], 0)
+
+    def test_outcomes_from_before_a_state_change_are_ignored(self):
+        breaker = make_breaker(open_seconds=0.0)
+        stale = breaker.before_call()
+        trip(breaker)
+        probe = breaker.before_call()
+
+        # A slow call admitted while closed neither reopens nor closes the half-open circuit
+        breaker.on_success(stale, 30.0)
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        breaker.on_success(probe, 0.1)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_is_open_peeks_without_taking_a_probe(self):
+        breaker = make_breaker(open_seconds=0.0)
+        self.assertFalse(breaker.is_open)
+        trip(breaker)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        # Due for probing: the peek admits nothing, so the probe slot is still free
+        self.assertFalse(breaker.is_open)
+        self.assertFalse(breaker.is_open)
+        permit = breaker.before_call()
+        self.assertTrue(permit.probe)
+        self.assertTrue(breaker.is_open)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+
+class QueuedCallFailFastTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_open_circuit_fails_calls_before_they_queue_for_a_slot(self):
+        agent = InterventionalCardiologyAgent()
+        if agent.scheduler is None or agent.circuit_breaker is None:
+            self.skipTest("scheduler and circuit breaker are disabled")
+        agent.circuit_breaker = make_breaker()
+        trip(agent.circuit_breaker)
+
+        # Every slot is busy, so a call that queued would wait out the queue bound
+        slots = [agent.scheduler.slot(ACUTE, Deadline(60)) for _ in range(agent.scheduler.concurrency_limit)]
+        for slot in slots:
+            await slot.__aenter__()
+        try:
+            messages = [{"role": "user", "content": "Referral for a 68-year-old with stable angina"}]
+            with self.assertRaises(CircuitOpenError):
+                await asyncio.wait_for(agent._create_medical_response(messages), timeout=1.0)
+            with self.assertRaises(CircuitOpenError):
+                await asyncio.wait_for(agent._produce_medical_stream(messages).__anext__(), timeout=1.0)
+            self.assertEqual(agent.scheduler.stats()[ROUTINE]["queued"], 0)
+        finally:
+            for slot in slots:
+                await slot.__aexit__(None, None, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
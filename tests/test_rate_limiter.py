@@ -0,0 +1,76 @@
+"""
+Tests for the per-caller token bucket rate limiter.
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rate_limiter  # noqa: E402
+from rate_limiter import TokenBucketLimiter  # noqa: E402
+
+
+class TokenBucketLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        # Drive the limiter's clock by hand
+        self.now = 1000.0
+        patcher = mock.patch.object(rate_limiter, "time", mock.Mock(monotonic=lambda: self.now))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_then_refill_at_the_configured_rate(self):
+        limiter = TokenBucketLimiter(requests_per_minute=60, burst=3, max_keys=10)
+        self.assertEqual([limiter.acquire("agent") for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(limiter.acquire("agent"), 1.0)
+
+        self.now += 0.5
+        self.assertAlmostEqual(limiter.acquire("agent"), 0.5)
+        self.now += 0.5
+        self.assertEqual(limiter.acquire("agent"), 0.0)
+        self.assertEqual(limiter.stats()["allowed"], 4)
+        self.assertEqual(limiter.stats()["limited"], 2)
+
+    def test_keys_have_separate_buckets(self):
+        limiter = TokenBucketLimiter(requests_per_minute=60, burst=1, max_keys=10)
+        self.assertEqual(limiter.acquire("noisy"), 0.0)
+        self.assertGreater(limiter.acquire("noisy"), 0.0)
+        self.assertEqual(limiter.acquire("quiet"), 0.0)
+
+    def test_idle_buckets_are_evicted_once_full_again(self):
+        limiter = TokenBucketLimiter(requests_per_minute=60, burst=2, max_keys=10)
+        for key in ("a", "b", "c"):
+            limiter.acquire(key)
+        self.now += 1.0
+        limiter.acquire("b")
+
+        # "a" and "c" have been idle for the 2s a bucket takes to refill; "b" has not
+        self.now += 1.5
+        limiter.acquire("d")
+        self.assertEqual(len(limiter), 2)
+        self.assertEqual(limiter.stats()["evictions"], 2)
+
+    def test_least_recently_seen_key_is_dropped_beyond_max_keys(self):
+        limiter = TokenBucketLimiter(requests_per_minute=60, burst=1, max_keys=2)
+        limiter.acquire("a")
+        limiter.acquire("b")
+        limiter.acquire("a")
+        limiter.acquire("c")
+        self.assertEqual(len(limiter), 2)
+        # "b" was forgotten, so it starts again with a full bucket; "c" keeps its spent one
+        self.assertEqual(limiter.acquire("b"), 0.0)
+        self.assertGreater(limiter.acquire("c"), 0.0)
+
+    def test_zero_rate_admits_nothing_and_tracks_no_keys(self):
+        limiter = TokenBucketLimiter(requests_per_minute=0, burst=5, max_keys=10)
+        self.assertEqual(limiter.acquire("agent"), float("inf"))
+        self.assertEqual(len(limiter), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
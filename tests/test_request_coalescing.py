@@ -0,0 +1,156 @@
+"""
+Tests for single-flight coalescing of identical upstream calls.
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from request_coalescing import SingleFlight  # noqa: E402
+
+
+class Upstream:
+    """Controllable upstream call that counts how often it was started and cancelled."""
+
+    def __init__(self):
+        self.started = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def call(self) -> str:
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return "answer"
+
+    async def stream(self):
+        self.started += 1
+        try:
+            for delta in ("first ", "second ", "third"):
+                yield delta
+                await self.release.wait()
+                self.release.clear()
+        except (asyncio.CancelledError, GeneratorExit):
+            self.cancelled += 1
+            raise
+
+
+async def collect(deltas) -> list:
+    return [delta async for delta in deltas]
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.flight = SingleFlight()
+        self.upstream = Upstream()
+
+    async def test_concurrent_callers_share_one_call(self):
+        callers = [asyncio.create_task(self.flight.do("key", self.upstream.call)) for _ in range(5)]
+        await asyncio.sleep(0)
+        self.assertEqual(self.flight.stats(), {"in_flight": 1, "leaders": 1, "coalesced": 4})
+
+        self.upstream.release.set()
+        self.assertEqual(await asyncio.gather(*callers), ["answer"] * 5)
+        self.assertEqual(self.upstream.started, 1)
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+    async def test_call_survives_until_the_last_waiter_leaves(self):
+        first = asyncio.create_task(self.flight.do("key", self.upstream.call))
+        second = asyncio.create_task(self.flight.do("key", self.upstream.call))
+        await asyncio.sleep(0)
+
+        # The leader leaving does not cancel the call for the other waiter
+        first.cancel()
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.upstream.cancelled, 0)
+
+        second.cancel()
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.upstream.cancelled, 1)
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+        # The next caller starts afresh instead of joining the cancelled call
+        self.upstream.release.set()
+        self.assertEqual(await self.flight.do("key", self.upstream.call), "answer")
+        self.assertEqual(self.upstream.started, 2)
+
+    async def test_waiter_timeout_leaves_the_call_running_for_others(self):
+        patient = asyncio.create_task(self.flight.do("key", self.upstream.call))
+        await asyncio.sleep(0)
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.flight.do("key", self.upstream.call, timeout=0.01)
+
+        self.upstream.release.set()
+        self.assertEqual(await patient, "answer")
+        self.assertEqual(self.upstream.cancelled, 0)
+
+    async def test_late_subscriber_replays_deltas_it_missed(self):
+        early = asyncio.create_task(collect(self.flight.stream("key", self.upstream.stream)))
+        await asyncio.sleep(0.01)
+
+        late = asyncio.create_task(collect(self.flight.stream("key", self.upstream.stream)))
+        await asyncio.sleep(0)
+        for _ in range(3):
+            self.upstream.release.set()
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(await early, ["first ", "second ", "third"])
+        self.assertEqual(await late, ["first ", "second ", "third"])
+        self.assertEqual(self.upstream.started, 1)
+
+    async def test_stream_is_cancelled_once_every_subscriber_leaves(self):
+        subscribers = [asyncio.create_task(collect(self.flight.stream("key", self.upstream.stream)))
+                       for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for subscriber in subscribers:
+            subscriber.cancel()
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.upstream.cancelled, 1)
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+    async def test_do_joining_a_stream_gets_the_complete_text(self):
+        subscriber = asyncio.create_task(collect(self.flight.stream("key", self.upstream.stream)))
+        await asyncio.sleep(0.01)
+        caller = asyncio.create_task(self.flight.do("key", self.upstream.call))
+        for _ in range(3):
+            self.upstream.release.set()
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(await caller, "first second third")
+        self.assertEqual(await subscriber, ["first ", "second ", "third"])
+        self.assertEqual(self.upstream.started, 1)
+
+    async def test_stream_joining_a_do_call_gets_one_delta(self):
+        caller = asyncio.create_task(self.flight.do("key", self.upstream.call))
+        await asyncio.sleep(0)
+        subscriber = asyncio.create_task(collect(self.flight.stream("key", self.upstream.stream)))
+        await asyncio.sleep(0)
+        self.upstream.release.set()
+
+        self.assertEqual(await subscriber, ["answer"])
+        self.assertEqual(await caller, "answer")
+        self.assertEqual(self.upstream.started, 1)
+
+    async def test_upstream_error_reaches_every_subscriber(self):
+        async def failing():
+            yield "partial"
+            raise RuntimeError("upstream failed")
+
+        results = await asyncio.gather(
+            *(collect(self.flight.stream("key", failing)) for _ in range(2)), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Tests for the response cache shared between worker processes.
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_cache import SharedResponseCache  # noqa: E402
+
+
+class SharedResponseCacheTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "responses.db")
+        self.first = SharedResponseCache(max_entries=16, ttl_seconds=60, max_bytes=1 << 20, path=path)
+        self.second = SharedResponseCache(max_entries=16, ttl_seconds=60, max_bytes=1 << 20, path=path)
+
+    async def asyncTearDown(self):
+        self.first.close()
+        self.second.close()
+        self.directory.cleanup()
+
+    def _wait_for_writes(self, cache: SharedResponseCache) -> None:
+        """Block until the shared writes queued by put() have run."""
+        cache._executor.submit(lambda: None).result()
+
+    async def test_answer_from_one_process_serves_another(self):
+        self.first.put("key", "answer")
+        self._wait_for_writes(self.first)
+        self.assertIsNone(self.second.get("key"))
+        self.assertEqual(await self.second.aget("key"), "answer")
+        self.assertEqual(self.second.stats()["shared_hits"], 1)
+        # Promoted to the in-process tier
+        self.assertEqual(self.second.get("key"), "answer")
+
+    async def test_shared_tier_is_read_off_the_event_loop(self):
+        threads = []
+        select = self.second._select
+
+        def recording_select(key):
+            threads.append(threading.current_thread())
+            return select(key)
+
+        self.second._select = recording_select
+        self.assertIsNone(await self.second.aget("missing"))
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    async def test_expired_shared_entries_only_served_stale(self):
+        self.first.put("key", "answer", ttl_seconds=-1)
+        self._wait_for_writes(self.first)
+        self.assertIsNone(await self.second.aget("key"))
+        self.assertEqual(await self.second.aget("key", allow_stale=True), "answer")
+
+
+if __name__ == "__main__":
+    unittest.main()
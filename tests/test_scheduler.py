@@ -0,0 +1,128 @@
+"""
+Tests for the priority scheduler and the adaptive concurrency limit.
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resilience import Deadline  # noqa: E402
+from scheduler import (  # noqa: E402
+    ACUTE, FIRST_TOKEN, PER_OUTPUT_TOKEN, ROUTINE, AdaptiveConcurrencyLimit, PriorityScheduler, QueueWaitExceeded
+)
+
+
+class AdaptiveConcurrencyLimitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.limit = AdaptiveConcurrencyLimit(initial_limit=4, min_limit=1, max_limit=8, cooldown_seconds=0)
+
+    def test_signals_are_compared_against_their_own_baselines(self):
+        # Fast first tokens and slow whole responses interleaved are both steady
+        for _ in range(50):
+            self.limit.on_sample(0.2, in_flight=4, signal=FIRST_TOKEN)
+            self.limit.on_sample(0.02, in_flight=4, signal=PER_OUTPUT_TOKEN)
+        self.assertEqual(self.limit.decreases, 0)
+        self.assertEqual(self.limit.limit, 8)
+        self.assertFalse(self.limit.shrinking)
+
+    def test_latency_rise_on_one_signal_shrinks_the_limit(self):
+        for _ in range(10):
+            self.limit.on_sample(0.2, in_flight=0, signal=FIRST_TOKEN)
+            self.limit.on_sample(0.02, in_flight=0, signal=PER_OUTPUT_TOKEN)
+        for _ in range(10):
+            self.limit.on_sample(2.0, in_flight=0, signal=FIRST_TOKEN)
+        self.assertGreater(self.limit.decreases, 0)
+        self.assertLess(self.limit.limit, 4)
+        self.assertTrue(self.limit.shrinking)
+
+
+
+class PrioritySchedulerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_waiters_are_admitted_by_task_deadline_not_arrival(self):
+        scheduler = PriorityScheduler(max_concurrency=1, reserved_acute=0)
+        admitted = []
+
+        async def call(name: str, task_seconds: float):
+            # Every call gets the same per-call budget; only the task deadlines differ
+            async with scheduler.slot(ROUTINE, Deadline(60), Deadline(task_seconds)):
+                admitted.append(name)
+
+        async with scheduler.slot(ROUTINE, Deadline(60)):
+            waiters = [asyncio.create_task(call("relaxed", 300)), asyncio.create_task(call("urgent", 10))]
+            await asyncio.sleep(0)
+        await asyncio.gather(*waiters)
+        self.assertEqual(admitted, ["urgent", "relaxed"])
+
+    async def test_reserved_slots_are_only_used_by_acute_calls(self):
+        scheduler = PriorityScheduler(max_concurrency=4, reserved_acute=1)
+        for _ in range(3):
+            self.assertTrue(scheduler.try_acquire(ROUTINE))
+        self.assertFalse(scheduler.try_acquire(ROUTINE))
+        self.assertTrue(scheduler.try_acquire(ACUTE))
+        self.assertFalse(scheduler.try_acquire(ACUTE))
+
+    async def test_acute_waiters_are_admitted_before_routine_waiters(self):
+        scheduler = PriorityScheduler(max_concurrency=1, reserved_acute=0)
+        admitted = []
+
+        async def call(lane: str):
+            async with scheduler.slot(lane, Deadline(60)):
+                admitted.append(lane)
+
+        async with scheduler.slot(ROUTINE, Deadline(60)):
+            waiters = [asyncio.create_task(call(ROUTINE)), asyncio.create_task(call(ACUTE))]
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.stats()[ROUTINE]["queued"], 1)
+            self.assertEqual(scheduler.stats()[ACUTE]["queued"], 1)
+        await asyncio.gather(*waiters)
+        self.assertEqual(admitted, [ACUTE, ROUTINE])
+
+    async def test_waiter_fails_when_its_call_deadline_passes(self):
+        scheduler = PriorityScheduler(max_concurrency=1, reserved_acute=0)
+        async with scheduler.slot(ROUTINE, Deadline(60)):
+            with self.assertRaises(QueueWaitExceeded):
+                # A distant task deadline only orders the waiter; the call deadline bounds it
+                async with scheduler.slot(ROUTINE, Deadline(0.01), Deadline(300)):
+                    pass
+        self.assertEqual(scheduler.stats()[ROUTINE]["expired"], 1)
+        self.assertEqual(scheduler.in_flight, 0)
+
+    async def test_cancelled_waiter_does_not_hold_a_slot(self):
+        scheduler = PriorityScheduler(max_concurrency=1, reserved_acute=0)
+        async with scheduler.slot(ROUTINE, Deadline(60)):
+            waiter = asyncio.create_task(scheduler.slot(ROUTINE, Deadline(60)).__aenter__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.sleep(0)
+        self.assertEqual(scheduler.in_flight, 0)
+        self.assertTrue(scheduler.try_acquire(ROUTINE))
+
+    async def test_try_acquire_never_jumps_the_queue(self):
+        scheduler = PriorityScheduler(max_concurrency=2, reserved_acute=1)
+        release = asyncio.Event()
+
+        async def call():
+            async with scheduler.slot(ROUTINE, Deadline(60)):
+                await release.wait()
+
+        holder = asyncio.create_task(call())
+        waiter = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        # The acute slot is free, but a hedge may not take it while a call is queued
+        self.assertEqual(scheduler.stats()[ROUTINE]["queued"], 1)
+        self.assertFalse(scheduler.try_acquire(ACUTE))
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        self.assertTrue(scheduler.try_acquire(ACUTE))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Tests for the semantic cache guard terms and clinical query exclusion.
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_BACKEND", "local")
+os.environ.setdefault("LOCAL_LLM_LATENCY_MEAN_MS", "0")
+os.environ.setdefault("LOCAL_LLM_CHUNK_DELAY_MS", "0")
+
+from model_router import CLINICAL, LOGISTICS, UNRECOGNIZED  # noqa: E402
+from semantic_cache import HashedNgramVectorizer, SemanticCache  # noqa: E402
+
+NAMESPACE = "model:2000:0.3:prompt"
+
+# Pairs that embed above the default 0.9 threshold but ask different clinical questions
+DIFFERENT_QUESTIONS = [
+    (
+        "Should my patient stop clopidogrel five days before elective noncardiac surgery?",
+        "Should my patient start clopidogrel five days before elective noncardiac surgery?"
+    ),
+    (
+        "How long should a 75-year-old stay on DAPT after a drug-eluting stent?",
+        "How long should a 45-year-old stay on DAPT after a drug-eluting stent?"
+    ),
+    (
+        "Is an ICD indicated for a patient with EF 35% after myocardial infarction?",
+        "Is an ICD indicated for a patient with EF 55% after myocardial infarction?"
+    ),
+]
+
+
+class SemanticCacheGuardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = SemanticCache(max_entries=16, similarity_threshold=0.9, ttl_seconds=60)
+
+    def test_pairs_are_semantically_close(self):
+        vectorizer = HashedNgramVectorizer()
+        for first, second in DIFFERENT_QUESTIONS:
+            with self.subTest(first=first):
+                similarity = float(vectorizer.transform(first) @ vectorizer.transform(second))
+                self.assertGreaterEqual(similarity, 0.9)
+
+    def test_different_numbers_or_polarity_never_match(self):
+        for first, second in DIFFERENT_QUESTIONS:
+            with self.subTest(first=first):
+                self.cache.put(first, NAMESPACE, "answer to first")
+                self.assertIsNone(self.cache.get(second, NAMESPACE))
+                self.assertIsNone(self.cache.get(second, NAMESPACE, allow_stale=True))
+                self.assertEqual(self.cache.get(first, NAMESPACE), "answer to first")
+        self.assertGreater(self.cache.stats()["guard_rejections"], 0)
+
+    def test_paraphrase_still_matches(self):
+        self.cache.put("tell me about angioplasty", NAMESPACE, "angioplasty overview")
+        self.assertEqual(self.cache.get("angioplasty info please", NAMESPACE), "angioplasty overview")
+
+    def test_guard_terms(self):
+        vectorizer = HashedNgramVectorizer()
+        self.assertEqual(vectorizer.guard_terms("EF 35% five days before surgery"),
+                         frozenset({"35", "five", "before"}))
+        self.assertEqual(vectorizer.guard_terms("tell me about angioplasty"), frozenset())
+
+
+class ClinicalQueryExclusionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from agent import InterventionalCardiologyAgent
+        cls.agent_class = InterventionalCardiologyAgent
+
+    def setUp(self):
+        self.agent = self.agent_class()
+        if self.agent.semantic_cache is None:
+            self.skipTest("semantic cache disabled")
+
+    def test_clinical_queries_skip_semantic_cache(self):
+        query = "Should my patient stop clopidogrel before surgery?"
+        self.assertEqual(self.agent.query_classifier.classify(query), CLINICAL)
+        self.assertIsNone(self.agent._semantic_query(query, [], None, CLINICAL))
+
+    def test_unrecognized_and_logistics_first_turns_are_eligible(self):
+        self.assertEqual(self.agent.query_classifier.classify("tell me about angioplasty"), UNRECOGNIZED)
+        for query, query_class in (("tell me about angioplasty", UNRECOGNIZED),
+                                   ("What are your office hours?", LOGISTICS)):
+            with self.subTest(query=query):
+                self.assertEqual(self.agent._semantic_query(query, [], None, query_class), query)
+                self.assertIsNone(
+                    self.agent._semantic_query(query, [{"role": "user", "content": "hi"}], None, query_class)
+                )
+
+    def test_paraphrase_served_without_second_upstream_call(self):
+        first = asyncio.run(self.agent.process_medical_consultation("tell me about angioplasty"))
+        second = asyncio.run(self.agent.process_medical_consultation("angioplasty info please"))
+        self.assertEqual(second, first)
+        self.assertEqual(self.agent.llm_backend.calls, 1)
+        self.assertEqual(self.agent.semantic_cache.stats()["hits"], 1)
+
+    def test_clinical_paraphrase_calls_upstream(self):
+        asyncio.run(self.agent.process_medical_consultation("Should my patient stop clopidogrel before surgery?"))
+        asyncio.run(self.agent.process_medical_consultation("Should my patient stop clopidogrel before surgery please?"))
+        self.assertEqual(self.agent.llm_backend.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for conversations that move between worker processes sharing one SQLite task store.
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_BACKEND", "local")
+os.environ.setdefault("LOCAL_LLM_LATENCY_MEAN_MS", "0")
+os.environ.setdefault("LOCAL_LLM_CHUNK_DELAY_MS", "0")
+
+from a2a.server.request_handlers.default_request_handler import DefaultRequestHandler  # noqa: E402
+from a2a.types import Message, MessageSendConfiguration, MessageSendParams, Part, Role, TextPart  # noqa: E402
+
+from agent_executor import InterventionalCardiologyExecutor  # noqa: E402
+from conversation import ConversationSummary  # noqa: E402
+from task_store import BoundedTaskStore, TieredTaskStore  # noqa: E402
+
+
+class SharedConversationTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tasks.db")
+        self.workers = [self._worker(), self._worker()]
+        self.context_id = str(uuid.uuid4())
+
+    async def asyncTearDown(self):
+        for store, _, _ in self.workers:
+            await store.aclose()
+        self.directory.cleanup()
+
+    def _worker(self):
+        store = TieredTaskStore(BoundedTaskStore(100, 3600, 1 << 30), self.path, batch_size=1,
+                                flush_interval=0.01, retention_seconds=3600)
+        executor = InterventionalCardiologyExecutor(shared_store=store)
+        return store, executor, DefaultRequestHandler(agent_executor=executor, task_store=store)
+
+    async def _turn(self, worker: int, text: str) -> None:
+        store, _, handler = self.workers[worker]
+        await handler.on_message_send(MessageSendParams(
+            message=Message(message_id=str(uuid.uuid4()), role=Role.user, context_id=self.context_id,
+                            parts=[Part(root=TextPart(text=text))]),
+            configuration=MessageSendConfiguration(blocking=True)
+        ))
+        await store.flush()
+
+    async def test_follow_up_on_another_worker_sees_earlier_turns(self):
+        await self._turn(0, "Referral for a 68-year-old with stable angina")
+        await self._turn(0, "What about recovery after stenting?")
+        await self._turn(1, "And when can the patient drive again?")
+
+        _, executor, _ = self.workers[1]
+        history = executor.history_cache.get_history(self.context_id)
+        self.assertEqual([turn["content"] for turn in history if turn["role"] == "user"], [
+            "Referral for a 68-year-old with stable angina",
+            "What about recovery after stenting?",
+            "And when can the patient drive again?"
+        ])
+
+        # Back on the first worker, the turn served elsewhere is appended in order
+        history, _ = await self.workers[0][1]._load_conversation(self.context_id)
+        self.assertEqual(len(history), 6)
+        self.assertEqual(history[4]["content"], "And when can the patient drive again?")
+
+    async def test_summary_is_restored_from_the_shared_store(self):
+        await self._turn(0, "Referral for a 68-year-old with stable angina")
+        store, _, _ = self.workers[0]
+        await store.save_summary(self.context_id, "68-year-old, stable angina", 2)
+
+        _, executor, _ = self.workers[1]
+        history, summary = await executor._load_conversation(self.context_id)
+        self.assertEqual(len(history), 2)
+        self.assertEqual(summary, ConversationSummary(text="68-year-old, stable angina", covered_turns=2))
+
+        # An older summary never replaces a newer one
+        await store.save_summary(self.context_id, "outdated", 0)
+        self.assertEqual(await store.get_summary(self.context_id), ("68-year-old, stable angina", 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
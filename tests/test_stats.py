@@ -0,0 +1,45 @@
+"""
+Tests for the per-worker stats route.
+
+Run with: python -m unittest discover tests
+"""
+
+import importlib.util
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("LLM_BACKEND", "local")
+os.environ.setdefault("LOCAL_LLM_LATENCY_MEAN_MS", "0")
+os.environ.setdefault("LOCAL_LLM_CHUNK_DELAY_MS", "0")
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from config import config  # noqa: E402
+
+# The server module is the package's __main__, so it is loaded under another name
+_spec = importlib.util.spec_from_file_location("server", os.path.join(ROOT, "__main__.py"))
+server = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(server)
+
+
+class StatsRouteTest(unittest.TestCase):
+
+    def test_stats_route_publishes_component_counters(self):
+        with TestClient(server.create_app()) as client:
+            response = client.get(config.server.stats_path)
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()
+        self.assertEqual(stats["pid"], os.getpid())
+        self.assertIn("retries", stats["llm_caller"])
+        self.assertIn("task_store", stats)
+        self.assertEqual(stats["token_usage"]["requests"], 0)
+        self.assertIn("cache_read_ratio", stats["token_usage"])
+        if config.resilience.circuit_breaker_enabled:
+            self.assertEqual(stats["circuit_breaker"]["state"], "closed")
+
+
+if __name__ == "__main__":
+    unittest.main()
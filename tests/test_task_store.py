@@ -0,0 +1,141 @@
+"""
+Tests for the bounded in-memory task store and its SQLite tier.
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+import uuid
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2a.types import Task, TaskState, TaskStatus  # noqa: E402
+
+import task_store  # noqa: E402
+from task_store import BoundedTaskStore, TieredTaskStore  # noqa: E402
+
+
+def make_task(state: TaskState = TaskState.working) -> Task:
+    return Task(id=str(uuid.uuid4()), context_id=str(uuid.uuid4()), status=TaskStatus(state=state))
+
+
+class BoundedTaskStoreTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        # Drive the store's clock by hand
+        self.now = 1000.0
+        patcher = mock.patch.object(task_store, "time", mock.Mock(monotonic=lambda: self.now))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_least_recently_used_terminal_task_is_evicted_beyond_max_tasks(self):
+        store = BoundedTaskStore(max_tasks=2, ttl_seconds=3600, max_bytes=1 << 20)
+        first, second, third = (make_task(TaskState.completed) for _ in range(3))
+        await store.save(first)
+        await store.save(second)
+        await store.get(first.id)
+        await store.save(third)
+
+        self.assertIsNone(await store.get(second.id))
+        self.assertIsNotNone(await store.get(first.id))
+        self.assertIsNotNone(await store.get(third.id))
+        self.assertEqual(store.stats()["evictions"], 1)
+
+    async def test_running_tasks_are_never_evicted_but_count_against_max_bytes(self):
+        task = make_task(TaskState.completed)
+        size = len(task.model_dump_json(exclude_none=True))
+        store = BoundedTaskStore(max_tasks=100, ttl_seconds=3600, max_bytes=int(size * 2.5))
+        await store.save(task)
+        running = [make_task() for _ in range(2)]
+        for running_task in running:
+            await store.save(running_task)
+
+        # The terminal task made room for the running ones, which exceed the cap themselves
+        self.assertIsNone(await store.get(task.id))
+        for running_task in running:
+            self.assertIsNotNone(await store.get(running_task.id))
+        self.assertEqual(store.stats()["terminal_bytes"], 0)
+
+    async def test_terminal_tasks_expire_unless_read(self):
+        store = BoundedTaskStore(max_tasks=100, ttl_seconds=60, max_bytes=1 << 20)
+        read, unread = make_task(TaskState.completed), make_task(TaskState.failed)
+        await store.save(read)
+        await store.save(unread)
+        self.now += 45
+        await store.get(read.id)
+        self.now += 30
+
+        self.assertIsNotNone(await store.get(read.id))
+        self.assertIsNone(await store.get(unread.id))
+        self.assertEqual(store.stats()["expirations"], 1)
+
+    async def test_stale_running_tasks_are_dropped_after_active_ttl(self):
+        store = BoundedTaskStore(max_tasks=100, ttl_seconds=60, max_bytes=1 << 20, active_ttl_seconds=600)
+        task = make_task()
+        await store.save(task)
+        self.now += 300
+        await store.save(task)
+        self.now += 400
+        self.assertIsNotNone(await store.get(task.id))
+
+        self.now += 300
+        await store.save(make_task())
+        self.assertIsNone(await store.get(task.id))
+        self.assertEqual(store.stats()["stale_expirations"], 1)
+
+    async def test_finishing_a_task_moves_its_bytes_to_the_terminal_tier(self):
+        store = BoundedTaskStore(max_tasks=100, ttl_seconds=60, max_bytes=1 << 20)
+        task = make_task()
+        await store.save(task)
+        task.status = TaskStatus(state=TaskState.completed)
+        await store.save(task)
+
+        stats = store.stats()
+        self.assertEqual((stats["active_tasks"], stats["active_bytes"]), (0, 0))
+        self.assertEqual(stats["terminal_tasks"], 1)
+        await store.delete(task.id)
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.stats()["terminal_bytes"], 0)
+
+
+class TieredTaskStoreTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tasks.db")
+
+    async def asyncTearDown(self):
+        self.directory.cleanup()
+
+    def _store(self, active_ttl_seconds: float = 3600) -> TieredTaskStore:
+        return TieredTaskStore(BoundedTaskStore(100, 3600, 1 << 30, active_ttl_seconds), self.path,
+                               batch_size=1, flush_interval=0.01, retention_seconds=3600)
+
+    async def test_running_tasks_of_a_crashed_worker_are_pruned(self):
+        crashed = self._store()
+        running, finished = make_task(), make_task(TaskState.completed)
+        await crashed.save(running)
+        await crashed.save(finished)
+        await crashed.flush()
+        # Backdate the rows as if the worker had died long ago, without closing it cleanly
+        await crashed._run(crashed._connection.execute, "UPDATE tasks SET updated_at = ?", (time.time() - 600,))
+
+        # Pruning rides along with the next batch any worker writes
+        survivor = self._store(active_ttl_seconds=300)
+        await survivor.save(make_task())
+        await survivor.flush()
+        self.assertIsNone(await survivor.get(running.id))
+        self.assertEqual((await survivor.get(finished.id)).status.state, TaskState.completed)
+        self.assertEqual(survivor.stats()["abandoned_pruned"], 1)
+
+        await crashed.aclose()
+        await survivor.aclose()
+
+
+if __name__ == "__main__":
+    unittest.main()
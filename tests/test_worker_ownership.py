@@ -0,0 +1,98 @@
+"""
+Tests for routing cancel and resubscribe to the worker process running a task.
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("LLM_BACKEND", "local")
+os.environ.setdefault("LOCAL_LLM_LATENCY_MEAN_MS", "0")
+os.environ.setdefault("LOCAL_LLM_CHUNK_DELAY_MS", "0")
+
+from a2a.types import (  # noqa: E402
+    Message, MessageSendConfiguration, MessageSendParams, Part, Role, TaskIdParams, TaskState, TextPart
+)
+from a2a.utils.errors import ServerError  # noqa: E402
+
+from agent_executor import InterventionalCardiologyExecutor  # noqa: E402
+from task_store import BoundedTaskStore, TieredTaskStore  # noqa: E402
+
+# The server module is the package's __main__, so it is loaded under another name
+_spec = importlib.util.spec_from_file_location("server", os.path.join(ROOT, "__main__.py"))
+server = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(server)
+
+
+class WorkerOwnershipTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tasks.db")
+        self.workers = [self._worker(), self._worker()]
+
+    async def asyncTearDown(self):
+        for store, _, _ in self.workers:
+            await store.aclose()
+        self.directory.cleanup()
+
+    def _worker(self):
+        store = TieredTaskStore(BoundedTaskStore(100, 3600, 1 << 30), self.path, batch_size=1,
+                                flush_interval=0.01, retention_seconds=3600, heartbeat_interval=0.05)
+        executor = InterventionalCardiologyExecutor(shared_store=store)
+        return store, executor, server.WorkerAwareRequestHandler(executor, store)
+
+    async def _start_slow_task(self, worker: int) -> str:
+        """Start a consultation on a worker that will not finish during the test."""
+        store, executor, handler = self.workers[worker]
+        executor.agent.llm_backend.latency_mean = 30.0
+        task = await handler.on_message_send(MessageSendParams(
+            message=Message(message_id=str(uuid.uuid4()), role=Role.user,
+                            parts=[Part(root=TextPart(text="Referral for a 68-year-old with stable angina"))]),
+            configuration=MessageSendConfiguration(blocking=False)
+        ))
+        await store.flush()
+        # Let the flusher send the first heartbeat
+        await asyncio.sleep(0.1)
+        return task.id
+
+    async def test_cancel_is_forwarded_to_the_owning_worker(self):
+        task_id = await self._start_slow_task(0)
+
+        task = await self.workers[1][2].on_cancel_task(TaskIdParams(id=task_id))
+        self.assertEqual(task.status.state, TaskState.canceled)
+        self.assertEqual((await self.workers[0][0].get(task_id)).status.state, TaskState.canceled)
+
+    async def test_resubscribe_is_refused_by_other_workers(self):
+        task_id = await self._start_slow_task(0)
+
+        with self.assertRaises(ServerError):
+            async for _ in self.workers[1][2].on_resubscribe_to_task(TaskIdParams(id=task_id)):
+                pass
+        await self.workers[0][2].on_cancel_task(TaskIdParams(id=task_id))
+
+    async def test_tasks_of_a_silent_worker_are_handled_anywhere(self):
+        task_id = await self._start_slow_task(0)
+        store, _, handler = self.workers[0]
+        owner = store.worker_id
+        self.assertEqual(await self.workers[1][2]._peer_owner(task_id), owner)
+
+        # Once the owner's heartbeats stop, as when its process is replaced, its tasks are orphaned
+        store.worker_id = uuid.uuid4().hex
+        await asyncio.sleep(0.3)
+        self.assertEqual(await self.workers[1][0].owner(task_id), owner)
+        self.assertFalse(await self.workers[1][0].worker_alive(owner))
+        self.assertIsNone(await self.workers[1][2]._peer_owner(task_id))
+        await handler.on_cancel_task(TaskIdParams(id=task_id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Multi-process Serving for Dr. Walter Reed's Interventional Cardiology Agent
+
+Runs the A2A server in several worker processes on one port, so a container
+uses more than one core. Each worker binds its own listening socket with
+SO_REUSEPORT and the kernel spreads incoming connections across them, with no
+shared accept lock and no proxy in front. Every worker builds its own
+application through the app factory; task state, conversation summaries and
+cached responses are shared through SQLite files on the host, so a follow-up
+turn can land on any worker. A running task's event queue and
+consultation only exist in the worker running it, so tasks/cancel for it is
+forwarded to that worker through SQLite and tasks/resubscribe is refused by
+any other worker; tasks/get works from every worker.
+
+The supervisor process restarts workers that exit unexpectedly, and handles:
+- SIGTERM / SIGINT: every worker drains (stops accepting connections, lets
+  in-flight requests and consultations finish up to the drain timeout and
+  flushes its task store), then the supervisor exits
+- SIGHUP: rolling restart; each replacement worker is started before the
+  worker it replaces is drained, so the port always has a listener
+"""
+
+import logging
+import multiprocessing
+import multiprocessing.synchronize
+import signal
+import socket
+import time
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds between supervisor checks on worker processes
+POLL_INTERVAL_SECONDS = 0.5
+
+# A worker that exits sooner than this after starting is restarted with a delay
+MIN_WORKER_UPTIME_SECONDS = 5.0
+
+# Pending connections each worker's listening socket holds
+LISTEN_BACKLOG = 2048
+
+
+def bind_reuseport_socket(host: str, port: int) -> socket.socket:
+    """
+    Create a listening TCP socket that other processes may bind to the same address.
+
+    The kernel starts routing connections to the socket as soon as it listens;
+    they wait in its backlog until the server accepts them.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(LISTEN_BACKLOG)
+    return sock
+
+
+def run_worker(app_factory: Callable, host: str, port: int, log_level: str, drain_timeout: float,
+               listening: multiprocessing.synchronize.Event) -> None:
+    """Serve the app built by app_factory on a SO_REUSEPORT socket until told to stop (worker process)."""
+    import uvicorn
+
+    # Drop the supervisor's handlers inherited through fork; uvicorn installs its own for
+    # SIGTERM and SIGINT, and rolling restarts are driven by the supervisor, not SIGHUP
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    sock = bind_reuseport_socket(host, port)
+    listening.set()
+    server = uvicorn.Server(uvicorn.Config(
+        app_factory,
+        factory=True,
+        log_level=log_level,
+        access_log=True,
+        timeout_graceful_shutdown=drain_timeout
+    ))
+    server.run(sockets=[sock])
+
+
+class WorkerSupervisor:
+    """
+    Start, watch and stop the worker processes serving one port.
+
+    Args:
+        app_factory: Zero-argument callable returning the ASGI app (called in each worker)
+        workers: Number of worker processes
+        host: Address to bind
+        port: Port to bind
+        log_level: Uvicorn log level
+        drain_timeout: Seconds a stopping worker waits for in-flight work
+    """
+
+    def __init__(self, app_factory: Callable, workers: int, host: str, port: int, log_level: str,
+                 drain_timeout: float):
+        self.app_factory = app_factory
+        self.workers = max(1, workers)
+        self.host = host
+        self.port = port
+        self.log_level = log_level
+        self.drain_timeout = drain_timeout
+
+        # Workers are forked so they inherit the loaded configuration and modules
+        self._context = multiprocessing.get_context("fork")
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * self.workers
+        self._started_at: List[float] = [0.0] * self.workers
+        self._stopping = False
+        self._reload = False
+
+        self.restarts = 0
+
+    def run(self) -> None:
+        """Run the workers until SIGTERM or SIGINT, then drain them all."""
+        # Fail fast if the port is unavailable instead of crash-looping workers
+        bind_reuseport_socket(self.host, self.port).close()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        for index in range(self.workers):
+            self._start(index)
+        logger.info(f"Started {self.workers} workers on {self.host}:{self.port}")
+
+        while not self._stopping:
+            time.sleep(POLL_INTERVAL_SECONDS)
+            if self._reload:
+                self._reload = False
+                self._rolling_restart()
+            self._restart_exited()
+
+        self._stop_all()
+
+    @property
+    def stop_timeout(self) -> float:
+        """
+        Longest a draining worker may take before it is killed.
+
+        Open connections get the drain timeout, then consultations still
+        running in the background get it again during app shutdown.
+        """
+        return 2 * self.drain_timeout + 5
+
+    def _start(self, index: int) -> multiprocessing.Process:
+        """Start the worker process in slot index and wait until its socket is listening."""
+        listening = self._context.Event()
+        process = self._context.Process(
+            target=run_worker,
+            args=(self.app_factory, self.host, self.port, self.log_level, self.drain_timeout, listening),
+            name=f"worker-{index}"
+        )
+        process.start()
+        self._processes[index] = process
+        self._started_at[index] = time.monotonic()
+        if not listening.wait(MIN_WORKER_UPTIME_SECONDS):
+            logger.error(f"Worker {index} (pid {process.pid}) did not start listening")
+        else:
+            logger.info(f"Worker {index} started (pid {process.pid})")
+        return process
+
+    def _drain(self, process: multiprocessing.Process) -> None:
+        """Ask a worker to drain and wait for it, killing it if it overruns the stop timeout."""
+        if process.is_alive():
+            process.terminate()
+        process.join(self.stop_timeout)
+        if process.is_alive():
+            logger.warning(f"Worker pid {process.pid} did not drain in time; killing it")
+            process.kill()
+            process.join()
+
+    def _restart_exited(self) -> None:
+        """Replace workers that exited without being asked to."""
+        for index, process in enumerate(self._processes):
+            if process is None or process.is_alive() or self._stopping:
+                continue
+            logger.error(f"Worker {index} (pid {process.pid}) exited with code {process.exitcode}")
+            if time.monotonic() - self._started_at[index] < MIN_WORKER_UPTIME_SECONDS:
+                time.sleep(MIN_WORKER_UPTIME_SECONDS)
+            self.restarts += 1
+            self._start(index)
+
+    def _rolling_restart(self) -> None:
+        """Replace workers one at a time, starting each replacement before draining the old worker."""
+        logger.info("Rolling restart of workers")
+        for index in range(self.workers):
+            if self._stopping:
+                return
+            old = self._processes[index]
+            self._start(index)
+            if old is not None:
+                self._drain(old)
+
+    def _stop_all(self) -> None:
+        """Drain every worker concurrently."""
+        logger.info(f"Draining {self.workers} workers")
+        processes = [process for process in self._processes if process is not None]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.stop_timeout
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Worker pid {process.pid} did not drain in time; killing it")
+                process.kill()
+                process.join()
+        logger.info("All workers stopped")
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame) -> None:
+        self._reload = True